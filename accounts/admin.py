@@ -1,13 +1,46 @@
-from django.contrib import admin
+from django.contrib import admin, messages
+from djibtrade.admin_scaling import ScalableAdminMixin
+from djibtrade.counting import bump_table_version
+from subscriptions.premium import set_premium
 from .models import User
+from .search import search_users
 
 @admin.register(User)
-class UserAdmin(admin.ModelAdmin):
+class UserAdmin(ScalableAdminMixin, admin.ModelAdmin):
     """
-    Configuration de l’affichage du modèle User dans l’admin Django.
+    Configuration de l’affichage du modèle User dans l’admin Django (mode grandes tables).
+    La recherche (liste et autocomplétion des vendeurs) passe par l'index de recherche des utilisateurs.
     """
     list_display = ('company_name', 'email', 'phone', 'role', 'is_premium', 'is_staff', 'date_joined')
     list_filter = ('role', 'is_premium', 'is_staff', 'date_joined')
     search_fields = ('company_name', 'email', 'phone')
     readonly_fields = ('date_joined',)
-    ordering = ('-date_joined',)
+    actions = ('activate_users', 'deactivate_users', 'delete_selected_bulk')
+
+    def get_search_results(self, request, queryset, search_term):
+        search_term = search_term.strip()
+        if not search_term:
+            return queryset, False
+        queryset, _ = search_users(queryset, search_term)
+        return queryset, False
+
+    def save_model(self, request, obj, form, change):
+        """
+        Si le statut premium est modifié à la main, il passe par set_premium() comme tout changement
+        de statut : classement des annonces, cache de l'échéance et version de la table suivent.
+        """
+        super().save_model(request, obj, form, change)
+        if change and 'is_premium' in form.changed_data:
+            set_premium([obj.pk], obj.is_premium)
+
+    @admin.action(permissions=['change'], description="Activer les comptes sélectionnés")
+    def activate_users(self, request, queryset):
+        updated = queryset.update(is_active=True)
+        bump_table_version(User)
+        self.message_user(request, f"{updated} compte(s) activé(s).", messages.SUCCESS)
+
+    @admin.action(permissions=['change'], description="Désactiver les comptes sélectionnés")
+    def deactivate_users(self, request, queryset):
+        updated = queryset.update(is_active=False)
+        bump_table_version(User)
+        self.message_user(request, f"{updated} compte(s) désactivé(s).", messages.SUCCESS)
@@ -0,0 +1,37 @@
+from django.conf import settings
+from django.contrib.auth.hashers import Argon2PasswordHasher, PBKDF2PasswordHasher
+
+
+# ==========================
+# 🔹 Hacheurs à coût configurable
+# ==========================
+# Mêmes algorithmes que Django (les hachages existants restent valides), mais le coût vient de
+# PASSWORD_HASHER_COST, calibré par la commande `calibrate_password_hasher`.
+# Un hachage produit avec d'autres paramètres (ou par un autre algorithme) est recalculé à la
+# connexion suivante : Django appelle alors must_update() et réenregistre le mot de passe.
+def _cost(algorithm, name, default):
+    return getattr(settings, 'PASSWORD_HASHER_COST', {}).get(algorithm, {}).get(name, default)
+
+
+class CalibratedPBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    """PBKDF2-SHA256 avec un nombre d'itérations réglable."""
+
+    @property
+    def iterations(self):
+        return _cost(self.algorithm, 'iterations', PBKDF2PasswordHasher.iterations)
+
+
+class CalibratedArgon2PasswordHasher(Argon2PasswordHasher):
+    """Argon2id avec temps, mémoire (Kio) et parallélisme réglables."""
+
+    @property
+    def time_cost(self):
+        return _cost(self.algorithm, 'time_cost', Argon2PasswordHasher.time_cost)
+
+    @property
+    def memory_cost(self):
+        return _cost(self.algorithm, 'memory_cost', Argon2PasswordHasher.memory_cost)
+
+    @property
+    def parallelism(self):
+        return _cost(self.algorithm, 'parallelism', Argon2PasswordHasher.parallelism)
@@ -0,0 +1,86 @@
+import importlib.util
+import statistics
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.hashers import CalibratedArgon2PasswordHasher, CalibratedPBKDF2PasswordHasher
+
+# Mémoire minimale recommandée pour Argon2id (OWASP) : 19 Mio
+ARGON2_MIN_MEMORY_COST = 19456
+
+
+class Command(BaseCommand):
+    help = "Calibre le coût du hacheur de mots de passe pour une latence de connexion cible sur ce serveur"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--target-ms', type=float, default=250, help="Durée visée pour un hachage, en millisecondes")
+        parser.add_argument('--algorithm', choices=('argon2', 'pbkdf2_sha256'), default=None,
+                            help="Algorithme à calibrer (par défaut : PASSWORD_HASHER)")
+        parser.add_argument('--samples', type=int, default=5, help="Nombre de mesures par essai")
+
+    def handle(self, *args, **options):
+        algorithm = options['algorithm'] or getattr(settings, 'PASSWORD_HASHER', 'pbkdf2_sha256')
+        if algorithm == 'argon2' and not importlib.util.find_spec('argon2'):
+            raise CommandError("argon2-cffi n'est pas installé (pip install argon2-cffi).")
+        self.target = options['target_ms'] / 1000
+        self.samples = max(options['samples'], 1)
+
+        if algorithm == 'argon2':
+            values = self._calibrate_argon2()
+        else:
+            values = self._calibrate_pbkdf2()
+
+        self.stdout.write("⚙️ Valeurs à reporter dans l'environnement (.env) :")
+        self.stdout.write(f"PASSWORD_HASHER={algorithm}")
+        for name, value in values.items():
+            self.stdout.write(f"{name}={value}")
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Hacheur {algorithm} calibré. Les mots de passe existants seront recalculés à la prochaine connexion."
+        ))
+
+    # --- Mesures ---
+    def _measure(self, base, **cost):
+        """Durée médiane d'un hachage avec ces paramètres (hacheur de test, réglages inchangés)."""
+        hasher = type('ProbeHasher', (base,), cost)()
+        salt = hasher.salt()
+        hasher.encode('mot-de-passe-de-test', salt)  # échauffement
+        timings = []
+        for _ in range(self.samples):
+            started = time.perf_counter()
+            hasher.encode('mot-de-passe-de-test', salt)
+            timings.append(time.perf_counter() - started)
+        elapsed = statistics.median(timings)
+        details = ', '.join(f"{name}={value}" for name, value in cost.items())
+        self.stdout.write(f"⏱️ {details} : {elapsed * 1000:.1f} ms")
+        return elapsed
+
+    def _calibrate_pbkdf2(self):
+        # Le coût de PBKDF2 est linéaire en nombre d'itérations : une mesure suffit, la seconde vérifie
+        probe = 100000
+        elapsed = self._measure(CalibratedPBKDF2PasswordHasher, iterations=probe)
+        iterations = max(int(probe * self.target / elapsed) // 1000 * 1000, 1000)
+        self._measure(CalibratedPBKDF2PasswordHasher, iterations=iterations)
+        return {'PBKDF2_ITERATIONS': iterations}
+
+    def _calibrate_argon2(self):
+        cost = settings.PASSWORD_HASHER_COST.get('argon2', {})
+        memory_cost = cost.get('memory_cost', CalibratedArgon2PasswordHasher.memory_cost)
+        parallelism = cost.get('parallelism', CalibratedArgon2PasswordHasher.parallelism)
+
+        # Une seule passe déjà trop lente : on réduit la mémoire (jusqu'au minimum recommandé)
+        elapsed = self._measure(CalibratedArgon2PasswordHasher, time_cost=1, memory_cost=memory_cost, parallelism=parallelism)
+        while elapsed > self.target and memory_cost // 2 >= ARGON2_MIN_MEMORY_COST:
+            memory_cost //= 2
+            elapsed = self._measure(CalibratedArgon2PasswordHasher, time_cost=1, memory_cost=memory_cost, parallelism=parallelism)
+
+        # Le temps est ensuite à peu près linéaire en nombre de passes
+        time_cost = max(int(self.target / elapsed), 1)
+        if time_cost > 1:
+            self._measure(CalibratedArgon2PasswordHasher, time_cost=time_cost, memory_cost=memory_cost, parallelism=parallelism)
+        return {
+            'ARGON2_TIME_COST': time_cost,
+            'ARGON2_MEMORY_COST': memory_cost,
+            'ARGON2_PARALLELISM': parallelism,
+        }
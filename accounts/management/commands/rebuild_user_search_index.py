@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from accounts.models import User
+from accounts.search import index_users_bulk
+
+
+class Command(BaseCommand):
+    help = "Reconstruit l'index de recherche (trigrammes) de tous les utilisateurs, par lots"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help="Nombre d'utilisateurs par lot")
+
+    def handle(self, *args, **options):
+        rows = User.objects.order_by('pk').values_list('pk', 'email', 'company_name')
+        last_pk = 0
+        indexed = 0
+        while True:
+            batch = list(rows.filter(pk__gt=last_pk)[:options['batch_size']])
+            if not batch:
+                break
+            last_pk = batch[-1][0]
+            with transaction.atomic():
+                index_users_bulk(batch)
+            indexed += len(batch)
+
+        self.stdout.write(self.style.SUCCESS(f"✅ {indexed} utilisateurs indexés."))
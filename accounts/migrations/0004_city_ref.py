@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:51
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+from cities.backfill import backfill_city_refs
+
+
+def backfill(apps, schema_editor):
+    backfill_city_refs(apps, 'accounts.User')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0003_alter_user_options_alter_user_role'),
+        ('cities', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='city_ref',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='users', to='cities.city'),
+        ),
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,75 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:55
+
+import unicodedata
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+# Copie figée de la normalisation d'accounts/search.py (le code applicatif peut évoluer,
+# pas cette migration) : l'index est de toute façon tenu à jour ensuite par les signaux
+MAX_GRAMS_PER_FIELD = 64
+BATCH_SIZE = 1000
+
+
+def fold(value):
+    value = unicodedata.normalize('NFKD', value or '')
+    value = ''.join(char for char in value if not unicodedata.combining(char))
+    return ' '.join(value.lower().replace('-', ' ').replace('_', ' ').split())
+
+
+def trigrams(value):
+    value = f" {value} "
+    return list(dict.fromkeys(value[i:i + 3] for i in range(len(value) - 2)))
+
+
+def backfill(apps, schema_editor):
+    """Indexe les utilisateurs existants par tranches de clés primaires (modèles historiques)."""
+    User = apps.get_model('accounts', 'User')
+    Document = apps.get_model('accounts', 'UserSearchDocument')
+    Gram = apps.get_model('accounts', 'UserSearchGram')
+    rows = User.objects.order_by('pk').values_list('pk', 'email', 'company_name')
+    last_pk = 0
+    while True:
+        batch = list(rows.filter(pk__gt=last_pk)[:BATCH_SIZE])
+        if not batch:
+            break
+        last_pk = batch[-1][0]
+        documents, grams = [], []
+        for pk, email, company_name in batch:
+            email, company_name = (email or '').strip().lower(), fold(company_name)
+            documents.append(Document(user_id=pk, email=email, company_name=company_name))
+            user_grams = set(trigrams(email)[:MAX_GRAMS_PER_FIELD] + trigrams(company_name)[:MAX_GRAMS_PER_FIELD])
+            grams.extend(Gram(user_id=pk, gram=gram) for gram in sorted(user_grams))
+        Document.objects.bulk_create(documents, batch_size=BATCH_SIZE)
+        Gram.objects.bulk_create(grams, batch_size=5000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0004_city_ref'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserSearchDocument',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='search_document', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('email', models.CharField(db_index=True, max_length=254)),
+                ('company_name', models.CharField(db_index=True, max_length=255)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='UserSearchGram',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('gram', models.CharField(max_length=3)),
+                ('user', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='search_grams', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['gram', 'user'], name='user_search_gram_idx'), models.Index(fields=['user'], name='user_search_gram_user_idx')],
+            },
+        ),
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
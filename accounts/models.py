@@ -63,6 +63,14 @@ class User(AbstractBaseUser, PermissionsMixin):
     phone = models.CharField(max_length=20)
     address = models.CharField(max_length=255, blank=True, null=True)
     city = models.CharField(max_length=100, blank=True, null=True)
+    city_ref = models.ForeignKey(
+        'cities.City',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        editable=False,
+        related_name='users',
+    )
 
     role = models.CharField(max_length=10, choices=ROLE_CHOICES, default='user')
     is_premium = models.BooleanField(default=False)
@@ -84,3 +92,31 @@ class User(AbstractBaseUser, PermissionsMixin):
         ordering = ['-date_joined']
         verbose_name = "Utilisateur"
         verbose_name_plural = "Utilisateurs"
+
+
+# ==========================
+# 🔹 Index de recherche des utilisateurs
+# ==========================
+class UserSearchDocument(models.Model):
+    """
+    Forme normalisée de l'email et du nom d'entreprise, pour les recherches par préfixe
+    (parcours d'intervalle sur index, sans LIKE '%...%').
+    """
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name='search_document')
+    email = models.CharField(max_length=254, db_index=True)
+    company_name = models.CharField(max_length=255, db_index=True)
+
+
+class UserSearchGram(models.Model):
+    """
+    Trigrammes de l'email et du nom d'entreprise d'un utilisateur (index inversé).
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='search_grams', db_index=False)
+    gram = models.CharField(max_length=3)
+
+    class Meta:
+        indexes = [
+            # gram IN (...) GROUP BY user : lecture de l'index seul
+            models.Index(fields=['gram', 'user'], name='user_search_gram_idx'),
+            models.Index(fields=['user'], name='user_search_gram_user_idx'),
+        ]
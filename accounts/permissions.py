@@ -1,5 +1,31 @@
+from django.db.models import Q
 from rest_framework import permissions
 
+# Rôles autorisés à modérer les contenus des autres utilisateurs
+MODERATION_ROLES = ('moderator', 'admin')
+
+
+def can_moderate(user):
+    """Modérateur, administrateur ou superutilisateur."""
+    return bool(
+        user
+        and user.is_authenticated
+        and (user.role in MODERATION_ROLES or user.is_superuser)
+    )
+
+
+# 🔹 Les mêmes règles, sous forme de filtre SQL (opérations en masse)
+def owner_or_moderator_q(user, owner_field='owner'):
+    """
+    Objets que l'utilisateur peut modifier ou supprimer, en condition de requête :
+    tout pour un modérateur ou un administrateur, sinon ses propres objets (aucun s'il est anonyme).
+    """
+    if can_moderate(user):
+        return Q()
+    if not (user and user.is_authenticated):
+        return Q(pk__in=[])
+    return Q(**{f'{owner_field}_id': user.pk})
+
 # 🔹 Permission pour les administrateurs uniquement
 class IsAdmin(permissions.BasePermission):
     """Autorise uniquement les utilisateurs ayant le rôle 'admin'."""
@@ -56,5 +82,5 @@ class IsOwnerOrModeratorOrAdmin(permissions.BasePermission):
         return bool(
             user
             and user.is_authenticated
-            and (obj.owner == user or user.role in ['moderator', 'admin'])
+            and (obj.owner_id == user.pk or can_moderate(user))
         )
@@ -0,0 +1,124 @@
+from django.db.models import Count, OuterRef, Q, Subquery
+from rest_framework import filters
+
+from cities.normalization import fold
+from .models import ROLE_CHOICES, UserSearchDocument, UserSearchGram
+
+MAX_GRAMS_PER_FIELD = 64
+# Part minimale des trigrammes de la recherche qu'un utilisateur doit contenir
+MIN_GRAM_RATIO = 0.6
+
+
+def normalize_email(value):
+    return (value or '').strip().lower()
+
+
+def normalize_name(value):
+    return fold(value or '')
+
+
+def trigrams(value):
+    """Trigrammes d'une chaîne normalisée (bornée par des espaces pour favoriser les débuts de mots)."""
+    value = f" {value} "
+    grams = []
+    seen = set()
+    for i in range(len(value) - 2):
+        gram = value[i:i + 3]
+        if gram not in seen:
+            seen.add(gram)
+            grams.append(gram)
+    return grams
+
+
+def document_grams(email, company_name):
+    grams = trigrams(email)[:MAX_GRAMS_PER_FIELD] + trigrams(company_name)[:MAX_GRAMS_PER_FIELD]
+    return sorted(set(grams))
+
+
+def index_user(user):
+    """(Ré)indexe un utilisateur : document normalisé + trigrammes."""
+    email = normalize_email(user.email)
+    company_name = normalize_name(user.company_name)
+    UserSearchDocument.objects.update_or_create(user_id=user.pk, defaults={'email': email, 'company_name': company_name})
+    UserSearchGram.objects.filter(user_id=user.pk).delete()
+    UserSearchGram.objects.bulk_create(
+        [UserSearchGram(user_id=user.pk, gram=gram) for gram in document_grams(email, company_name)]
+    )
+
+
+def index_users_bulk(rows):
+    """Indexe un lot de (pk, email, company_name) par insertions groupées."""
+    pks = [pk for pk, _, _ in rows]
+    UserSearchDocument.objects.filter(user_id__in=pks).delete()
+    UserSearchGram.objects.filter(user_id__in=pks).delete()
+    documents, grams = [], []
+    for pk, email, company_name in rows:
+        email, company_name = normalize_email(email), normalize_name(company_name)
+        documents.append(UserSearchDocument(user_id=pk, email=email, company_name=company_name))
+        grams.extend(UserSearchGram(user_id=pk, gram=gram) for gram in document_grams(email, company_name))
+    UserSearchDocument.objects.bulk_create(documents, batch_size=1000)
+    UserSearchGram.objects.bulk_create(grams, batch_size=5000)
+
+
+def prefix_range(field, prefix):
+    """Filtre « commence par » exprimé en intervalle : utilisable par n'importe quel index B-tree."""
+    return {f'{field}__gte': prefix, f'{field}__lt': prefix + '\uffff'}
+
+
+def search_users(queryset, query):
+    """
+    Filtre les utilisateurs correspondant à `query` via l'index de recherche.
+    Retourne (queryset, classé) : `classé` indique si l'annotation search_rank est disponible.
+    - Rôle exact ('user', 'moderator', 'admin') : filtre direct.
+    - Contient '@' : préfixe exact de l'email (intervalle sur index).
+    - Moins de 3 caractères : préfixe de l'email ou du nom d'entreprise.
+    - Sinon : trigrammes (index inversé), pertinence = nombre de trigrammes communs.
+    """
+    if query.lower() in dict(ROLE_CHOICES):
+        return queryset.filter(role=query.lower()), False
+
+    email = normalize_email(query)
+    if '@' in query:
+        return queryset.filter(pk__in=UserSearchDocument.objects.filter(**prefix_range('email', email)).values('user_id')), False
+
+    name = normalize_name(query)
+    if len(name) < 3:
+        prefix_matches = UserSearchDocument.objects.filter(
+            Q(**prefix_range('email', email)) | Q(**prefix_range('company_name', name))
+        )
+        return queryset.filter(pk__in=prefix_matches.values('user_id')), False
+
+    grams = sorted(set(trigrams(name)) | set(trigrams(email)))
+    min_hits = max(1, int(len(set(trigrams(name))) * MIN_GRAM_RATIO))
+    candidates = (
+        UserSearchGram.objects.filter(gram__in=grams)
+        .values('user_id')
+        .annotate(hits=Count('gram'))
+        .filter(hits__gte=min_hits)
+        .values('user_id')
+    )
+    hits = (
+        UserSearchGram.objects.filter(user_id=OuterRef('pk'), gram__in=grams)
+        .values('user_id')
+        .annotate(hits=Count('gram'))
+        .values('hits')
+    )
+    return queryset.filter(pk__in=candidates).annotate(search_rank=Subquery(hits)), True
+
+
+class UserSearchFilter(filters.BaseFilterBackend):
+    """
+    Recherche des utilisateurs par ?search= (voir search_users).
+    Les résultats trigrammes sont classés par pertinence sauf si ?ordering= est demandé.
+    """
+    search_param = 'search'
+
+    def filter_queryset(self, request, queryset, view):
+        query = request.query_params.get(self.search_param, '').strip()
+        if not query:
+            return queryset
+
+        queryset, ranked = search_users(queryset, query)
+        if not ranked or request.query_params.get('ordering'):
+            return queryset
+        return queryset.order_by('-search_rank', '-date_joined')
@@ -1,5 +1,6 @@
 from rest_framework import serializers
 from django.contrib.auth.password_validation import validate_password
+from django.db import transaction
 from .models import User
 
 
@@ -28,17 +29,17 @@ class UserSerializer(serializers.ModelSerializer):
     def create(self, validated_data):
         """
         Création sécurisée de l'utilisateur avec mot de passe hashé.
+        create_user hache le mot de passe et enregistre l'utilisateur : un seul hachage,
+        une seule écriture et un seul post_save (email de bienvenue).
         """
         password = validated_data.pop('password')
-        user = User.objects.create_user(**validated_data)
-        user.set_password(password)
-        user.save()
-        return user
+        return User.objects.create_user(password=password, **validated_data)
 
     def update(self, instance, validated_data):
         """
         Mise à jour sécurisée de l'utilisateur.
         - Si un mot de passe est fourni, il est hashé.
+        - Un changement de numéro est recopié sur les annonces dans la même transaction.
         """
         password = validated_data.pop('password', None)
         for attr, value in validated_data.items():
@@ -46,7 +47,8 @@ class UserSerializer(serializers.ModelSerializer):
 
         if password:
             instance.set_password(password)
-        instance.save()
+        with transaction.atomic():
+            instance.save()
         return instance
 
 
@@ -1,10 +1,12 @@
 import logging
-from django.conf import settings
-from django.core.mail import send_mail
-from django.db.models.signals import post_save
+from django.db.models.signals import post_init, post_save
 from django.dispatch import receiver
+from djibtrade.counting import track_table_versions
+from products.contact import propagate_contact
 from django_rest_passwordreset.signals import reset_password_token_created
 from .models import User
+from .search import index_user
+from .tasks import send_password_reset_email, send_welcome_email
 
 # Configuration du logger
 logger = logging.getLogger(__name__)
@@ -13,44 +15,67 @@ logger = logging.getLogger(__name__)
 @receiver(reset_password_token_created)
 def password_reset_token_created(sender, instance, reset_password_token, *args, **kwargs):
     """
-    Envoie un email contenant le token de réinitialisation de mot de passe.
+    Met en file l'email contenant le token de réinitialisation de mot de passe.
     """
-    email_plaintext_message = f"Voici votre token de réinitialisation : {reset_password_token.key}"
-
-    try:
-        send_mail(
-            subject="Réinitialisation de mot de passe",
-            message=email_plaintext_message,
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            recipient_list=[reset_password_token.user.email],
-            fail_silently=False
-        )
-        logger.info(f"📩 Email de réinitialisation envoyé à {reset_password_token.user.email}")
-    except Exception as e:
-        logger.error(f"❌ Erreur lors de l'envoi de l'email de reset : {e}")
+    send_password_reset_email.delay(reset_password_token.user.email, reset_password_token.key)
 
 # 🔹 Signal : Envoi d'email de bienvenue après inscription
 @receiver(post_save, sender=User)
-def send_welcome_email(sender, instance, created, **kwargs):
+def queue_welcome_email(sender, instance, created, **kwargs):
     """
-    Envoie un email de bienvenue lorsqu'un nouvel utilisateur est créé.
+    Met en file l'email de bienvenue lorsqu'un nouvel utilisateur est créé :
+    l'inscription n'attend plus le serveur SMTP.
     """
     if created:
         logger.info(f"🎉 Nouvel utilisateur créé : {instance.email} ({instance.role})")
+        send_welcome_email.delay(instance.pk)
+
+
+# 🔹 Signaux : index de recherche des utilisateurs
+@receiver(post_init, sender=User)
+def remember_search_state(sender, instance, **kwargs):
+    """
+    Mémorise l'email et le nom d'entreprise chargés pour ne réindexer qu'en cas de changement.
+    """
+    instance._search_state = (instance.__dict__.get('email'), instance.__dict__.get('company_name'))
+
+
+@receiver(post_save, sender=User)
+def update_search_index(sender, instance, created, update_fields=None, **kwargs):
+    """
+    Tient à jour les trigrammes de l'utilisateur quand son email ou son nom d'entreprise change.
+    """
+    if update_fields is not None and not {'email', 'company_name'} & set(update_fields):
+        return
+    state = (instance.email, instance.company_name)
+    if not created and state == instance._search_state:
+        return
+    instance._search_state = state
+    index_user(instance)
+
+
+# 🔹 Signaux : coordonnées recopiées sur les annonces
+@receiver(post_init, sender=User)
+def remember_phone(sender, instance, **kwargs):
+    """
+    Mémorise le numéro chargé pour ne mettre à jour les annonces qu'en cas de changement.
+    """
+    instance._loaded_phone = instance.__dict__.get('phone')
+
+
+@receiver(post_save, sender=User)
+def propagate_phone(sender, instance, created, update_fields=None, **kwargs):
+    """
+    Met à jour le lien WhatsApp de toutes les annonces du vendeur quand son numéro change,
+    en un seul UPDATE exécuté dans la même transaction que la modification du profil.
+    """
+    if created or (update_fields is not None and 'phone' not in update_fields):
+        return
+    if instance.phone == instance._loaded_phone:
+        return
+    instance._loaded_phone = instance.phone
+    propagate_contact(instance.pk, instance.phone)
+
 
-        try:
-            send_mail(
-                subject="Bienvenue sur Djibtrade 🎉",
-                message=(
-                    f"Bonjour {instance.company_name},\n\n"
-                    "Bienvenue sur Djibtrade ! Nous sommes ravis de vous compter parmi nous.\n"
-                    "Vous pouvez maintenant vous connecter et publier vos annonces.\n\n"
-                    "À très bientôt,\nL'équipe Djibtrade"
-                ),
-                from_email=settings.DEFAULT_FROM_EMAIL,
-                recipient_list=[instance.email],
-                fail_silently=True
-            )
-            logger.info(f"📩 Email de bienvenue envoyé à {instance.email}")
-        except Exception as e:
-            logger.error(f"❌ Erreur lors de l'envoi de l'email de bienvenue : {e}")
+# 🔹 Version de la table : invalide les comptages de pagination en cache
+track_table_versions(User, ignored_fields={'last_login', 'password'})
@@ -0,0 +1,49 @@
+import logging
+from django.conf import settings
+from django.core.mail import send_mail
+from tasks.queue import task
+from .models import User
+
+# Configuration du logger
+logger = logging.getLogger(__name__)
+
+
+# 🔹 Tâche : email de bienvenue
+@task(queue='emails')
+def send_welcome_email(user_id):
+    """
+    Envoie l'email de bienvenue d'un nouvel utilisateur.
+    Une erreur d'envoi est levée : la tâche est retentée plus tard.
+    """
+    user = User.objects.filter(pk=user_id).only('email', 'company_name').first()
+    if user is None:
+        return
+    send_mail(
+        subject="Bienvenue sur Djibtrade 🎉",
+        message=(
+            f"Bonjour {user.company_name},\n\n"
+            "Bienvenue sur Djibtrade ! Nous sommes ravis de vous compter parmi nous.\n"
+            "Vous pouvez maintenant vous connecter et publier vos annonces.\n\n"
+            "À très bientôt,\nL'équipe Djibtrade"
+        ),
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        recipient_list=[user.email],
+        fail_silently=False
+    )
+    logger.info(f"📩 Email de bienvenue envoyé à {user.email}")
+
+
+# 🔹 Tâche : token de réinitialisation de mot de passe
+@task(queue='emails')
+def send_password_reset_email(email, token):
+    """
+    Envoie un email contenant le token de réinitialisation de mot de passe.
+    """
+    send_mail(
+        subject="Réinitialisation de mot de passe",
+        message=f"Voici votre token de réinitialisation : {token}",
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        recipient_list=[email],
+        fail_silently=False
+    )
+    logger.info(f"📩 Email de réinitialisation envoyé à {email}")
@@ -0,0 +1,42 @@
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from djibtrade.throttling import _buckets
+
+LOGIN_URL = '/api/auth/login/'
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class LoginThrottleTests(TestCase):
+    """Limites de connexion : ni X-Forwarded-For ni la rotation d'adresses ne permettent de les contourner."""
+
+    def setUp(self):
+        cache.clear()
+        _buckets.clear()
+        self.client = APIClient()
+
+    def login(self, email, remote_addr='203.0.113.1', **headers):
+        return self.client.post(
+            LOGIN_URL, {'email': email, 'password': 'mauvais'}, format='json', REMOTE_ADDR=remote_addr, **headers,
+        )
+
+    def test_forwarded_for_header_does_not_change_bucket(self):
+        # Rafale 'login' : 5 tentatives par adresse, chacune visant un compte différent
+        statuses = [
+            self.login(f'compte{i}@example.com', HTTP_X_FORWARDED_FOR=f'198.51.100.{i}').status_code
+            for i in range(6)
+        ]
+        self.assertNotIn(429, statuses[:5])
+        self.assertEqual(statuses[5], 429)
+
+    def test_same_email_is_limited_across_addresses(self):
+        # Rafale 'login_email' : 10 tentatives par compte, chacune depuis une adresse différente
+        statuses = [self.login('cible@example.com', remote_addr=f'192.0.2.{i}').status_code for i in range(11)]
+        self.assertNotIn(429, statuses[:10])
+        self.assertEqual(statuses[10], 429)
+
+    @override_settings(THROTTLE_DISABLED=True)
+    def test_disabled_throttling_lets_bursts_through(self):
+        statuses = [self.login(f'compte{i}@example.com').status_code for i in range(8)]
+        self.assertNotIn(429, statuses)
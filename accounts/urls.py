@@ -1,7 +1,7 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import RegisterView, ProfileView, ChangePasswordView, UserViewSet
-from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView, TokenBlacklistView
+from .views import RegisterView, LoginView, ProfileView, ChangePasswordView, UserViewSet
+from rest_framework_simplejwt.views import TokenRefreshView, TokenBlacklistView
 
 # Router pour ViewSets
 router = DefaultRouter()
@@ -10,7 +10,7 @@ router.register('users', UserViewSet, basename='users')
 urlpatterns = [
     # Authentification et gestion de compte
     path('auth/register/', RegisterView.as_view(), name='register'),
-    path('auth/login/', TokenObtainPairView.as_view(), name='token_obtain_pair'),
+    path('auth/login/', LoginView.as_view(), name='token_obtain_pair'),
     path('auth/token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
     path('auth/logout/', TokenBlacklistView.as_view(), name='token_blacklist'),
 
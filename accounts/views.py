@@ -1,10 +1,13 @@
 from rest_framework import generics, status, permissions, viewsets, filters
 from rest_framework.response import Response
 from rest_framework.views import APIView
+from rest_framework_simplejwt.views import TokenObtainPairView
 from django.contrib.auth.password_validation import validate_password
+from djibtrade.throttling import LoginEmailThrottle, ScopedTokenBucketThrottle
 from .models import User
 from .serializers import UserSerializer, ChangePasswordSerializer
 from .permissions import IsAdmin, IsModerator, IsAdminOrModerator, IsOwnerOrAdmin
+from .search import UserSearchFilter
 
 
 # 🔹 Inscription d'un nouvel utilisateur
@@ -15,6 +18,18 @@ class RegisterView(generics.CreateAPIView):
     queryset = User.objects.all()
     serializer_class = UserSerializer
     permission_classes = [permissions.AllowAny]
+    throttle_scope = 'register'
+
+
+# 🔹 Connexion (obtention des jetons JWT)
+class LoginView(TokenObtainPairView):
+    """
+    Connexion par email / mot de passe.
+    Limitée en débit : chaque tentative coûte un hachage de mot de passe.
+    Deux seaux : par adresse IP (scope 'login') et par compte visé (scope 'login_email').
+    """
+    throttle_scope = 'login'
+    throttle_classes = [ScopedTokenBucketThrottle, LoginEmailThrottle]
 
 
 # 🔹 Profil utilisateur connecté (lecture et mise à jour)
@@ -83,8 +98,8 @@ class UserViewSet(viewsets.ModelViewSet):
             return [permissions.IsAuthenticated(), IsAdmin()]
         return [permissions.IsAuthenticated()]
 
-    # 🔹 Recherche et filtrage par email, nom ou rôle
-    filter_backends = [filters.SearchFilter, filters.OrderingFilter]
-    search_fields = ['email', 'company_name', 'role']
+    # 🔹 Recherche et filtrage par email, nom ou rôle (index de trigrammes, voir accounts/search.py)
+    # La recherche passe après le tri par défaut pour pouvoir classer par pertinence
+    filter_backends = [filters.OrderingFilter, UserSearchFilter]
     ordering_fields = ['date_joined', 'company_name']
     ordering = ['-date_joined']
@@ -0,0 +1,17 @@
+from django.contrib import admin
+from .models import SavedSearch, SearchMatch
+
+@admin.register(SavedSearch)
+class SavedSearchAdmin(admin.ModelAdmin):
+    list_display = ('__str__', 'user', 'category', 'city_ref', 'keywords', 'anchor', 'is_active', 'created_at')
+    list_select_related = ('user', 'category', 'city_ref')
+    list_filter = ('is_active',)
+    raw_id_fields = ('user',)
+    autocomplete_fields = ('category', 'city_ref')
+    readonly_fields = ('anchor', 'created_at')
+
+@admin.register(SearchMatch)
+class SearchMatchAdmin(admin.ModelAdmin):
+    list_display = ('saved_search', 'product', 'user', 'created_at', 'notified_at')
+    list_select_related = ('saved_search', 'product', 'user')
+    raw_id_fields = ('saved_search', 'product', 'user')
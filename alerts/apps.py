@@ -0,0 +1,9 @@
+from django.apps import AppConfig
+
+class AlertsConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'alerts'
+
+    def ready(self):
+        # Import des signaux quand l'application est prête
+        import alerts.signals
@@ -0,0 +1,78 @@
+import logging
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.utils import timezone
+
+from .models import SearchMatch
+
+# Configuration du logger
+logger = logging.getLogger(__name__)
+
+
+def build_digest(user, matches):
+    """Un seul email par utilisateur, listant les nouvelles annonces de toutes ses recherches."""
+    lines = [f"Bonjour {user.company_name},", "", "De nouvelles annonces correspondent à vos recherches :", ""]
+    for match in matches:
+        product = match.product
+        lines.append(f"• {product.title} — {product.unit_price} {product.currency} ({match.saved_search})")
+    lines += ["", "À très bientôt,", "L'équipe Djibtrade"]
+    return EmailMessage(
+        subject=f"Djibtrade : {len(matches)} nouvelle(s) annonce(s) pour vos recherches",
+        body="\n".join(lines),
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        to=[user.email],
+    )
+
+
+def send_digests(batch_size=500, max_items=None):
+    """
+    Envoie les résumés en attente, par lots d'utilisateurs :
+    une requête pour les correspondances du lot, une connexion SMTP pour tous ses emails,
+    un UPDATE pour les marquer envoyées.
+    Retourne (nombre d'emails, nombre de correspondances notifiées).
+    """
+    max_items = max_items or getattr(settings, 'SAVED_SEARCH_DIGEST_MAX_ITEMS', 20)
+    pending = SearchMatch.objects.filter(notified_at__isnull=True)
+    emails = notified = 0
+    last_user_id = 0
+    while True:
+        user_ids = list(
+            pending.filter(user_id__gt=last_user_id)
+            .order_by('user_id')
+            .values_list('user_id', flat=True)
+            .distinct()[:batch_size]
+        )
+        if not user_ids:
+            break
+        last_user_id = user_ids[-1]
+
+        by_user = {}
+        match_ids = []
+        matches = (
+            pending.filter(user_id__in=user_ids)
+            .select_related('user', 'product', 'saved_search')
+            .order_by('user_id', '-created_at')
+        )
+        for match in matches:
+            match_ids.append(match.pk)
+            # Annonce masquée par la modération : marquée comme traitée, jamais envoyée
+            if match.product.is_hidden:
+                continue
+            # Une annonce trouvée par plusieurs recherches n'apparaît qu'une fois ;
+            # au-delà de max_items, les correspondances sont marquées sans figurer dans l'email
+            items = by_user.setdefault(match.user_id, (match.user, {}))[1]
+            if len(items) < max_items:
+                items.setdefault(match.product_id, match)
+
+        messages = [build_digest(user, list(items.values())) for user, items in by_user.values()]
+        try:
+            sent = get_connection(fail_silently=False).send_messages(messages)
+        except Exception as e:
+            logger.error(f"❌ Erreur lors de l'envoi des résumés de recherches : {e}")
+            break
+        SearchMatch.objects.filter(pk__in=match_ids).update(notified_at=timezone.now())
+        emails += sent or 0
+        notified += len(match_ids)
+        logger.info(f"📩 {sent} résumés de recherches envoyés")
+    return emails, notified
@@ -0,0 +1,117 @@
+import random
+import statistics
+import time
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from accounts.models import User
+from alerts.matching import anchor_for, find_matches, product_tokens, search_matches
+from alerts.models import SavedSearch
+from cities.models import City
+from products.models import Product, Category
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = "Mesure le débit du moteur de correspondance des recherches enregistrées (données synthétiques annulées en fin de test)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--searches', type=int, default=100000, help="Nombre de recherches enregistrées synthétiques")
+        parser.add_argument('--products', type=int, default=1000, help="Nombre de nouvelles annonces confrontées aux recherches")
+        parser.add_argument('--naive-sample', type=int, default=50, help="Annonces testées avec le parcours exhaustif (référence)")
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        self.random = random.Random(options['seed'])
+        try:
+            with transaction.atomic():
+                self._seed(options['searches'])
+                self._run(options['products'], options['naive_sample'])
+                raise _Rollback
+        except _Rollback:
+            self.stdout.write(self.style.WARNING("🗑️ Données synthétiques annulées."))
+
+    # --- Données synthétiques ---
+    def _word(self):
+        syllables = ('ba', 'di', 'ko', 'ma', 'ri', 'su', 'ta', 'ne', 'lo', 'zi', 'ha', 'gu', 'fe', 'pi', 'sa')
+        return ''.join(self.random.choice(syllables) for _ in range(self.random.randint(2, 4)))
+
+    def _seed(self, searches):
+        started = time.perf_counter()
+        self.vocabulary = list({self._word() for _ in range(3000)})
+        password = make_password(None)
+        users = User.objects.bulk_create(
+            [
+                User(email=f'bench-alerts-{i}@djibtrade.local', company_name=f'Acheteur {i}', phone='77000000', password=password)
+                for i in range(1000)
+            ],
+            batch_size=1000,
+        )
+        self.seller = User.objects.create(email='bench-alerts-seller@djibtrade.local', company_name='Vendeur', phone='77000001', password=password)
+        self.categories = Category.objects.bulk_create([Category(name=f'Bench alertes {i}') for i in range(40)])
+        self.cities = City.objects.bulk_create([City(name=f'Bench ville {i}', key=f'bench ville {i}') for i in range(12)])
+
+        rows = []
+        for i in range(searches):
+            keywords = ' '.join(self.random.sample(self.vocabulary, self.random.randint(1, 2))) if self.random.random() < 0.7 else ''
+            search = SavedSearch(
+                user=self.random.choice(users),
+                # Comme via l'API : au moins une catégorie, une ville ou un mot-clé
+                category=self.random.choice(self.categories) if not keywords or self.random.random() < 0.3 else None,
+                city_ref=self.random.choice(self.cities) if self.random.random() < 0.3 else None,
+                currency=self.random.choice(('DJF', 'USD')) if self.random.random() < 0.2 else '',
+                keywords=keywords,
+            )
+            if self.random.random() < 0.3:
+                search.min_price = Decimal(self.random.randint(0, 500))
+                search.max_price = search.min_price + self.random.randint(100, 5000)
+            # bulk_create n'appelle pas save() : la clé d'index est calculée ici
+            search.anchor = anchor_for(search)
+            rows.append(search)
+        SavedSearch.objects.bulk_create(rows, batch_size=5000)
+        self.stdout.write(f"🌱 {searches} recherches enregistrées en {time.perf_counter() - started:.1f}s")
+
+    def _product(self):
+        return Product(
+            owner_id=self.seller.pk,
+            title=' '.join(self.random.sample(self.vocabulary, 4)),
+            description=' '.join(self.random.sample(self.vocabulary, 15)),
+            unit_price=Decimal(self.random.randint(1, 6000)),
+            currency=self.random.choice(('DJF', 'USD')),
+            quantity=1,
+            category_id=self.random.choice(self.categories).pk,
+            city_ref_id=self.random.choice(self.cities).pk,
+        )
+
+    # --- Mesures ---
+    def _run(self, products, naive_sample):
+        sample = [self._product() for _ in range(products)]
+
+        timings, matches = [], 0
+        started = time.perf_counter()
+        for product in sample:
+            t0 = time.perf_counter()
+            matches += len(find_matches(product))
+            timings.append(time.perf_counter() - t0)
+        indexed = time.perf_counter() - started
+
+        # Référence : chaque annonce confrontée à toutes les recherches (déjà en mémoire)
+        everything = list(SavedSearch.objects.filter(is_active=True))
+        started = time.perf_counter()
+        for product in sample[:naive_sample]:
+            tokens = product_tokens(product)
+            [search for search in everything if search.user_id != product.owner_id and search_matches(search, product, tokens)]
+        naive = (time.perf_counter() - started) / max(min(naive_sample, products), 1)
+
+        timings.sort()
+        self.stdout.write(f"📊 Index inversé : {products / indexed:.0f} annonces/s "
+                          f"(p50 {statistics.median(timings) * 1000:.2f} ms, p99 {timings[int(len(timings) * 0.99) - 1] * 1000:.2f} ms), "
+                          f"{matches / products:.1f} correspondances par annonce")
+        self.stdout.write(f"📊 Parcours exhaustif : {1 / naive:.0f} annonces/s ({naive * 1000:.1f} ms par annonce, hors chargement)")
+        self.stdout.write(self.style.SUCCESS(f"⚡ Gain : x{naive / (indexed / products):.0f}"))
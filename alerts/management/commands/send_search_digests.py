@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from alerts.digests import send_digests
+
+
+class Command(BaseCommand):
+    help = "Envoie à chaque utilisateur un résumé des nouvelles annonces correspondant à ses recherches enregistrées"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help="Nombre d'utilisateurs traités par lot")
+
+    def handle(self, *args, **options):
+        emails, notified = send_digests(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"✅ {emails} résumés envoyés ({notified} correspondances)."))
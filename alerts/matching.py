@@ -0,0 +1,104 @@
+import re
+
+from cities.normalization import fold
+from .models import SavedSearch, SearchMatch
+
+# ==========================
+# 🔹 Clés d'index
+# ==========================
+# Une recherche est rangée sous une seule clé, la plus sélective de ses critères :
+#   't:<mot>'  son mot-clé le plus long (les mots longs sont les plus rares)
+#   'c:<id>'   sinon sa catégorie
+#   'v:<id>'   sinon sa ville
+#   '*'        sinon (aucun critère indexable : prix ou devise seuls)
+# Une annonce produit toutes ses clés possibles : une seule requête indexée (anchor IN ...)
+# ramène les recherches candidates, vérifiées ensuite critère par critère.
+ANY_ANCHOR = '*'
+MIN_TOKEN_LENGTH = 2
+# Taille des lots de clés par requête (limite de paramètres SQL)
+KEYS_PER_QUERY = 500
+
+_TOKEN_RE = re.compile(r'[a-z0-9]+')
+
+
+def tokenize(text):
+    """Mots normalisés (minuscules, sans accents) d'au moins MIN_TOKEN_LENGTH caractères."""
+    return {token for token in _TOKEN_RE.findall(fold(text or '')) if len(token) >= MIN_TOKEN_LENGTH}
+
+
+def anchor_for(search):
+    tokens = tokenize(search.keywords)
+    if tokens:
+        return 't:' + max(tokens, key=lambda token: (len(token), token))[:60]
+    if search.category_id:
+        return f'c:{search.category_id}'
+    if search.city_ref_id:
+        return f'v:{search.city_ref_id}'
+    return ANY_ANCHOR
+
+
+def product_tokens(product):
+    return tokenize(f"{product.title or ''} {product.description or ''}")
+
+
+def product_keys(product, tokens):
+    keys = [ANY_ANCHOR] + ['t:' + token[:60] for token in tokens]
+    if product.category_id:
+        keys.append(f'c:{product.category_id}')
+    if product.city_ref_id:
+        keys.append(f'v:{product.city_ref_id}')
+    return keys
+
+
+def search_matches(search, product, tokens):
+    """Vérifie tous les critères d'une recherche candidate."""
+    if search.category_id and search.category_id != product.category_id:
+        return False
+    if search.city_ref_id and search.city_ref_id != product.city_ref_id:
+        return False
+    if search.currency and search.currency != product.currency:
+        return False
+    if search.min_price is not None and product.unit_price < search.min_price:
+        return False
+    if search.max_price is not None and product.unit_price > search.max_price:
+        return False
+    return tokenize(search.keywords) <= tokens
+
+
+# ==========================
+# 🔹 Correspondances
+# ==========================
+CANDIDATE_FIELDS = ('id', 'user_id', 'category_id', 'city_ref_id', 'currency', 'min_price', 'max_price', 'keywords')
+
+
+def find_matches(product):
+    """
+    Recherches actives (d'autres utilisateurs que le vendeur) auxquelles l'annonce correspond,
+    sous forme de lignes légères (CANDIDATE_FIELDS) plutôt que d'instances du modèle.
+    Aucune écriture : utilisable sur une annonce non enregistrée.
+    """
+    tokens = product_tokens(product)
+    keys = product_keys(product, tokens)
+    matched = []
+    for start in range(0, len(keys), KEYS_PER_QUERY):
+        candidates = (
+            SavedSearch.objects.filter(is_active=True, anchor__in=keys[start:start + KEYS_PER_QUERY])
+            .exclude(user_id=product.owner_id)
+            .values_list(*CANDIDATE_FIELDS, named=True)
+        )
+        matched.extend(search for search in candidates if search_matches(search, product, tokens))
+    return matched
+
+
+def match_product(product):
+    """
+    Enregistre les correspondances d'une nouvelle annonce ; elles partiront au prochain résumé.
+    Retourne le nombre de recherches correspondantes.
+    """
+    matched = find_matches(product)
+    SearchMatch.objects.bulk_create(
+        [SearchMatch(saved_search_id=search.id, product_id=product.pk, user_id=search.user_id) for search in matched],
+        batch_size=1000,
+        ignore_conflicts=True,
+    )
+    return len(matched)
@@ -0,0 +1,59 @@
+# Generated by Django 5.2.18 on 2026-10-19 13:05
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('cities', '0001_initial'),
+        ('products', '0009_change_feed'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SavedSearch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(blank=True, help_text="Nom donné par l'utilisateur", max_length=100)),
+                ('currency', models.CharField(blank=True, choices=[('DJF', 'Franc Djiboutien'), ('USD', 'Dollar Américain')], max_length=3)),
+                ('min_price', models.DecimalField(blank=True, decimal_places=2, help_text='Prix unitaire minimal', max_digits=10, null=True)),
+                ('max_price', models.DecimalField(blank=True, decimal_places=2, help_text='Prix unitaire maximal', max_digits=10, null=True)),
+                ('keywords', models.CharField(blank=True, help_text='Mots-clés, tous requis', max_length=255)),
+                ('anchor', models.CharField(editable=False, help_text="Clé d'index (mot-clé, catégorie, ville ou '*')", max_length=64)),
+                ('is_active', models.BooleanField(default=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('category', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='products.category')),
+                ('city_ref', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='cities.city')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='saved_searches', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='SearchMatch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('notified_at', models.DateTimeField(blank=True, null=True)),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_matches', to='products.product')),
+                ('saved_search', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='matches', to='alerts.savedsearch')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='savedsearch',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['anchor'], name='saved_search_anchor_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='searchmatch',
+            index=models.Index(condition=models.Q(('notified_at__isnull', True)), fields=['user', 'created_at'], name='search_match_pending_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='searchmatch',
+            constraint=models.UniqueConstraint(fields=('saved_search', 'product'), name='search_match_unique'),
+        ),
+    ]
@@ -0,0 +1,63 @@
+from django.conf import settings
+from django.db import models
+from django.db.models import Q
+
+from products.models import Product
+
+
+class SavedSearch(models.Model):
+    """
+    Recherche enregistrée par un acheteur : il est averti des nouvelles annonces correspondantes.
+    Tous les critères renseignés doivent être satisfaits (mots-clés compris : tous présents).
+    `anchor` est la clé d'index la plus sélective de la recherche (voir alerts.matching) :
+    chaque nouvelle annonce n'est comparée qu'aux recherches ancrées sur l'une de ses clés.
+    """
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='saved_searches')
+    name = models.CharField(max_length=100, blank=True, help_text="Nom donné par l'utilisateur")
+
+    # --- Critères ---
+    category = models.ForeignKey('products.Category', on_delete=models.CASCADE, null=True, blank=True)
+    city_ref = models.ForeignKey('cities.City', on_delete=models.CASCADE, null=True, blank=True)
+    currency = models.CharField(max_length=3, choices=Product.CURRENCY_CHOICES, blank=True)
+    min_price = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True, help_text="Prix unitaire minimal")
+    max_price = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True, help_text="Prix unitaire maximal")
+    keywords = models.CharField(max_length=255, blank=True, help_text="Mots-clés, tous requis")
+
+    # --- Index inversé ---
+    anchor = models.CharField(max_length=64, editable=False, help_text="Clé d'index (mot-clé, catégorie, ville ou '*')")
+
+    is_active = models.BooleanField(default=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['anchor'], name='saved_search_anchor_idx', condition=Q(is_active=True)),
+        ]
+
+    def save(self, *args, **kwargs):
+        from .matching import anchor_for
+        self.anchor = anchor_for(self)
+        super().save(*args, **kwargs)
+
+    def __str__(self):
+        return self.name or f"Recherche {self.pk}"
+
+
+class SearchMatch(models.Model):
+    """
+    Annonce correspondant à une recherche enregistrée, en attente du prochain résumé (digest).
+    """
+    saved_search = models.ForeignKey(SavedSearch, on_delete=models.CASCADE, related_name='matches')
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='search_matches')
+    # Dénormalisé : les résumés sont regroupés par utilisateur sans jointure
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='+')
+    created_at = models.DateTimeField(auto_now_add=True)
+    notified_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['saved_search', 'product'], name='search_match_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['user', 'created_at'], name='search_match_pending_idx', condition=Q(notified_at__isnull=True)),
+        ]
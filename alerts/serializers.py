@@ -0,0 +1,62 @@
+from django.conf import settings
+from rest_framework import serializers
+
+from cities.index import city_index
+from .matching import tokenize
+from .models import SavedSearch
+
+
+class SavedSearchSerializer(serializers.ModelSerializer):
+    """
+    Sérialiseur des recherches enregistrées.
+    La ville est saisie en texte libre et rattachée à une ville connue.
+    """
+    city = serializers.CharField(required=False, allow_blank=True, write_only=True)
+    city_name = serializers.CharField(source='city_ref.name', read_only=True, default=None)
+
+    class Meta:
+        model = SavedSearch
+        fields = [
+            'id',
+            'name',
+            'category',
+            'city',
+            'city_name',
+            'currency',
+            'min_price',
+            'max_price',
+            'keywords',
+            'is_active',
+            'created_at',
+        ]
+        read_only_fields = ['created_at']
+
+    def validate_city(self, value):
+        if not value:
+            return None
+        entry = city_index.lookup(value)
+        if entry is None:
+            raise serializers.ValidationError("Ville inconnue.")
+        return entry['id']
+
+    def validate(self, attrs):
+        min_price = attrs.get('min_price', getattr(self.instance, 'min_price', None))
+        max_price = attrs.get('max_price', getattr(self.instance, 'max_price', None))
+        if min_price is not None and max_price is not None and min_price > max_price:
+            raise serializers.ValidationError("Le prix minimal doit être inférieur au prix maximal.")
+
+        category = attrs.get('category', getattr(self.instance, 'category', None))
+        city = attrs['city'] if 'city' in attrs else getattr(self.instance, 'city_ref_id', None)
+        keywords = attrs.get('keywords', getattr(self.instance, 'keywords', ''))
+        if not (category or city or tokenize(keywords)):
+            raise serializers.ValidationError("Indiquez au moins une catégorie, une ville ou un mot-clé.")
+
+        if self.instance is None:
+            user = self.context['request'].user
+            limit = getattr(settings, 'SAVED_SEARCH_MAX_PER_USER', 20)
+            if user.saved_searches.count() >= limit:
+                raise serializers.ValidationError(f"Vous ne pouvez pas enregistrer plus de {limit} recherches.")
+
+        if 'city' in attrs:
+            attrs['city_ref_id'] = attrs.pop('city')
+        return attrs
@@ -0,0 +1,16 @@
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from products.models import Product
+from .tasks import match_new_product
+
+
+# 🔹 Signal : une nouvelle annonce est confrontée aux recherches enregistrées
+@receiver(post_save, sender=Product)
+def match_saved_searches(sender, instance, created, **kwargs):
+    """
+    Mise en file dans la transaction de création : le worker ne voit la tâche qu'une fois
+    l'annonce validée (ville normalisée et catégorie définitives), sans ralentir la publication.
+    """
+    if created:
+        match_new_product.delay(instance.pk)
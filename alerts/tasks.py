@@ -0,0 +1,15 @@
+from products.models import Product
+from tasks.queue import task
+from .matching import match_product
+
+
+# 🔹 Tâche : une nouvelle annonce est confrontée aux recherches enregistrées
+@task(queue='alerts')
+def match_new_product(product_id):
+    """
+    Enregistre les correspondances d'une nouvelle annonce pour le prochain résumé.
+    L'annonce a pu être supprimée avant l'exécution : rien à faire dans ce cas.
+    """
+    product = Product.objects.filter(pk=product_id).first()
+    if product is not None:
+        match_product(product)
@@ -0,0 +1,19 @@
+from rest_framework import viewsets, permissions
+
+from .models import SavedSearch
+from .serializers import SavedSearchSerializer
+
+
+class SavedSearchViewSet(viewsets.ModelViewSet):
+    """
+    Recherches enregistrées de l'utilisateur connecté.
+    Les nouvelles annonces correspondantes lui sont envoyées par email, regroupées en résumés.
+    """
+    serializer_class = SavedSearchSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        return SavedSearch.objects.filter(user=self.request.user).select_related('city_ref').order_by('-created_at')
+
+    def perform_create(self, serializer):
+        serializer.save(user=self.request.user)
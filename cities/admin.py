@@ -0,0 +1,7 @@
+from django.contrib import admin
+from .models import City
+
+@admin.register(City)
+class CityAdmin(admin.ModelAdmin):
+    list_display = ('name', 'key')
+    search_fields = ('name', 'key')
@@ -0,0 +1,9 @@
+from django.apps import AppConfig
+
+class CitiesConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'cities'
+
+    def ready(self):
+        # Import des signaux quand l'application est prête
+        import cities.signals
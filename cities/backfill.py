@@ -0,0 +1,37 @@
+from collections import defaultdict
+
+from .normalization import normalize_city, display_name
+
+
+def backfill_city_refs(apps, model_label, batch_size=2000):
+    """
+    Rattache les lignes existantes d'un modèle (champ texte `city`) à des City normalisées.
+    Utilisable dans une migration (modèles historiques). Les lignes sont parcourues par
+    tranches de clés primaires et mises à jour par un UPDATE par ville et par tranche.
+    """
+    City = apps.get_model('cities', 'City')
+    Model = apps.get_model(model_label)
+
+    cities = {key: (pk, name) for pk, name, key in City.objects.values_list('pk', 'name', 'key')}
+    rows = Model.objects.exclude(city__isnull=True).exclude(city='').order_by('pk')
+
+    last_pk = 0
+    while True:
+        batch = list(rows.filter(pk__gt=last_pk).values_list('pk', 'city')[:batch_size])
+        if not batch:
+            break
+        last_pk = batch[-1][0]
+
+        pks_by_city = defaultdict(list)
+        for pk, raw_city in batch:
+            key = normalize_city(raw_city)
+            if not key:
+                continue
+            if key not in cities:
+                city = City.objects.create(key=key, name=display_name(raw_city))
+                cities[key] = (city.pk, city.name)
+            pks_by_city[key].append(pk)
+
+        for key, pks in pks_by_city.items():
+            city_id, name = cities[key]
+            Model.objects.filter(pk__in=pks).update(city_ref_id=city_id, city=name)
@@ -0,0 +1,98 @@
+import threading
+import time
+from bisect import bisect_left
+
+from django.core.cache import cache
+
+from .models import City
+from .normalization import normalize_city, display_name
+
+VERSION_CACHE_KEY = 'cities:version'
+
+
+def bump_version():
+    """Signale à tous les processus que la liste des villes a changé."""
+    try:
+        cache.incr(VERSION_CACHE_KEY)
+    except ValueError:
+        cache.set(VERSION_CACHE_KEY, 1, None)
+    city_index.invalidate()
+
+
+class CityPrefixIndex:
+    """
+    Index en mémoire des villes pour l'autocomplétion.
+    - Clés normalisées triées : une recherche par préfixe est une bisection + un parcours court.
+    - Reconstruit quand la version partagée dans le cache change (vérifiée au plus une fois par seconde).
+    """
+    refresh_interval = 1.0  # secondes
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # (clés triées, entrées alignées sur les clés, clé -> entrée)
+        self._data = ([], [], {})
+        self._version = None
+        self._checked_at = 0.0
+
+    def invalidate(self):
+        self._version = None
+
+    def _ensure_fresh(self):
+        now = time.monotonic()
+        if self._version is not None and now - self._checked_at < self.refresh_interval:
+            return
+        version = cache.get(VERSION_CACHE_KEY, 0)
+        self._checked_at = now
+        if version == self._version:
+            return
+        with self._lock:
+            if version != self._version:
+                self._rebuild()
+                self._version = version
+
+    def _rebuild(self):
+        keys, entries, by_key = [], [], {}
+        for pk, name, key in City.objects.order_by('key').values_list('pk', 'name', 'key'):
+            entry = {'id': pk, 'name': name}
+            keys.append(key)
+            entries.append(entry)
+            by_key[key] = entry
+        # Remplacement en une seule affectation : les lecteurs voient l'ancien ou le nouvel index
+        self._data = (keys, entries, by_key)
+
+    def lookup(self, value):
+        """Retourne l'entrée {id, name} de la ville correspondant à une saisie libre, ou None."""
+        self._ensure_fresh()
+        return self._data[2].get(normalize_city(value))
+
+    def search(self, prefix, limit=10):
+        """Retourne au plus `limit` villes dont la clé commence par le préfixe normalisé."""
+        self._ensure_fresh()
+        keys, entries, _ = self._data
+        prefix = normalize_city(prefix)
+        if not prefix:
+            return []
+        results = []
+        position = bisect_left(keys, prefix)
+        while position < len(keys) and len(results) < limit and keys[position].startswith(prefix):
+            results.append(entries[position])
+            position += 1
+        return results
+
+
+# Instance partagée par tous les threads du processus
+city_index = CityPrefixIndex()
+
+
+def resolve_city(value):
+    """
+    Retourne la City correspondant à une saisie libre (créée si elle n'existe pas), ou None.
+    """
+    key = normalize_city(value)
+    if not key:
+        return None
+    entry = city_index.lookup(value)
+    if entry is not None:
+        return City(pk=entry['id'], name=entry['name'], key=key)
+    city, _ = City.objects.get_or_create(key=key, defaults={'name': display_name(value)})
+    return city
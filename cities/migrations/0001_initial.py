@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='City',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('key', models.CharField(max_length=100, unique=True)),
+            ],
+            options={
+                'verbose_name': 'Ville',
+                'verbose_name_plural': 'Villes',
+                'ordering': ['name'],
+            },
+        ),
+    ]
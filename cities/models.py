@@ -0,0 +1,19 @@
+from django.db import models
+
+
+class City(models.Model):
+    """
+    Ville normalisée, référencée par les annonces et les utilisateurs.
+    - `name` : nom affiché (ex. 'Djibouti').
+    - `key` : clé normalisée sans accents ni variantes, unique (ex. 'djibouti').
+    """
+    name = models.CharField(max_length=100)
+    key = models.CharField(max_length=100, unique=True)
+
+    class Meta:
+        ordering = ['name']
+        verbose_name = "Ville"
+        verbose_name_plural = "Villes"
+
+    def __str__(self):
+        return self.name
@@ -0,0 +1,35 @@
+import unicodedata
+
+# Variantes connues ramenées à la même ville (clés déjà normalisées)
+CITY_ALIASES = {
+    'djibouti ville': 'djibouti',
+    'djib': 'djibouti',
+    'ville de djibouti': 'djibouti',
+}
+
+
+def fold(value):
+    """
+    Minuscules, sans accents, tirets et espaces multiples ramenés à un seul espace.
+    """
+    value = unicodedata.normalize('NFKD', value)
+    value = ''.join(char for char in value if not unicodedata.combining(char))
+    value = value.lower().replace('-', ' ').replace('_', ' ')
+    return ' '.join(value.split())
+
+
+def normalize_city(value):
+    """
+    Clé canonique d'une ville : « Djibouti », « djibouti  » et « Djibouti-ville » donnent « djibouti ».
+    Retourne une chaîne vide si la valeur est vide.
+    """
+    if not value:
+        return ''
+    key = fold(value)
+    return CITY_ALIASES.get(key, key)
+
+
+def display_name(value):
+    """Nom affiché pour une nouvelle ville à partir de la saisie de l'utilisateur."""
+    value = ' '.join(value.split())
+    return value.title() if value.islower() else value
@@ -0,0 +1,31 @@
+from django.conf import settings
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+
+from products.models import Product
+from .index import bump_version, resolve_city
+from .models import City
+
+
+# 🔹 Signal : toute modification des villes reconstruit l'index d'autocomplétion
+@receiver(post_save, sender=City)
+@receiver(post_delete, sender=City)
+def cities_changed(sender, **kwargs):
+    bump_version()
+
+
+# 🔹 Signal : la ville saisie librement est rattachée à une City normalisée
+@receiver(pre_save, sender=Product)
+@receiver(pre_save, sender=settings.AUTH_USER_MODEL)
+def attach_city(sender, instance, update_fields=None, **kwargs):
+    """
+    Résout `city` (texte libre) en clé étrangère `city_ref` et remplace le texte
+    par le nom canonique de la ville.
+    Avec update_fields, inclure 'city_ref' en plus de 'city'.
+    """
+    if update_fields is not None and 'city' not in update_fields:
+        return
+    city = resolve_city(instance.city)
+    instance.city_ref = city
+    if city is not None:
+        instance.city = city.name
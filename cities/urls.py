@@ -0,0 +1,6 @@
+from django.urls import path
+from .views import CityAutocompleteView
+
+urlpatterns = [
+    path('cities/autocomplete/', CityAutocompleteView.as_view(), name='city_autocomplete'),
+]
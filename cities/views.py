@@ -0,0 +1,22 @@
+from rest_framework import permissions
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .index import city_index
+
+
+# 🔹 Autocomplétion des villes
+class CityAutocompleteView(APIView):
+    """
+    Suggestions de villes par préfixe : /cities/autocomplete/?q=dji&limit=10
+    Répond depuis l'index en mémoire, sans requête SQL.
+    """
+    permission_classes = [permissions.AllowAny]
+    max_limit = 50
+
+    def get(self, request, *args, **kwargs):
+        try:
+            limit = min(int(request.query_params.get('limit', 10)), self.max_limit)
+        except ValueError:
+            limit = 10
+        return Response(city_index.search(request.query_params.get('q', ''), limit=max(limit, 1)))
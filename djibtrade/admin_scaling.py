@@ -0,0 +1,148 @@
+from django.conf import settings
+from django.contrib import admin, messages
+from django.contrib.admin import helpers
+from django.contrib.admin.views.main import ChangeList
+from django.core.paginator import Paginator
+from django.db import models, transaction
+from django.template.response import TemplateResponse
+from django.utils.functional import cached_property
+
+from .counting import cached_count, estimated_table_rows
+
+# Paramètre d'URL du curseur de pagination par clé (dernier identifiant affiché)
+CURSOR_VAR = 'cursor'
+
+
+# ==========================
+# 🔹 Comptages estimés
+# ==========================
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginateur de l'admin qui évite le COUNT(*) exact sur les grandes tables.
+    - Liste non filtrée : estimation du SGBD, si elle dépasse ADMIN_EXACT_COUNT_THRESHOLD.
+    - Sinon : comptage exact mis en cache (ADMIN_COUNT_CACHE_TIMEOUT, invalidé par la version de la table).
+    """
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if not queryset.query.where:
+            estimate = estimated_table_rows(queryset.model, queryset.db)
+            if estimate is not None and estimate > getattr(settings, 'ADMIN_EXACT_COUNT_THRESHOLD', 10000):
+                return estimate
+        return cached_count(queryset, getattr(settings, 'ADMIN_COUNT_CACHE_TIMEOUT', 60))
+
+
+# ==========================
+# 🔹 Pagination par clé
+# ==========================
+class KeysetChangeList(ChangeList):
+    """
+    Liste de l'admin paginée par clé (id < curseur) plutôt que par OFFSET.
+    Le coût d'une page reste constant, même très loin dans la liste.
+    Utilisée tant que la liste est triée par identifiant décroissant ;
+    un tri sur une autre colonne revient à la pagination classique.
+    """
+    keyset = False
+    next_cursor = None
+
+    def __init__(self, request, *args, **kwargs):
+        self.cursor = request.GET.get(CURSOR_VAR) or None
+        super().__init__(request, *args, **kwargs)
+
+    def get_filters_params(self, params=None):
+        lookup_params = super().get_filters_params(params)
+        lookup_params.pop(CURSOR_VAR, None)
+        return lookup_params
+
+    def uses_keyset(self, request):
+        # Tri effectif de la liste (celui de l'admin, éventuellement remplacé par ?o=)
+        return not self.show_all and set(self.queryset.query.order_by) == {'-pk'}
+
+    def get_results(self, request):
+        if not self.uses_keyset(request):
+            return super().get_results(request)
+
+        queryset = self.queryset
+        if self.cursor is not None:
+            try:
+                queryset = queryset.filter(pk__lt=int(self.cursor))
+            except ValueError:
+                self.cursor = None
+        # Une ligne de plus que la page : indique s'il existe une page suivante, sans comptage
+        rows = list(queryset[:self.list_per_page + 1])
+        has_next = len(rows) > self.list_per_page
+        self.result_list = rows[:self.list_per_page]
+        self.next_cursor = self.result_list[-1].pk if has_next else None
+
+        self.paginator = self.model_admin.get_paginator(request, self.queryset, self.list_per_page)
+        self.result_count = self.paginator.count
+        self.show_full_result_count = False
+        self.full_result_count = None
+        self.show_admin_actions = True
+        self.can_show_all = False
+        self.multi_page = has_next or self.cursor is not None
+        self.keyset = True
+
+    def first_page_url(self):
+        return self.get_query_string(remove=[CURSOR_VAR, 'p'])
+
+    def next_page_url(self):
+        return self.get_query_string({CURSOR_VAR: self.next_cursor}, remove=['p'])
+
+
+# ==========================
+# 🔹 Admin pour grandes tables
+# ==========================
+class ScalableAdminMixin:
+    """
+    Réglages de l'admin pour les tables volumineuses (annonces, utilisateurs).
+    - Clés étrangères chargées par jointure (list_select_related) et saisies par autocomplétion.
+    - Aucun COUNT(*) exact sur la table entière (show_full_result_count, paginateur estimé).
+    - Pagination par clé et actions groupées de mise à jour en une seule requête UPDATE.
+    - Suppression groupée confirmée sur une page qui n'affiche que le nombre d'objets (et les tables
+      supprimées en cascade), au lieu de la page par défaut qui liste chaque objet lié.
+      La suppression elle-même passe par l'ORM : cascades et signaux par ligne sont conservés.
+    """
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    ordering = ('-pk',)
+    list_per_page = 50
+
+    def get_changelist(self, request, **kwargs):
+        return KeysetChangeList
+
+    def get_actions(self, request):
+        # L'action par défaut construit une page de confirmation listant chaque objet lié
+        actions = super().get_actions(request)
+        actions.pop('delete_selected', None)
+        return actions
+
+    @admin.action(permissions=['delete'], description="Supprimer la sélection (suppression groupée)")
+    def delete_selected_bulk(self, request, queryset):
+        if request.POST.get('post') != 'yes':
+            return self._confirm_bulk_delete(request, queryset)
+        with transaction.atomic():
+            _, deleted = queryset.delete()
+        count = deleted.get(queryset.model._meta.label, 0)
+        self.message_user(request, f"{count} objet(s) supprimé(s).", messages.SUCCESS)
+
+    def _confirm_bulk_delete(self, request, queryset):
+        """Page de confirmation : un comptage, la liste des tables touchées en cascade, aucun objet chargé."""
+        opts = self.model._meta
+        cascades = sorted({
+            str(relation.related_model._meta.verbose_name_plural)
+            for relation in opts.related_objects
+            if relation.on_delete is models.CASCADE
+        })
+        context = {
+            **self.admin_site.each_context(request),
+            'title': "Confirmer la suppression groupée",
+            'opts': opts,
+            'count': queryset.count(),
+            'cascades': cascades,
+            'select_across': request.POST.get('select_across') == '1',
+            'selected': request.POST.getlist(helpers.ACTION_CHECKBOX_NAME),
+            'action_checkbox_name': helpers.ACTION_CHECKBOX_NAME,
+        }
+        return TemplateResponse(request, 'admin/delete_selected_bulk_confirmation.html', context)
@@ -1,6 +1,20 @@
-
 import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'djibtrade.settings')
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+# Import après l'initialisation de Django (modèles chargés)
+from products.streaming import STREAM_PATH, product_stream  # noqa: E402
+
+
+async def application(scope, receive, send):
+    """
+    Point d'entrée ASGI.
+    Le flux SSE des annonces est servi directement, sans la pile de middlewares :
+    une connexion inactive ne coûte qu'une coroutine en attente.
+    Tout le reste est traité par Django.
+    """
+    if scope['type'] == 'http' and scope['path'] == STREAM_PATH:
+        return await product_stream(scope, receive, send)
+    return await django_application(scope, receive, send)
@@ -0,0 +1,129 @@
+import hashlib
+import time
+from functools import partial
+
+import orjson
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections, transaction
+from django.db.models.signals import post_delete, post_save
+
+
+# ==========================
+# 🔹 Estimations du SGBD
+# ==========================
+def estimated_table_rows(model, using='default'):
+    """
+    Nombre de lignes d'une table d'après les statistiques du SGBD (aucun parcours de table).
+    Retourne None si le moteur ne fournit pas d'estimation.
+    """
+    connection = connections[using]
+    table = model._meta.db_table
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute("SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass", [table])
+        elif connection.vendor == 'mysql':
+            cursor.execute(
+                "SELECT table_rows FROM information_schema.tables WHERE table_schema = DATABASE() AND table_name = %s",
+                [table],
+            )
+        else:
+            return None
+        row = cursor.fetchone()
+    # reltuples vaut -1 tant que la table n'a jamais été analysée
+    return row[0] if row and row[0] is not None and row[0] >= 0 else None
+
+
+def estimated_query_rows(queryset):
+    """
+    Nombre de lignes d'une requête filtrée d'après le plan d'exécution (PostgreSQL uniquement).
+    Retourne None si le moteur ne fournit pas d'estimation.
+    """
+    if not queryset.query.where:
+        return estimated_table_rows(queryset.model, queryset.db)
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return None
+    sql, params = queryset.order_by().values('pk').query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, (str, bytes)):
+        plan = orjson.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+# ==========================
+# 🔹 Versions des tables
+# ==========================
+# Chaque écriture sur une table suivie change sa version : les comptages en cache
+# de l'ancienne version ne sont plus jamais lus et expirent d'eux-mêmes.
+def _version_key(model):
+    return f"table-version:{model._meta.label_lower}"
+
+
+def table_version(model):
+    # Version initiale horodatée : une clé évincée du cache ne fait pas réapparaître d'anciens comptages
+    return cache.get_or_set(_version_key(model), time.time_ns, None)
+
+
+def _incr_version(model):
+    try:
+        cache.incr(_version_key(model))
+    except ValueError:
+        cache.set(_version_key(model), time.time_ns(), None)
+
+
+def bump_table_version(model):
+    """
+    Change la version de la table après la validation de la transaction en cours :
+    un comptage lancé entre-temps ne peut pas être mis en cache sous la nouvelle version.
+    """
+    transaction.on_commit(partial(_incr_version, model))
+
+
+def track_table_versions(model, ignored_fields=()):
+    """
+    Incrémente la version de la table à chaque création, modification ou suppression d'une ligne,
+    sauf pour les enregistrements partiels ne touchant que `ignored_fields` (compteurs de vues...).
+    Les UPDATE groupés (queryset.update) doivent appeler bump_table_version eux-mêmes.
+    """
+    ignored_fields = frozenset(ignored_fields)
+
+    def on_save(sender, update_fields=None, **kwargs):
+        if update_fields is not None and set(update_fields) <= ignored_fields:
+            return
+        bump_table_version(sender)
+
+    def on_delete(sender, **kwargs):
+        bump_table_version(sender)
+
+    uid = f"table-version:{model._meta.label_lower}"
+    post_save.connect(on_save, sender=model, weak=False, dispatch_uid=uid)
+    post_delete.connect(on_delete, sender=model, weak=False, dispatch_uid=uid)
+
+
+# ==========================
+# 🔹 Comptages en cache
+# ==========================
+def count_cache_key(queryset):
+    """
+    Clé normalisée d'un comptage : table, version de la table et filtres SQL.
+    Le tri et les colonnes sélectionnées sont ignorés (ils ne changent pas le nombre de lignes).
+    """
+    sql, params = queryset.order_by().values('pk').query.sql_with_params()
+    digest = hashlib.blake2b(f"{sql}|{params}".encode(), digest_size=16).hexdigest()
+    return f"count:{queryset.model._meta.label_lower}:{table_version(queryset.model)}:{digest}"
+
+
+def cached_count(queryset, timeout=None):
+    """
+    COUNT(*) exact, mis en cache jusqu'à la prochaine écriture sur la table (ou l'expiration) :
+    recharger la liste, changer de page ou de tri ne relance pas le comptage.
+    """
+    key = count_cache_key(queryset)
+    count = cache.get(key)
+    if count is None:
+        count = queryset.count()
+        cache.set(key, count, timeout if timeout is not None else getattr(settings, 'COUNT_CACHE_TIMEOUT', 300))
+    return count
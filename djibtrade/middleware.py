@@ -0,0 +1,202 @@
+import hashlib
+import zlib
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+
+try:
+    import brotli
+except ImportError:  # Brotli est optionnel : on retombe sur gzip
+    brotli = None
+
+
+# Types déjà compressés : les recompresser coûte du CPU sans rien gagner
+INCOMPRESSIBLE_PREFIXES = ('image/', 'video/', 'audio/', 'font/woff')
+INCOMPRESSIBLE_TYPES = {
+    'application/zip',
+    'application/gzip',
+    'application/x-gzip',
+    'application/x-bzip2',
+    'application/x-7z-compressed',
+    'application/x-rar-compressed',
+    'application/pdf',
+    'application/octet-stream',
+    'application/wasm',
+}
+
+
+def parse_accept_encoding(header):
+    """
+    Retourne l'ensemble des encodages acceptés (q > 0) d'un en-tête Accept-Encoding.
+    """
+    accepted = set()
+    for part in header.split(','):
+        coding, _, params = part.strip().partition(';')
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params.split(';'):
+            key, _, value = param.strip().partition('=')
+            if key.strip().lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if quality > 0:
+            accepted.add(coding)
+    return accepted
+
+
+# ==========================
+# 🔹 Compresseurs
+# ==========================
+def _gzip_compressor(level):
+    # wbits=31 : format gzip (en-tête + CRC) au lieu de zlib brut
+    return zlib.compressobj(level, zlib.DEFLATED, 31)
+
+
+class _GzipStream:
+    def __init__(self, level):
+        self._obj = _gzip_compressor(level)
+
+    def process(self, chunk):
+        # Z_SYNC_FLUSH : le client reçoit chaque morceau sans attendre la fin du flux
+        return self._obj.compress(chunk) + self._obj.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        return self._obj.flush(zlib.Z_FINISH)
+
+
+class _BrotliStream:
+    def __init__(self, quality):
+        self._obj = brotli.Compressor(quality=quality)
+
+    def process(self, chunk):
+        return self._obj.process(chunk) + self._obj.flush()
+
+    def finish(self):
+        return self._obj.finish()
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    """
+    Compression des réponses de l'API.
+    - Brotli si le client l'accepte (et si le module est installé), gzip sinon.
+    - Seuil minimal de taille (COMPRESSION_MIN_SIZE) et types déjà compressés ignorés.
+    - Réponses en streaming (exports) compressées au fil de l'eau.
+    - Corps compressés des réponses cacheables mis en cache, indexés par empreinte du contenu,
+      pour ne pas recompresser la même page à chaque hit.
+    """
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        self.path_prefixes = tuple(getattr(settings, 'COMPRESSION_PATH_PREFIXES', ('/api/',)))
+        self.min_size = getattr(settings, 'COMPRESSION_MIN_SIZE', 512)
+        self.gzip_level = getattr(settings, 'COMPRESSION_GZIP_LEVEL', 6)
+        self.brotli_quality = getattr(settings, 'COMPRESSION_BROTLI_QUALITY', 5)
+        self.cache_alias = getattr(settings, 'COMPRESSION_CACHE_ALIAS', 'default')
+        self.cache_timeout = getattr(settings, 'COMPRESSION_CACHE_TIMEOUT', 300)
+
+    # --- Décisions ---
+    def choose_encoding(self, request):
+        accepted = parse_accept_encoding(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        if brotli is not None and 'br' in accepted:
+            return 'br'
+        if 'gzip' in accepted:
+            return 'gzip'
+        return None
+
+    def is_compressible(self, response):
+        if response.has_header('Content-Encoding'):
+            return False
+        content_type = response.get('Content-Type', '').split(';', 1)[0].strip().lower()
+        if content_type in INCOMPRESSIBLE_TYPES or content_type.startswith(INCOMPRESSIBLE_PREFIXES):
+            return False
+        return True
+
+    def is_cacheable(self, request, response):
+        if request.method not in ('GET', 'HEAD') or response.status_code != 200:
+            return False
+        cache_control = response.get('Cache-Control', '').lower()
+        return 'no-store' not in cache_control and 'private' not in cache_control
+
+    # --- Compression ---
+    def compress(self, encoding, content):
+        if encoding == 'br':
+            return brotli.compress(content, quality=self.brotli_quality)
+        compressor = _gzip_compressor(self.gzip_level)
+        return compressor.compress(content) + compressor.flush()
+
+    def stream_compressor(self, encoding):
+        if encoding == 'br':
+            return _BrotliStream(self.brotli_quality)
+        return _GzipStream(self.gzip_level)
+
+    def compress_cached(self, encoding, content):
+        cache = caches[self.cache_alias]
+        key = f"compression:{encoding}:{hashlib.blake2b(content, digest_size=20).hexdigest()}"
+        compressed = cache.get(key)
+        if compressed is None:
+            compressed = self.compress(encoding, content)
+            cache.set(key, compressed, self.cache_timeout)
+        return compressed
+
+    def compress_stream(self, encoding, iterator):
+        stream = self.stream_compressor(encoding)
+        for chunk in iterator:
+            data = stream.process(chunk)
+            if data:
+                yield data
+        yield stream.finish()
+
+    async def compress_async_stream(self, encoding, iterator):
+        stream = self.stream_compressor(encoding)
+        async for chunk in iterator:
+            data = stream.process(chunk)
+            if data:
+                yield data
+        yield stream.finish()
+
+    def process_response(self, request, response):
+        if not request.path.startswith(self.path_prefixes):
+            return response
+        if not response.streaming and len(response.content) < self.min_size:
+            return response
+        if not self.is_compressible(response):
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+
+        encoding = self.choose_encoding(request)
+        if encoding is None:
+            return response
+
+        if response.streaming:
+            # Référence figée au cas où streaming_content serait réassigné plus tard
+            original_iterator = response.streaming_content
+            if response.is_async:
+                response.streaming_content = self.compress_async_stream(encoding, original_iterator)
+            else:
+                response.streaming_content = self.compress_stream(encoding, original_iterator)
+            # Taille finale inconnue tant que le flux n'est pas terminé
+            del response.headers['Content-Length']
+        else:
+            if self.is_cacheable(request, response):
+                compressed = self.compress_cached(encoding, response.content)
+            else:
+                compressed = self.compress(encoding, response.content)
+            # On ne garde la version compressée que si elle est réellement plus petite
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response.headers['Content-Length'] = str(len(compressed))
+
+        # Un ETag fort devient faible (RFC 9110, section 8.8.1)
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        response.headers['Content-Encoding'] = encoding
+        return response
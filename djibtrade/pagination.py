@@ -0,0 +1,87 @@
+from django.conf import settings
+from django.core.paginator import EmptyPage, Page, PageNotAnInteger, Paginator
+from django.utils.functional import cached_property
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+
+from .counting import cached_count, estimated_query_rows
+
+
+class OpenEndedPage(Page):
+    """Page d'un total estimé : la page suivante existe si la page courante a été remplie."""
+
+    def __init__(self, object_list, number, paginator, has_more):
+        super().__init__(object_list, number, paginator)
+        self.has_more = has_more
+
+    def has_next(self):
+        return self.has_more
+
+
+class CachedCountPaginator(Paginator):
+    """
+    Paginateur dont le nombre total de résultats ne coûte pas un COUNT(*) à chaque requête.
+    - Au-delà de PAGINATION_EXACT_COUNT_THRESHOLD lignes estimées par le SGBD : estimation.
+    - Sinon : comptage exact, mis en cache par filtres normalisés et version de la table.
+    """
+
+    @cached_property
+    def _count_info(self):
+        queryset = self.object_list
+        estimate = estimated_query_rows(queryset)
+        if estimate is not None and estimate > getattr(settings, 'PAGINATION_EXACT_COUNT_THRESHOLD', 50000):
+            return estimate, False
+        return cached_count(queryset), True
+
+    @property
+    def count(self):
+        return self._count_info[0]
+
+    @property
+    def count_is_exact(self):
+        return self._count_info[1]
+
+    def validate_number(self, number):
+        if self.count_is_exact:
+            return super().validate_number(number)
+        # Total estimé : pas de borne supérieure, les pages au-delà de l'estimation restent accessibles
+        try:
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger("Le numéro de page n'est pas un entier.")
+        if number < 1:
+            raise EmptyPage("Le numéro de page est inférieur à 1.")
+        return number
+
+    def page(self, number):
+        if self.count_is_exact:
+            return super().page(number)
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        # Une ligne de plus que la page : indique s'il existe une page suivante
+        rows = list(self.object_list[bottom:bottom + self.per_page + 1])
+        if number > 1 and not rows:
+            raise EmptyPage("Cette page ne contient aucun résultat.")
+        return OpenEndedPage(rows[:self.per_page], number, self, has_more=len(rows) > self.per_page)
+
+
+class CachedCountPagination(PageNumberPagination):
+    """
+    Pagination par numéro de page (PAGE_SIZE global) avec comptage en cache ou estimé.
+    La réponse indique si `count` est exact (`count_exact`).
+    """
+    django_paginator_class = CachedCountPaginator
+
+    def get_paginated_response(self, data):
+        return Response({
+            'count': self.page.paginator.count,
+            'count_exact': self.page.paginator.count_is_exact,
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        response_schema = super().get_paginated_response_schema(schema)
+        response_schema['properties']['count_exact'] = {'type': 'boolean', 'example': True}
+        return response_schema
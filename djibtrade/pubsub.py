@@ -0,0 +1,239 @@
+import asyncio
+import logging
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+# Configuration du logger
+logger = logging.getLogger(__name__)
+
+# Message placé dans la file d'un abonné trop lent, à la place des messages perdus
+OVERFLOW = object()
+
+
+# ==========================
+# 🔹 Abonnements
+# ==========================
+class Subscription:
+    """
+    Abonnement d'un client à un ensemble de sujets.
+    File bornée (PUBSUB_QUEUE_SIZE) lue par la boucle asyncio du client : un abonné inactif
+    ne coûte qu'une file vide et une coroutine en attente.
+    Contre-pression : si le client ne lit pas assez vite, la file est vidée et remplacée
+    par OVERFLOW ; le client doit alors se resynchroniser (flux des changements).
+    """
+    __slots__ = ('topics', 'loop', 'queue', 'overflowed')
+
+    def __init__(self, topics, loop, maxsize):
+        self.topics = frozenset(topics)
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=maxsize)
+        self.overflowed = False
+
+    def put(self, message):
+        """Appelé dans la boucle du client uniquement."""
+        if self.overflowed:
+            return
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            self.overflowed = True
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(OVERFLOW)
+
+    async def get(self, timeout):
+        """Prochain message, ou None si rien n'est arrivé avant `timeout` secondes."""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+def _fan_out(subscriptions, message):
+    for subscription in subscriptions:
+        subscription.put(message)
+
+
+class Hub:
+    """
+    Diffusion en mémoire des messages d'un processus vers ses abonnés.
+    - publish() passe par le broker (local, ou Redis pour diffuser entre processus).
+    - deliver() est appelé par le broker, depuis n'importe quel thread : un seul
+      call_soon_threadsafe par boucle asyncio, quel que soit le nombre d'abonnés.
+    """
+
+    def __init__(self, broker_path=None):
+        self._lock = threading.Lock()
+        self._topics = defaultdict(set)
+        self._count = 0
+        self._broker = None
+        self._broker_path = broker_path
+
+    @property
+    def broker(self):
+        if self._broker is None:
+            path = self._broker_path or getattr(settings, 'PUBSUB_BROKER', 'djibtrade.pubsub.LocalBroker')
+            self._broker = import_string(path)(self)
+        return self._broker
+
+    @property
+    def subscriber_count(self):
+        return self._count
+
+    def has_subscribers(self, topic):
+        return bool(self._topics.get(topic))
+
+    def topics(self):
+        """Sujets ayant au moins un abonné dans ce processus."""
+        with self._lock:
+            return set(self._topics)
+
+    def subscribe(self, topics):
+        """À appeler depuis la boucle asyncio qui lira l'abonnement."""
+        subscription = Subscription(topics, asyncio.get_running_loop(), getattr(settings, 'PUBSUB_QUEUE_SIZE', 64))
+        with self._lock:
+            for topic in subscription.topics:
+                self._topics[topic].add(subscription)
+            self._count += 1
+        self.broker.start()
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            for topic in subscription.topics:
+                subscribers = self._topics.get(topic)
+                if subscribers is not None:
+                    subscribers.discard(subscription)
+                    if not subscribers:
+                        del self._topics[topic]
+            self._count -= 1
+
+    def publish(self, topic, message):
+        """Publie un message (bytes) sur un sujet, pour tous les processus selon le broker."""
+        self.broker.publish(topic, message)
+
+    def wants(self, topic):
+        """Indique s'il est utile de préparer un message pour ce sujet."""
+        return self.broker.wants(topic)
+
+    def deliver(self, topic, message):
+        with self._lock:
+            subscribers = list(self._topics.get(topic, ()))
+        by_loop = defaultdict(list)
+        for subscription in subscribers:
+            by_loop[subscription.loop].append(subscription)
+        for loop, subscriptions in by_loop.items():
+            try:
+                loop.call_soon_threadsafe(_fan_out, subscriptions, message)
+            except RuntimeError:
+                # Boucle fermée (arrêt du serveur) : ses abonnés disparaissent avec elle
+                for subscription in subscriptions:
+                    self.unsubscribe(subscription)
+
+
+# ==========================
+# 🔹 Brokers
+# ==========================
+class LocalBroker:
+    """Diffusion limitée au processus courant (un seul worker ASGI, développement)."""
+
+    def __init__(self, hub):
+        self.hub = hub
+
+    def start(self):
+        pass
+
+    def wants(self, topic):
+        return self.hub.has_subscribers(topic)
+
+    def publish(self, topic, message):
+        self.hub.deliver(topic, message)
+
+
+class RedisBroker:
+    """
+    Diffusion entre processus via Redis PUB/SUB.
+    Chaque processus qui a des abonnés s'abonne (un thread, une connexion) aux canaux des sujets suivis
+    localement et les distribue ; les processus sans abonnés (WSGI, commandes) ne font que publier.
+    Un canal par sujet (pas d'abonnement par motif) : PUBSUB NUMSUB compte alors les processus à l'écoute,
+    et wants() évite de sérialiser une annonce que personne ne lira.
+    - Les abonnements du thread d'écoute suivent ceux du hub au plus tard après `sync_interval`.
+    - La présence d'abonnés est mise en cache `presence_ttl` par sujet : un premier abonné peut manquer
+      les messages de cet intervalle (il se resynchronise par le flux des changements, comme après OVERFLOW).
+    """
+    prefix = 'pubsub:'
+    sync_interval = 0.5  # secondes
+    presence_ttl = 1.0  # secondes
+
+    def __init__(self, hub):
+        import redis
+
+        self.hub = hub
+        self.client = redis.Redis.from_url(getattr(settings, 'PUBSUB_REDIS_URL', None) or settings.REDIS_URL)
+        self._thread = None
+        self._start_lock = threading.Lock()
+        # sujet -> (expiration, abonnés présents) ; autant d'entrées que de sujets (catégories)
+        self._presence = {}
+
+    def start(self):
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._listen, name='pubsub-listener', daemon=True)
+                self._thread.start()
+
+    def wants(self, topic):
+        if self.hub.has_subscribers(topic):
+            return True
+        now = time.monotonic()
+        cached = self._presence.get(topic)
+        if cached is not None and cached[0] > now:
+            return cached[1]
+        try:
+            [(_, count)] = self.client.pubsub_numsub(self.prefix + topic)
+        except Exception as exc:
+            # Redis injoignable : publish() échouera aussi, mais sans présumer qu'il n'y a personne
+            logger.warning(f"⚠️ Présence des abonnés inconnue sur {topic} : {exc}")
+            return True
+        wanted = count > 0
+        self._presence[topic] = (now + self.presence_ttl, wanted)
+        return wanted
+
+    def publish(self, topic, message):
+        try:
+            self.client.publish(self.prefix + topic, message)
+        except Exception as exc:
+            logger.warning(f"⚠️ Publication impossible sur {topic} : {exc}")
+
+    def _sync_channels(self, pubsub, channels):
+        """Aligne les canaux écoutés sur les sujets des abonnés locaux ; retourne les canaux écoutés."""
+        wanted = {self.prefix + topic for topic in self.hub.topics()}
+        if wanted - channels:
+            pubsub.subscribe(*(wanted - channels))
+        if channels - wanted:
+            pubsub.unsubscribe(*(channels - wanted))
+        return wanted
+
+    def _listen(self):
+        delay = 1
+        while True:
+            try:
+                pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+                channels = set()
+                delay = 1
+                while True:
+                    channels = self._sync_channels(pubsub, channels)
+                    item = pubsub.get_message(timeout=self.sync_interval)
+                    if item is not None and item['type'] == 'message':
+                        self.hub.deliver(item['channel'].decode()[len(self.prefix):], item['data'])
+            except Exception as exc:
+                logger.warning(f"⚠️ Écoute Redis interrompue ({exc}), nouvelle tentative dans {delay}s")
+                time.sleep(delay)
+                delay = min(delay * 2, 30)
+
+
+# Hub partagé par toutes les connexions du processus
+hub = Hub()
@@ -0,0 +1,37 @@
+import orjson
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+
+# 🔹 Renderer JSON basé sur orjson
+class ORJSONRenderer(JSONRenderer):
+    """
+    Renderer JSON rapide basé sur orjson.
+    - Produit exactement les mêmes octets que le JSONRenderer de DRF en mode compact.
+    - Les types non natifs (datetime brut, Decimal, chaînes traduites...) passent
+      par l'encodeur de DRF pour garder le même format de sortie.
+    - Si une indentation est demandée (API navigable, ?indent=), on délègue au renderer standard.
+    """
+    options = (
+        orjson.OPT_NON_STR_KEYS
+        | orjson.OPT_PASSTHROUGH_DATETIME
+        | orjson.OPT_PASSTHROUGH_DATACLASS
+    )
+    _encoder = JSONEncoder()
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+
+        renderer_context = renderer_context or {}
+        if (
+            self.get_indent(accepted_media_type, renderer_context) is not None
+            or self.ensure_ascii
+            or not self.compact
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        ret = orjson.dumps(data, default=self._encoder.default, option=self.options)
+
+        # Comme DRF : on échappe \u2028 et \u2029 pour rester un sous-ensemble strict de JavaScript.
+        return ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
@@ -1,3 +1,4 @@
+import importlib.util
 import os
 from pathlib import Path
 from dotenv import load_dotenv
@@ -26,11 +27,16 @@ INSTALLED_APPS = [
     'accounts.apps.AccountsConfig',
     'products.apps.ProductsConfig',
     'subscriptions.apps.SubscriptionsConfig',
+    'mediastore.apps.MediastoreConfig',
+    'cities.apps.CitiesConfig',
+    'alerts.apps.AlertsConfig',
+    'tasks.apps.TasksConfig',
 ]
 
 # ==================== MIDDLEWARE ====================
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'djibtrade.middleware.CompressionMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -39,6 +45,14 @@ MIDDLEWARE = [
     'django.contrib.messages.middleware.MessageMiddleware',
 ]
 
+# ==================== COMPRESSION ====================
+COMPRESSION_PATH_PREFIXES = ('/api/',)
+COMPRESSION_MIN_SIZE = 512          # octets : en dessous, la compression ne vaut pas le coût
+COMPRESSION_GZIP_LEVEL = 6
+COMPRESSION_BROTLI_QUALITY = 5      # bon compromis CPU / taille pour du contenu dynamique
+COMPRESSION_CACHE_ALIAS = 'default'
+COMPRESSION_CACHE_TIMEOUT = 300     # secondes
+
 # ==================== TEMPLATES & URLs ====================
 ROOT_URLCONF = 'djibtrade.urls'
 
@@ -68,6 +82,23 @@ DATABASES = {
     }
 }
 
+# ==================== CACHE ====================
+# Redis est nécessaire pour partager le cache (throttling, compression...) entre plusieurs workers
+REDIS_URL = os.getenv('REDIS_URL')
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
 # ==================== AUTHENTIFICATION ====================
 AUTH_USER_MODEL = 'accounts.User'
 
@@ -78,6 +109,30 @@ AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.NumericPasswordValidator'},
 ]
 
+# Hachage des mots de passe : algorithme préféré 'argon2' (si argon2-cffi est installé) ou 'pbkdf2_sha256'.
+# Les mots de passe hachés avec un autre algorithme ou un autre coût sont recalculés à la connexion suivante.
+PASSWORD_HASHER = os.getenv('PASSWORD_HASHER', 'argon2' if importlib.util.find_spec('argon2') else 'pbkdf2_sha256')
+_CALIBRATED_HASHERS = {
+    'argon2': 'accounts.hashers.CalibratedArgon2PasswordHasher',
+    'pbkdf2_sha256': 'accounts.hashers.CalibratedPBKDF2PasswordHasher',
+}
+PASSWORD_HASHERS = [_CALIBRATED_HASHERS[PASSWORD_HASHER]] + [
+    path for algorithm, path in _CALIBRATED_HASHERS.items() if algorithm != PASSWORD_HASHER
+] + [
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+    'django.contrib.auth.hashers.ScryptPasswordHasher',
+]
+# Coût des hacheurs, calibré sur le serveur par `python manage.py calibrate_password_hasher`
+PASSWORD_HASHER_COST = {
+    'pbkdf2_sha256': {'iterations': int(os.getenv('PBKDF2_ITERATIONS', 1000000))},
+    'argon2': {
+        'time_cost': int(os.getenv('ARGON2_TIME_COST', 2)),
+        'memory_cost': int(os.getenv('ARGON2_MEMORY_COST', 102400)),  # Kio
+        'parallelism': int(os.getenv('ARGON2_PARALLELISM', 8)),
+    },
+}
+
 # ==================== INTERNATIONALISATION ====================
 LANGUAGE_CODE = 'fr-fr'
 TIME_ZONE = 'Africa/Djibouti'
@@ -90,6 +145,99 @@ STATIC_URL = '/static/'
 STATIC_ROOT = BASE_DIR / 'staticfiles'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
+# Adresse publique de l'API : URLs absolues des images construites hors requête (diffusion SSE)
+PUBLIC_BASE_URL = os.getenv('PUBLIC_BASE_URL', 'http://localhost:8000' if DEBUG else 'https://djibtrade.com')
+
+# Médias nommés par empreinte de contenu (dédupliqués, servis avec un cache immuable)
+STORAGES = {
+    'default': {'BACKEND': 'mediastore.storage.ContentAddressedStorage'},
+    'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+}
+
+# Envois d'images découpés et reprenables
+CHUNKED_UPLOAD_DIR = BASE_DIR / 'tmp' / 'uploads'
+CHUNKED_UPLOAD_MAX_SIZE = 10 * 1024 * 1024      # taille maximale d'une image (octets)
+CHUNKED_UPLOAD_CHUNK_SIZE = 1024 * 1024         # taille maximale d'un morceau (octets)
+CHUNKED_UPLOAD_CONTENT_TYPES = ('image/jpeg', 'image/png', 'image/webp', 'image/gif')
+CHUNKED_UPLOAD_EXPIRY = timedelta(hours=24)
+# Délai pendant lequel un contenu enregistré mais pas encore référencé n'est pas supprimé
+# (au moins la durée de vie d'un envoi terminé en attente de son annonce)
+MEDIA_CLAIM_GRACE = CHUNKED_UPLOAD_EXPIRY
+
+# Suggestions de titres (index en mémoire + instantané pour le démarrage des workers)
+SUGGEST_MAX_ENTRIES = 100000
+SUGGEST_MIN_PREFIX = 2
+SUGGEST_SNAPSHOT_PATH = BASE_DIR / 'tmp' / 'suggestions.json'
+# Vérification de la version partagée (titres ajoutés/retirés par d'autres processus) : retard maximal des suggestions
+SUGGEST_REFRESH_INTERVAL = 30  # secondes
+# Reconstruction au moins à cette fréquence : recale les poids (vues comptées dans d'autres processus)
+SUGGEST_MAX_AGE = 15 * 60  # secondes
+
+# Détection des annonces en double (MinHash/LSH) : 'flag' marque l'annonce, 'reject' la refuse
+DUPLICATE_POLICY = 'flag'
+DUPLICATE_SIMILARITY_THRESHOLD = 0.7
+
+# ==================== ADMIN ====================
+# Listes de l'admin sur les grandes tables : au-delà du seuil, le total affiché est l'estimation du SGBD
+ADMIN_EXACT_COUNT_THRESHOLD = 10000
+ADMIN_COUNT_CACHE_TIMEOUT = 60  # secondes
+
+# ==================== FLUX DES CHANGEMENTS ====================
+# /api/annonces/products/changes/ : synchronisation incrémentale des clients mobiles
+CHANGES_BATCH_SIZE = 100
+CHANGES_MAX_BATCH_SIZE = 500
+CHANGES_TOMBSTONE_RETENTION = timedelta(days=30)    # au-delà, un client en retard doit tout recharger
+
+# ==================== CYCLE DE VIE DES ANNONCES ====================
+# Les annonces expirées ou épuisées sont déplacées vers ArchivedProduct (commande archive_listings)
+LISTING_LIFETIME = timedelta(days=90)
+LISTING_EXPIRY_GRACE = timedelta(days=7)     # annonces existantes lors de l'ajout de l'expiration : délai minimal avant archivage
+LISTING_ARCHIVE_BATCH_SIZE = 500
+
+# ==================== INDICE DES PRIX ====================
+# /api/annonces/categories/<id>/price-index/ : agrégats quotidiens calculés par `rollup_price_index`
+PRICE_INDEX_DEFAULT_DAYS = 90
+PRICE_INDEX_MAX_DAYS = 731
+
+# ==================== MODÉRATION EN MASSE ====================
+# /api/annonces/products/moderate/ : identifiants acceptés par requête, annonces supprimées par lot
+MODERATION_MAX_IDS = 1000
+MODERATION_DELETE_BATCH_SIZE = 500
+
+# ==================== ANNONCES SIMILAIRES ====================
+# /api/annonces/products/<id>/similar/ : voisins précalculés par `build_similar_products`
+# (TF-IDF du titre et de la description, catégorie et ville ; similarité cosinus)
+SIMILAR_PRODUCTS_TOP_K = 10
+SIMILAR_PRODUCTS_MIN_SCORE = 0.05
+SIMILAR_PRODUCTS_CATEGORY_WEIGHT = 0.5
+SIMILAR_PRODUCTS_CITY_WEIGHT = 0.2
+# Mémoire allouée aux blocs de scores pendant le calcul
+SIMILAR_PRODUCTS_MEMORY_MB = 256
+
+# ==================== TEMPS RÉEL (SSE) ====================
+# Flux /api/annonces/products/stream/ servi par djibtrade/asgi.py.
+# Avec plusieurs processus ASGI, Redis relaie les messages entre eux.
+PUBSUB_BROKER = 'djibtrade.pubsub.RedisBroker' if REDIS_URL else 'djibtrade.pubsub.LocalBroker'
+PUBSUB_QUEUE_SIZE = 64              # messages en attente par abonné avant l'événement `overflow`
+PUBSUB_HEARTBEAT_INTERVAL = 15      # secondes entre deux `: ping`
+PUBSUB_MAX_SUBSCRIBERS = 10000      # connexions simultanées par processus
+PUBSUB_MAX_TOPICS = 50              # catégories par connexion
+
+# ==================== ALERTES DE RECHERCHE ====================
+# Recherches enregistrées : correspondances envoyées en résumés (commande send_search_digests)
+SAVED_SEARCH_MAX_PER_USER = 20
+SAVED_SEARCH_DIGEST_MAX_ITEMS = 20      # annonces listées par email
+
+# ==================== TÂCHES EN ARRIÈRE-PLAN ====================
+# File stockée en base, exécutée par `python manage.py run_worker`.
+# TASKS_EAGER=True exécute les tâches dans le processus web après le commit (développement sans worker).
+TASKS_EAGER = os.getenv('TASKS_EAGER', 'False') == 'True'
+TASKS_WORKER_CONCURRENCY = int(os.getenv('TASKS_WORKER_CONCURRENCY', 4))
+TASKS_POLL_INTERVAL = 1             # secondes d'attente quand la file est vide
+TASKS_MAX_ATTEMPTS = 5              # au-delà : file des lettres mortes (statut `dead`)
+TASKS_RETRY_BASE_DELAY = 10         # secondes, doublées à chaque échec
+TASKS_RETRY_MAX_DELAY = 3600
+TASKS_VISIBILITY_TIMEOUT = 600      # secondes avant de remettre en file la tâche d'un worker disparu
 
 # ==================== CORS ====================
 CORS_ALLOW_ALL_ORIGINS = DEBUG
@@ -106,10 +254,51 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticatedOrReadOnly',
     ),
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
-    'PAGE_SIZE': 20
+    'DEFAULT_RENDERER_CLASSES': (
+        'djibtrade.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
+    'DEFAULT_PAGINATION_CLASS': 'djibtrade.pagination.CachedCountPagination',
+    'PAGE_SIZE': 20,
+    'DEFAULT_THROTTLE_CLASSES': (
+        'djibtrade.throttling.ScopedTokenBucketThrottle',
+    ),
+    # Nombre de proxys de confiance devant l'application (nginx, load balancer) : l'adresse du client
+    # est lue à cette position dans X-Forwarded-For. 0 : adresse de la connexion (REMOTE_ADDR),
+    # l'en-tête envoyé par le client est ignoré et ne permet pas de changer de seau.
+    'NUM_PROXIES': int(os.getenv('NUM_PROXIES', 0)),
+    'DEFAULT_THROTTLE_RATES': {
+        'register': '10/hour',
+        'login': '20/min',
+        'login_email': '30/hour',
+        'product_retrieve': '120/min',
+        'django-rest-passwordreset-request-token': '5/hour',
+        'django-rest-passwordreset-validate-token': '20/hour',
+        'django-rest-passwordreset-confirm': '10/hour',
+    },
 }
 
+# Rafales autorisées par scope (par défaut : le nombre de requêtes du débit)
+THROTTLE_BURSTS = {
+    'register': 3,
+    'login': 5,
+    'login_email': 10,
+    'product_retrieve': 30,
+    'django-rest-passwordreset-request-token': 2,
+}
+THROTTLE_CACHE_ALIAS = 'default'
+# Désactive toutes les limites : réservé au serveur local lancé par `loadtest --no-throttle`
+THROTTLE_DISABLED = os.getenv('THROTTLE_DISABLED') == 'True'
+DJANGO_REST_PASSWORDRESET_THROTTLE_CLASSES = ('djibtrade.throttling.ScopedTokenBucketThrottle',)
+
+# Comptages des listes paginées : mis en cache par filtres et version de la table,
+# estimés par le SGBD au-delà du seuil (la réponse l'indique via `count_exact`)
+PAGINATION_EXACT_COUNT_THRESHOLD = 50000
+COUNT_CACHE_TIMEOUT = 300  # secondes
+
+# Chemin rapide (values_list + convertisseurs précompilés) pour les listes produits/catégories
+FAST_LIST_SERIALIZATION = os.getenv('FAST_LIST_SERIALIZATION') == 'True'
+
 # ==================== JWT ====================
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(days=1),
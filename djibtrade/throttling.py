@@ -0,0 +1,177 @@
+import hashlib
+import math
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.redis import RedisCache
+from django.core.exceptions import ImproperlyConfigured
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+
+def parse_rate(rate):
+    """
+    Convertit un débit au format DRF ('10/min', '5/hour'...) en (nombre, durée en secondes).
+    """
+    num, period = rate.split('/')
+    duration = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}[period[0]]
+    return int(num), duration
+
+
+# ==========================
+# 🔹 Seaux à jetons (algorithme GCRA)
+# ==========================
+# Le seau est représenté par une seule valeur : l'instant théorique (TAT) où il sera de nouveau plein.
+# Chaque requête avance le TAT d'un intervalle ; elle est refusée si le TAT dépasse « maintenant + capacité ».
+# Script Lua : lecture, décision et écriture en un seul aller-retour atomique vers Redis.
+GCRA_SCRIPT = """
+local now = redis.call('TIME')
+now = tonumber(now[1]) + tonumber(now[2]) / 1000000
+local interval = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local tat = tonumber(redis.call('GET', KEYS[1]) or '0')
+if tat < now then tat = now end
+local new_tat = tat + interval
+local excess = new_tat - now - capacity
+if excess > 0 then
+    return {0, tostring(excess)}
+end
+redis.call('SET', KEYS[1], tostring(new_tat), 'PX', math.ceil((new_tat - now) * 1000))
+return {1, '0'}
+"""
+
+
+class RedisTokenBucket:
+    """Seau partagé entre tous les workers via Redis (un seul aller-retour par requête)."""
+
+    def __init__(self, cache):
+        self.cache = cache
+        self.script = cache._cache.get_client(write=True).register_script(GCRA_SCRIPT)
+
+    def consume(self, key, interval, capacity):
+        allowed, wait = self.script(keys=[self.cache.make_and_validate_key(key)], args=[interval, capacity])
+        return bool(allowed), float(wait)
+
+
+class CacheTokenBucket:
+    """
+    Seau stocké dans n'importe quel cache Django.
+    L'atomicité n'est garantie qu'au sein du processus (verrou local) : adapté au cache mémoire
+    local et au développement ; en production multi-processus, utiliser Redis.
+    """
+
+    def __init__(self, cache):
+        self.cache = cache
+        self.lock = threading.Lock()
+
+    def consume(self, key, interval, capacity):
+        with self.lock:
+            now = time.time()
+            tat = max(self.cache.get(key, 0.0), now)
+            new_tat = tat + interval
+            excess = new_tat - now - capacity
+            if excess > 0:
+                return False, excess
+            self.cache.set(key, new_tat, math.ceil(new_tat - now))
+            return True, 0.0
+
+
+_buckets = {}
+
+
+def get_bucket(alias):
+    if alias not in _buckets:
+        cache = caches[alias]
+        _buckets[alias] = RedisTokenBucket(cache) if isinstance(cache, RedisCache) else CacheTokenBucket(cache)
+    return _buckets[alias]
+
+
+# ==========================
+# 🔹 Throttles DRF
+# ==========================
+class TokenBucketThrottle(BaseThrottle):
+    """
+    Limitation de débit par seau à jetons, état partagé dans le cache.
+    - Débit par scope : REST_FRAMEWORK['DEFAULT_THROTTLE_RATES'] (ex. '10/min').
+    - Rafale autorisée : THROTTLE_BURSTS[scope] (par défaut, le nombre du débit).
+    - En cas de refus, DRF renvoie 429 avec l'en-tête Retry-After calculé par wait().
+    - THROTTLE_DISABLED : aucune limite (serveur lancé par `loadtest --no-throttle`).
+    """
+    scope = None
+    cache_format = 'throttle:%(scope)s:%(ident)s'
+
+    def __init__(self, scope=None):
+        if scope is not None:
+            self.scope = scope
+        self.retry_after = None
+
+    def get_scope(self, view):
+        return self.scope
+
+    def get_cache_key(self, request, scope):
+        if request.user and request.user.is_authenticated:
+            ident = f"user-{request.user.pk}"
+        else:
+            ident = self.get_ident(request)
+        return self.cache_format % {'scope': scope, 'ident': ident}
+
+    def get_rate(self, scope):
+        try:
+            rate = api_settings.DEFAULT_THROTTLE_RATES[scope]
+        except KeyError:
+            raise ImproperlyConfigured(f"Aucun débit défini pour le scope '{scope}'.")
+        num, duration = parse_rate(rate)
+        burst = getattr(settings, 'THROTTLE_BURSTS', {}).get(scope, num)
+        return duration / num, burst
+
+    def allow_request(self, request, view):
+        if getattr(settings, 'THROTTLE_DISABLED', False):
+            return True
+        scope = self.get_scope(view)
+        if scope is None:
+            return True
+        key = self.get_cache_key(request, scope)
+        if key is None:
+            return True
+
+        interval, burst = self.get_rate(scope)
+        bucket = get_bucket(getattr(settings, 'THROTTLE_CACHE_ALIAS', 'default'))
+        allowed, self.retry_after = bucket.consume(key, interval, burst * interval)
+        return allowed
+
+    def wait(self):
+        return self.retry_after
+
+
+class ScopedTokenBucketThrottle(TokenBucketThrottle):
+    """Utilise l'attribut `throttle_scope` de la vue ; sans scope, aucune limitation."""
+
+    def get_scope(self, view):
+        return getattr(view, 'throttle_scope', None)
+
+
+class AnonTokenBucketThrottle(TokenBucketThrottle):
+    """Ne limite que les visiteurs anonymes (identifiés par leur adresse IP)."""
+
+    def get_cache_key(self, request, scope):
+        if request.user and request.user.is_authenticated:
+            return None
+        return super().get_cache_key(request, scope)
+
+
+class LoginEmailThrottle(TokenBucketThrottle):
+    """
+    Tentatives de connexion par compte visé (email soumis), quelle que soit l'adresse d'origine :
+    complète la limite par adresse IP contre les attaques réparties sur de nombreuses adresses.
+    """
+    scope = 'login_email'
+
+    def get_cache_key(self, request, scope):
+        email = request.data.get('email') if hasattr(request.data, 'get') else None
+        if not isinstance(email, str) or not email.strip():
+            return None
+        # Empreinte : pas d'adresse email en clair dans le cache
+        ident = hashlib.sha256(email.strip().lower().encode()).hexdigest()
+        return self.cache_format % {'scope': scope, 'ident': f"email-{ident}"}
@@ -1,5 +1,7 @@
+from django.conf import settings
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, re_path, include
+from mediastore.views import serve_media
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -7,4 +9,9 @@ urlpatterns = [
     path('api/annonces/', include('products.urls')),
     # path('api/', include('messaging.urls')),  # ← SUPPRIMÉ
     path('api/', include('subscriptions.urls')),
+    path('api/', include('mediastore.urls')),
+    path('api/', include('cities.urls')),
+    path('api/', include('alerts.urls')),
+    path('api/', include('tasks.urls')),
+    re_path(rf"^{settings.MEDIA_URL.lstrip('/')}(?P<path>.*)$", serve_media, name='media'),
 ]
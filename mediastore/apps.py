@@ -0,0 +1,9 @@
+from django.apps import AppConfig
+
+class MediastoreConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'mediastore'
+
+    def ready(self):
+        # Branche le comptage de références sur les champs fichiers suivis
+        import mediastore.signals
@@ -0,0 +1,26 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from mediastore.models import UploadSession
+from mediastore.tasks import delete_orphan_file
+
+
+class Command(BaseCommand):
+    help = "Supprime les envois découpés abandonnés ou jamais rattachés à une annonce"
+
+    def handle(self, *args, **kwargs):
+        limit = timezone.now() - settings.CHUNKED_UPLOAD_EXPIRY
+        expired = UploadSession.objects.filter(updated_at__lt=limit)
+
+        purged = 0
+        for session in expired.iterator():
+            session.partial_path.unlink(missing_ok=True)
+            # Fichier terminé mais jamais utilisé : supprimé s'il n'est référencé nulle part
+            # (sous le verrou de sa ligne StoredFile, comme pour la tâche de suppression des orphelins)
+            if session.file_name:
+                delete_orphan_file(session.file_name)
+            purged += 1
+        expired.delete()
+
+        self.stdout.write(self.style.SUCCESS(f"✅ {purged} envois expirés supprimés."))
@@ -0,0 +1,45 @@
+from collections import Counter
+
+from django.apps import apps
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from mediastore.models import StoredFile
+from mediastore.signals import TRACKED_FILE_FIELDS
+from mediastore.tasks import delete_orphan_file
+
+
+class Command(BaseCommand):
+    help = "Recalcule les compteurs de références des fichiers médias à partir des champs suivis"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--delete-orphans', action='store_true', help="Supprime aussi les fichiers qui ne sont plus référencés")
+
+    def handle(self, *args, **options):
+        counts = Counter()
+        for model_label, field_name in TRACKED_FILE_FIELDS:
+            model = apps.get_model(model_label)
+            names = model._default_manager.exclude(**{field_name: ''}).exclude(**{f'{field_name}__isnull': True})
+            counts.update(names.values_list(field_name, flat=True).iterator(chunk_size=2000))
+
+        with transaction.atomic():
+            existing = dict(StoredFile.objects.values_list('name', 'refcount'))
+            to_create = [StoredFile(name=name, refcount=count) for name, count in counts.items() if name not in existing]
+            StoredFile.objects.bulk_create(to_create, batch_size=1000)
+
+            corrected = 0
+            for name, refcount in existing.items():
+                expected = counts.get(name, 0)
+                if refcount != expected:
+                    StoredFile.objects.filter(name=name).update(refcount=expected)
+                    corrected += 1
+
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ {len(to_create)} fichiers ajoutés, {corrected} compteurs corrigés."
+        ))
+
+        if options['delete_orphans']:
+            orphans = list(StoredFile.objects.filter(refcount=0).values_list('name', flat=True))
+            # Même chemin que la tâche : ligne verrouillée, contenus réservés récemment épargnés
+            deleted = sum(1 for name in orphans if delete_orphan_file(name))
+            self.stdout.write(self.style.WARNING(f"🗑️ {deleted} fichiers orphelins supprimés."))
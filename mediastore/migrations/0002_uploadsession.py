@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:47
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mediastore', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UploadSession',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('filename', models.CharField(help_text="Nom du fichier d'origine", max_length=255)),
+                ('content_type', models.CharField(help_text='Type MIME annoncé', max_length=100)),
+                ('size', models.PositiveBigIntegerField(help_text='Taille totale annoncée (octets)')),
+                ('offset', models.PositiveBigIntegerField(default=0, help_text='Octets déjà reçus')),
+                ('status', models.CharField(choices=[('pending', 'En cours'), ('complete', 'Terminé')], default='pending', max_length=10)),
+                ('file_name', models.CharField(blank=True, help_text="Nom du fichier stocké une fois l'envoi terminé", max_length=255)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('owner', models.ForeignKey(help_text='Utilisateur qui envoie le fichier.', on_delete=django.db.models.deletion.CASCADE, related_name='upload_sessions', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Envoi en cours',
+                'verbose_name_plural': 'Envois en cours',
+                'indexes': [models.Index(fields=['status', 'updated_at'], name='mediastore__status_879874_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 13:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mediastore', '0002_uploadsession'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='storedfile',
+            name='claimed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,68 @@
+import uuid
+from pathlib import Path
+
+from django.conf import settings
+from django.db import models
+
+
+class StoredFile(models.Model):
+    """
+    Fichier adressé par son contenu, partagé entre plusieurs enregistrements.
+    - `name` : chemin relatif dans le stockage (contient l'empreinte SHA-256).
+    - `refcount` : nombre de champs fichiers (Product.image, User.logo...) qui le référencent.
+    - `claimed_at` : dernier enregistrement du contenu par le stockage ; un contenu réservé récemment
+      n'est pas encore rattaché à un enregistrement et n'est pas traité comme orphelin.
+    Le fichier physique est supprimé quand le compteur retombe à zéro.
+    """
+    name = models.CharField(max_length=255, unique=True)
+    size = models.PositiveBigIntegerField(default=0)
+    refcount = models.PositiveIntegerField(default=0)
+    claimed_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Fichier stocké"
+        verbose_name_plural = "Fichiers stockés"
+
+    def __str__(self):
+        return f"{self.name} ({self.refcount})"
+
+
+class UploadSession(models.Model):
+    """
+    Envoi d'image découpé en morceaux et reprenable.
+    Les morceaux sont écrits directement dans un fichier partiel ; `offset` indique
+    combien d'octets ont déjà été reçus, ce qui permet de reprendre après une coupure.
+    """
+    STATUS_CHOICES = [
+        ('pending', 'En cours'),
+        ('complete', 'Terminé'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    owner = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='upload_sessions',
+        help_text="Utilisateur qui envoie le fichier."
+    )
+    filename = models.CharField(max_length=255, help_text="Nom du fichier d'origine")
+    content_type = models.CharField(max_length=100, help_text="Type MIME annoncé")
+    size = models.PositiveBigIntegerField(help_text="Taille totale annoncée (octets)")
+    offset = models.PositiveBigIntegerField(default=0, help_text="Octets déjà reçus")
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    file_name = models.CharField(max_length=255, blank=True, help_text="Nom du fichier stocké une fois l'envoi terminé")
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Envoi en cours"
+        verbose_name_plural = "Envois en cours"
+        indexes = [models.Index(fields=['status', 'updated_at'])]
+
+    def __str__(self):
+        return f"{self.filename} ({self.offset}/{self.size})"
+
+    @property
+    def partial_path(self):
+        return Path(settings.CHUNKED_UPLOAD_DIR) / f"{self.pk}.part"
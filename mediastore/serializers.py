@@ -0,0 +1,32 @@
+from django.conf import settings
+from rest_framework import serializers
+from .models import UploadSession
+from .uploads import UploadError, validate_declaration
+
+
+class UploadSessionSerializer(serializers.ModelSerializer):
+    """
+    Sérialiseur des envois découpés.
+    - À la création, le client annonce le nom, le type MIME et la taille totale.
+    - `offset` indique où reprendre l'envoi.
+    """
+    chunk_size = serializers.SerializerMethodField(read_only=True)
+
+    class Meta:
+        model = UploadSession
+        fields = ['id', 'filename', 'content_type', 'size', 'offset', 'status', 'chunk_size', 'created_at']
+        read_only_fields = ['id', 'offset', 'status', 'created_at']
+
+    def get_chunk_size(self, obj):
+        """Taille maximale d'un morceau acceptée par le serveur."""
+        return settings.CHUNKED_UPLOAD_CHUNK_SIZE
+
+    def validate(self, attrs):
+        """
+        Validation au plus tôt du type et de la taille annoncés.
+        """
+        try:
+            validate_declaration(attrs['content_type'], attrs['size'])
+        except UploadError as e:
+            raise serializers.ValidationError(str(e))
+        return attrs
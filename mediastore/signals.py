@@ -0,0 +1,123 @@
+import logging
+from collections import Counter
+
+from django.apps import apps
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.db.models.signals import post_init, post_save, post_delete
+
+from .models import StoredFile
+from .tasks import delete_orphan_file
+
+# Configuration du logger
+logger = logging.getLogger(__name__)
+
+# 🔹 Champs fichiers dont les références sont comptées
+TRACKED_FILE_FIELDS = (
+    ('products.Product', 'image'),
+    ('products.ArchivedProduct', 'image'),
+    ('accounts.User', 'logo'),
+)
+
+
+def _file_name(instance, field_name):
+    value = getattr(instance, field_name)
+    return value.name if value else ''
+
+
+def _file_size(field_file):
+    try:
+        return field_file.size
+    except (OSError, ValueError):
+        return 0
+
+
+def incref(name, size=0):
+    """Ajoute une référence vers `name` (crée l'entrée si besoin)."""
+    if StoredFile.objects.filter(name=name).update(refcount=F('refcount') + 1):
+        return
+    try:
+        with transaction.atomic():
+            StoredFile.objects.create(name=name, size=size, refcount=1)
+    except IntegrityError:
+        # Créé entre-temps par une autre requête
+        StoredFile.objects.filter(name=name).update(refcount=F('refcount') + 1)
+
+
+def decref(name):
+    """
+    Retire une référence vers `name`. Le fichier orphelin est supprimé en arrière-plan
+    une fois la transaction validée (rien n'est perdu en cas de rollback).
+    """
+    StoredFile.objects.filter(name=name, refcount__gt=0).update(refcount=F('refcount') - 1)
+    delete_orphan_file.delay(name)
+
+
+def decref_many(names):
+    """Retire plusieurs références d'un coup (suppression en masse sans signaux) : un UPDATE par fichier."""
+    for name, count in Counter(name for name in names if name).items():
+        StoredFile.objects.filter(name=name).update(refcount=Greatest(F('refcount') - count, 0))
+        delete_orphan_file.delay(name)
+
+
+def _remember_files(sender, instance, field_names, **kwargs):
+    # Les champs différés ne sont pas chargés : on ne déclenche pas de requête pour eux
+    instance._tracked_files = {
+        field_name: _file_name(instance, field_name)
+        for field_name in field_names
+        if field_name in instance.__dict__
+    }
+
+
+def _files_saved(sender, instance, field_names, created=False, update_fields=None, **kwargs):
+    # Une nouvelle instance ne référençait encore aucun fichier
+    previous = {} if created else getattr(instance, '_tracked_files', {})
+    for field_name in field_names:
+        if update_fields is not None and field_name not in update_fields:
+            continue
+        if field_name not in instance.__dict__:
+            continue
+        old_name = previous.get(field_name, '')
+        new_name = _file_name(instance, field_name)
+        if old_name == new_name:
+            continue
+        field_file = getattr(instance, field_name)
+        if new_name:
+            incref(new_name, size=_file_size(field_file))
+        if old_name:
+            decref(old_name)
+        previous[field_name] = new_name
+    instance._tracked_files = previous
+
+
+def _files_deleted(sender, instance, field_names, **kwargs):
+    for field_name in field_names:
+        name = _file_name(instance, field_name)
+        if name:
+            decref(name)
+
+
+def connect_tracked_fields():
+    fields_by_model = {}
+    for model_label, field_name in TRACKED_FILE_FIELDS:
+        fields_by_model.setdefault(apps.get_model(model_label), []).append(field_name)
+
+    for model, field_names in fields_by_model.items():
+        uid = f"mediastore:{model._meta.label}"
+
+        def remember(sender, instance, field_names=tuple(field_names), **kwargs):
+            _remember_files(sender, instance, field_names, **kwargs)
+
+        def saved(sender, instance, field_names=tuple(field_names), **kwargs):
+            _files_saved(sender, instance, field_names, **kwargs)
+
+        def deleted(sender, instance, field_names=tuple(field_names), **kwargs):
+            _files_deleted(sender, instance, field_names, **kwargs)
+
+        post_init.connect(remember, sender=model, weak=False, dispatch_uid=uid)
+        post_save.connect(saved, sender=model, weak=False, dispatch_uid=uid)
+        post_delete.connect(deleted, sender=model, weak=False, dispatch_uid=uid)
+
+
+connect_tracked_fields()
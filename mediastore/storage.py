@@ -0,0 +1,103 @@
+import hashlib
+import os
+import posixpath
+import re
+import tempfile
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
+from django.db import transaction
+from django.utils import timezone
+from django.utils.deconstruct import deconstructible
+
+
+# Nom produit par ContentAddressedStorage : <dossier>/<2 hex>/<sha256>.<ext>
+CONTENT_ADDRESSED_NAME = re.compile(r'(?:^|/)[0-9a-f]{2}/[0-9a-f]{64}(?:\.[a-z0-9]+)?$')
+
+
+def is_content_addressed(name):
+    """Indique si un nom de fichier a été produit par ContentAddressedStorage."""
+    return bool(CONTENT_ADDRESSED_NAME.search(name))
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    Stockage sur disque qui nomme chaque fichier par l'empreinte SHA-256 de son contenu.
+    - Deux envois identiques aboutissent au même fichier : aucune copie supplémentaire sur disque.
+    - Le dossier `upload_to` du champ est conservé (products/, logos/).
+    - Un nom ne désigne jamais deux contenus différents : les URLs peuvent être mises en cache indéfiniment.
+    """
+    chunk_size = 64 * 1024
+
+    def get_available_name(self, name, max_length=None):
+        # Le nom définitif dépend du contenu, il est calculé dans _save()
+        return name
+
+    def content_name(self, name, digest):
+        directory = posixpath.dirname(name)
+        extension = os.path.splitext(name)[1].lower()
+        return posixpath.join(directory, digest[:2], digest + extension)
+
+    def _save(self, name, content):
+        incoming_dir = self.path('.incoming')
+        os.makedirs(incoming_dir, exist_ok=True)
+
+        # Une seule passe : on écrit dans un fichier temporaire tout en calculant l'empreinte
+        digest = hashlib.sha256()
+        fd, tmp_path = tempfile.mkstemp(dir=incoming_dir)
+        try:
+            with os.fdopen(fd, 'wb') as tmp:
+                for chunk in content.chunks(self.chunk_size):
+                    if isinstance(chunk, str):
+                        chunk = chunk.encode()
+                    digest.update(chunk)
+                    tmp.write(chunk)
+
+            final_name = self.content_name(name, digest.hexdigest())
+            full_path = self.path(final_name)
+            with transaction.atomic():
+                # La ligne StoredFile est réservée (verrouillée) avant de se fier au disque :
+                # delete_orphan_file verrouille la même ligne et épargne un contenu réservé récemment
+                claimed = self._claim(final_name, os.path.getsize(tmp_path))
+                if os.path.exists(full_path):
+                    # Contenu déjà présent : on réutilise le fichier existant
+                    os.remove(tmp_path)
+                else:
+                    os.makedirs(os.path.dirname(full_path), exist_ok=True)
+                    # os.replace est atomique : deux envois concurrents du même contenu restent sûrs
+                    os.replace(tmp_path, full_path)
+                    # mkstemp crée le fichier en 0o600 : on le rend lisible par le serveur web
+                    os.chmod(full_path, self.file_permissions_mode if self.file_permissions_mode is not None else 0o644)
+                self._schedule_orphan_check(final_name, claimed)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        return final_name
+
+    def _claim(self, name, size):
+        """Crée ou verrouille la ligne StoredFile du contenu et y note la date d'enregistrement."""
+        from .models import StoredFile
+
+        now = timezone.now()
+        stored, created = StoredFile.objects.select_for_update().get_or_create(
+            name=name, defaults={'size': size, 'claimed_at': now},
+        )
+        if not created:
+            StoredFile.objects.filter(pk=stored.pk).update(claimed_at=now)
+        return now
+
+    def _schedule_orphan_check(self, name, claimed_at):
+        """
+        Un contenu enregistré mais jamais rattaché (envoi abandonné) est supprimé
+        à la fin du délai de réservation, s'il n'est toujours référencé nulle part.
+        """
+        from tasks.queue import enqueue
+        from .tasks import delete_orphan_file
+
+        grace = getattr(settings, 'MEDIA_CLAIM_GRACE', timedelta(hours=24))
+        enqueue(delete_orphan_file, (name,), run_at=claimed_at + grace)
@@ -0,0 +1,34 @@
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.utils import timezone
+from tasks.queue import task
+
+from .models import StoredFile
+
+# Configuration du logger
+logger = logging.getLogger(__name__)
+
+
+# 🔹 Tâche : suppression d'un fichier orphelin
+@task(queue='files')
+def delete_orphan_file(name):
+    """
+    Supprime le fichier physique si plus aucun enregistrement ne le référence
+    (une nouvelle référence a pu apparaître entre-temps : le compteur est relu).
+    La ligne reste verrouillée jusqu'à la suppression du fichier : ContentAddressedStorage._save
+    ne peut pas réutiliser ce fichier entre-temps. Un contenu enregistré récemment (envoi pas encore
+    rattaché à une annonce) est épargné : _save a programmé une vérification à la fin du délai.
+    """
+    grace = getattr(settings, 'MEDIA_CLAIM_GRACE', timedelta(hours=24))
+    with transaction.atomic():
+        stored = StoredFile.objects.select_for_update().filter(name=name, refcount=0).first()
+        if stored is None or (stored.claimed_at and stored.claimed_at > timezone.now() - grace):
+            return False
+        default_storage.delete(name)
+        stored.delete()
+    logger.info(f"🗑️ Fichier orphelin supprimé : {name}")
+    return True
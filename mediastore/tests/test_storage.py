@@ -0,0 +1,84 @@
+import os
+import tempfile
+from datetime import timedelta
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.test import RequestFactory, TestCase, override_settings
+from django.http import Http404
+from django.utils import timezone
+
+from mediastore.models import StoredFile
+from mediastore.tasks import delete_orphan_file
+from mediastore.views import serve_media
+
+
+class OrphanRaceTests(TestCase):
+    """Un contenu réutilisé par le stockage n'est jamais supprimé sous une référence naissante."""
+
+    def setUp(self):
+        self.media_root = tempfile.TemporaryDirectory()
+        self.addCleanup(self.media_root.cleanup)
+        override = override_settings(MEDIA_ROOT=self.media_root.name, TASKS_EAGER=False)
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def test_save_claims_row_and_recent_claim_survives_orphan_task(self):
+        name = default_storage.save('products/a.jpg', ContentFile(b'image'))
+        stored = StoredFile.objects.get(name=name)
+        self.assertEqual(stored.refcount, 0)
+        self.assertIsNotNone(stored.claimed_at)
+
+        self.assertFalse(delete_orphan_file(name))
+        self.assertTrue(default_storage.exists(name))
+
+    def test_reuse_after_orphan_deletion_rewrites_file(self):
+        name = default_storage.save('products/a.jpg', ContentFile(b'image'))
+        StoredFile.objects.filter(name=name).update(claimed_at=timezone.now() - timedelta(days=2))
+        self.assertTrue(delete_orphan_file(name))
+        self.assertFalse(default_storage.exists(name))
+        self.assertFalse(StoredFile.objects.filter(name=name).exists())
+
+        # Même contenu : la ligne est recréée et le fichier réécrit
+        self.assertEqual(default_storage.save('products/b.jpg', ContentFile(b'image')), name)
+        self.assertTrue(default_storage.exists(name))
+        self.assertTrue(StoredFile.objects.filter(name=name, refcount=0).exists())
+
+    def test_reuse_refreshes_claim(self):
+        name = default_storage.save('products/a.jpg', ContentFile(b'image'))
+        StoredFile.objects.filter(name=name).update(claimed_at=timezone.now() - timedelta(days=2))
+        default_storage.save('products/b.jpg', ContentFile(b'image'))
+        self.assertFalse(delete_orphan_file(name))
+        self.assertTrue(default_storage.exists(name))
+
+
+class ServeMediaTests(TestCase):
+    """Fichiers médias servis par Django : développement uniquement, contenus adressés uniquement."""
+
+    def setUp(self):
+        self.media_root = tempfile.TemporaryDirectory()
+        self.addCleanup(self.media_root.cleanup)
+        override = override_settings(MEDIA_ROOT=self.media_root.name)
+        override.enable()
+        self.addCleanup(override.disable)
+        self.name = default_storage.save('products/a.jpg', ContentFile(b'image'))
+        os.makedirs(os.path.join(self.media_root.name, '.incoming'), exist_ok=True)
+        with open(os.path.join(self.media_root.name, '.incoming', 'tmpabc'), 'wb') as tmp:
+            tmp.write(b'partiel')
+        self.request = RequestFactory().get('/media/')
+
+    @override_settings(DEBUG=True)
+    def test_serves_content_addressed_file_in_debug(self):
+        response = serve_media(self.request, self.name)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('immutable', response['Cache-Control'])
+
+    @override_settings(DEBUG=True)
+    def test_incoming_files_are_not_served(self):
+        with self.assertRaises(Http404):
+            serve_media(self.request, '.incoming/tmpabc')
+
+    @override_settings(DEBUG=False)
+    def test_nothing_served_outside_debug(self):
+        with self.assertRaises(Http404):
+            serve_media(self.request, self.name)
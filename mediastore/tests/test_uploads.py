@@ -0,0 +1,50 @@
+import io
+import tempfile
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from PIL import Image
+
+from mediastore.models import UploadSession
+from mediastore.uploads import UploadError, finalize, write_chunk
+
+
+def png(size=(10, 10)):
+    buffer = io.BytesIO()
+    Image.new('RGB', size).save(buffer, 'PNG')
+    return buffer.getvalue()
+
+
+class ChunkedUploadTests(TestCase):
+    """Envoi découpé : une session active survit à la purge, une image piégée est refusée proprement."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        override = override_settings(MEDIA_ROOT=self.tmp.name, CHUNKED_UPLOAD_DIR=f'{self.tmp.name}/.incoming')
+        override.enable()
+        self.addCleanup(override.disable)
+        owner = get_user_model().objects.create_user(
+            email='vendeur@example.com', company_name='vendeur', phone='77000000', password='x',
+        )
+        self.data = png()
+        self.session = UploadSession.objects.create(
+            owner=owner, filename='a.png', content_type='image/png', size=len(self.data),
+        )
+
+    def test_chunk_refreshes_activity_so_purge_keeps_session(self):
+        UploadSession.objects.filter(pk=self.session.pk).update(updated_at=timezone.now() - timedelta(days=30))
+        write_chunk(self.session, io.BytesIO(self.data[:20]), 0, 20)
+        call_command('purge_upload_sessions', stdout=io.StringIO())
+        self.assertTrue(UploadSession.objects.filter(pk=self.session.pk).exists())
+
+    def test_decompression_bomb_is_rejected_as_invalid_image(self):
+        write_chunk(self.session, io.BytesIO(self.data), 0, len(self.data))
+        with mock.patch.object(Image, 'MAX_IMAGE_PIXELS', 10), self.assertRaises(UploadError) as raised:
+            finalize(self.session)
+        self.assertEqual(raised.exception.status_code, 415)
+        self.assertFalse(UploadSession.objects.filter(pk=self.session.pk).exists())
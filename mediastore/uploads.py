@@ -0,0 +1,119 @@
+import os
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.utils import timezone
+from PIL import Image, UnidentifiedImageError
+
+from .models import UploadSession
+
+# Taille des lectures sur le flux de la requête : la mémoire reste constante quel que soit le morceau
+READ_BUFFER_SIZE = 64 * 1024
+
+# Extension du fichier stocké selon le type MIME (on n'utilise pas l'extension envoyée par le client)
+EXTENSIONS = {
+    'image/jpeg': '.jpg',
+    'image/png': '.png',
+    'image/webp': '.webp',
+    'image/gif': '.gif',
+}
+
+
+class UploadError(Exception):
+    """Erreur de validation d'un envoi découpé (message destiné au client)."""
+
+    def __init__(self, message, status_code=400):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def sniff_image_type(head):
+    """
+    Détermine le type d'image à partir des premiers octets (signature du format).
+    """
+    if head.startswith(b'\xff\xd8\xff'):
+        return 'image/jpeg'
+    if head.startswith(b'\x89PNG\r\n\x1a\n'):
+        return 'image/png'
+    if head[:4] == b'RIFF' and head[8:12] == b'WEBP':
+        return 'image/webp'
+    if head[:6] in (b'GIF87a', b'GIF89a'):
+        return 'image/gif'
+    return None
+
+
+def validate_declaration(content_type, size):
+    """Refuse dès la création de la session les types et tailles non autorisés."""
+    if content_type not in settings.CHUNKED_UPLOAD_CONTENT_TYPES:
+        raise UploadError("Type de fichier non autorisé.", status_code=415)
+    if size <= 0 or size > settings.CHUNKED_UPLOAD_MAX_SIZE:
+        raise UploadError(f"La taille doit être comprise entre 1 et {settings.CHUNKED_UPLOAD_MAX_SIZE} octets.", status_code=413)
+
+
+def write_chunk(session, stream, offset, length):
+    """
+    Écrit un morceau lu depuis `stream` à la position `offset` du fichier partiel.
+    Le morceau est recopié par blocs de READ_BUFFER_SIZE : il n'est jamais chargé en entier.
+    Retourne le nouvel offset.
+    """
+    if session.status != 'pending':
+        raise UploadError("Cet envoi est déjà terminé.", status_code=409)
+    if offset != session.offset:
+        raise UploadError("Position incorrecte : reprenez à l'offset indiqué.", status_code=409)
+    if length <= 0 or length > settings.CHUNKED_UPLOAD_CHUNK_SIZE:
+        raise UploadError(f"Un morceau doit faire entre 1 et {settings.CHUNKED_UPLOAD_CHUNK_SIZE} octets.", status_code=413)
+    if offset + length > session.size:
+        raise UploadError("Le morceau dépasse la taille annoncée.", status_code=413)
+
+    path = session.partial_path
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    written = 0
+    with open(path, 'r+b' if path.exists() else 'wb') as partial:
+        partial.seek(offset)
+        while written < length:
+            data = stream.read(min(READ_BUFFER_SIZE, length - written))
+            if not data:
+                break
+            if offset == 0 and written == 0:
+                # Validation au plus tôt : la signature doit correspondre au type annoncé
+                if sniff_image_type(data[:16]) != session.content_type:
+                    raise UploadError("Le contenu ne correspond pas au type annoncé.", status_code=415)
+            partial.write(data)
+            written += len(data)
+        partial.truncate(offset + written)
+
+    # Mise à jour conditionnelle : un autre envoi concurrent au même offset est refusé.
+    # update() ignore auto_now : updated_at est posé ici, sinon la purge prend un envoi actif pour abandonné.
+    updated = UploadSession.objects.filter(pk=session.pk, offset=offset, status='pending').update(
+        offset=offset + written, updated_at=timezone.now(),
+    )
+    if not updated:
+        raise UploadError("Conflit : ce morceau a déjà été reçu.", status_code=409)
+    session.offset = offset + written
+    return session.offset
+
+
+def finalize(session, upload_to='products/'):
+    """
+    Vérifie l'image complète puis la transfère dans le stockage des médias.
+    Le nom stocké est ensuite utilisable par Product.image via `upload_id`.
+    """
+    path = session.partial_path
+    try:
+        with Image.open(path) as image:
+            image.verify()
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError, SyntaxError):
+        path.unlink(missing_ok=True)
+        session.delete()
+        raise UploadError("Le fichier reçu n'est pas une image valide.", status_code=415)
+
+    with open(path, 'rb') as partial:
+        name = default_storage.save(f"{upload_to}{session.pk}{EXTENSIONS[session.content_type]}", File(partial))
+    os.remove(path)
+
+    session.file_name = name
+    session.status = 'complete'
+    session.save(update_fields=['file_name', 'status', 'updated_at'])
+    return session
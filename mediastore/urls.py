@@ -0,0 +1,8 @@
+from django.urls import path
+from .views import UploadSessionCreateView, UploadSessionDetailView
+
+urlpatterns = [
+    # Envois d'images découpés et reprenables
+    path('uploads/', UploadSessionCreateView.as_view(), name='upload_create'),
+    path('uploads/<uuid:pk>/', UploadSessionDetailView.as_view(), name='upload_detail'),
+]
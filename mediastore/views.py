@@ -0,0 +1,92 @@
+from django.conf import settings
+from django.http import Http404
+from django.shortcuts import get_object_or_404
+from django.utils.cache import patch_cache_control
+from django.views.static import serve
+from rest_framework import generics, permissions, status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .models import UploadSession
+from .serializers import UploadSessionSerializer
+from .storage import is_content_addressed
+from .uploads import UploadError, write_chunk, finalize
+
+# Un an : le contenu d'un nom adressé par empreinte ne change jamais
+IMMUTABLE_MAX_AGE = 365 * 24 * 60 * 60
+
+
+def serve_media(request, path):
+    """
+    Sert les fichiers de MEDIA_ROOT en développement (DEBUG) ; en production, le serveur web s'en charge.
+    Seuls les fichiers adressés par leur contenu sont servis (jamais les fichiers temporaires de .incoming/).
+    Ils reçoivent un en-tête Cache-Control `public, max-age=<1 an>, immutable`
+    pour que navigateurs et CDN ne les redemandent jamais.
+    """
+    if not settings.DEBUG or not is_content_addressed(path):
+        raise Http404("Fichier introuvable.")
+    response = serve(request, path, document_root=settings.MEDIA_ROOT)
+    if response.status_code == 200:
+        patch_cache_control(response, public=True, max_age=IMMUTABLE_MAX_AGE, immutable=True)
+    return response
+
+
+# 🔹 Création d'un envoi découpé
+class UploadSessionCreateView(generics.CreateAPIView):
+    """
+    Ouvre un envoi reprenable : POST {filename, content_type, size}.
+    Le type et la taille sont validés avant la réception du moindre octet.
+    """
+    serializer_class = UploadSessionSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def perform_create(self, serializer):
+        serializer.save(owner=self.request.user)
+
+
+# 🔹 Envoi des morceaux / reprise
+class UploadSessionDetailView(APIView):
+    """
+    - GET    : état de l'envoi (offset à partir duquel reprendre).
+    - PATCH  : envoie un morceau brut ; l'en-tête `Upload-Offset` donne sa position.
+    - DELETE : abandonne l'envoi.
+    Chaque requête ne transporte qu'un morceau borné (CHUNKED_UPLOAD_CHUNK_SIZE) et lu en continu :
+    un client lent n'immobilise un worker que le temps d'un petit morceau.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_object(self):
+        return get_object_or_404(UploadSession, pk=self.kwargs['pk'], owner=self.request.user)
+
+    def get(self, request, *args, **kwargs):
+        session = self.get_object()
+        return self._response(session)
+
+    def patch(self, request, *args, **kwargs):
+        session = self.get_object()
+        try:
+            offset = int(request.headers.get('Upload-Offset', ''))
+            length = int(request.headers.get('Content-Length', ''))
+        except ValueError:
+            return Response({"detail": "En-têtes Upload-Offset et Content-Length requis."}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            # On lit le flux brut de la requête : request.data chargerait tout le corps en mémoire
+            write_chunk(session, request._request, offset, length)
+            if session.offset == session.size:
+                finalize(session)
+        except UploadError as e:
+            return Response({"detail": str(e), "offset": session.offset}, status=e.status_code)
+
+        return self._response(session)
+
+    def delete(self, request, *args, **kwargs):
+        session = self.get_object()
+        session.partial_path.unlink(missing_ok=True)
+        session.delete()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+    def _response(self, session):
+        response = Response(UploadSessionSerializer(session).data)
+        response['Upload-Offset'] = str(session.offset)
+        return response
@@ -1,10 +1,58 @@
-from django.contrib import admin
-from .models import Product, Category
+from django.contrib import admin, messages
+from django.db import transaction
+from django.utils import timezone
+from djibtrade.admin_scaling import ScalableAdminMixin
+from djibtrade.counting import bump_table_version
+from .models import ArchivedProduct, ModerationLog, Product, Category, next_change_seq
 
 @admin.register(Product)
-class ProductAdmin(admin.ModelAdmin):
-    list_display = ('title', 'owner', 'unit_price', 'currency', 'quantity', 'total_price', 'views')
+class ProductAdmin(ScalableAdminMixin, admin.ModelAdmin):
+    """
+    Configuration de l’affichage du modèle Product dans l’admin Django (mode grandes tables).
+    """
+    list_display = ('title', 'owner', 'category', 'unit_price', 'currency', 'quantity', 'total_price', 'views', 'expires_at')
+    list_select_related = ('owner', 'category')
+    autocomplete_fields = ('owner', 'category')
+    actions = ('mark_sold_out', 'delete_selected_bulk')
+
+    @admin.action(permissions=['change'], description="Marquer comme épuisées")
+    def mark_sold_out(self, request, queryset):
+        # Un seul UPDATE, sans charger les annonces
+        with transaction.atomic():
+            updated = queryset.update(quantity=0, updated_at=timezone.now(), change_seq=next_change_seq())
+        bump_table_version(Product)
+        self.message_user(request, f"{updated} annonce(s) marquée(s) comme épuisée(s).", messages.SUCCESS)
 
 @admin.register(Category)
 class CategoryAdmin(admin.ModelAdmin):
     list_display = ('name',)
+    search_fields = ('name',)
+
+@admin.register(ArchivedProduct)
+class ArchivedProductAdmin(ScalableAdminMixin, admin.ModelAdmin):
+    """
+    Annonces archivées (lecture seule ; restauration par le vendeur via l'API).
+    """
+    list_display = ('title', 'owner', 'category', 'quantity', 'archive_reason', 'archived_at')
+    list_select_related = ('owner', 'category')
+    list_filter = ('archive_reason',)
+    raw_id_fields = ('owner',)
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+@admin.register(ModerationLog)
+class ModerationLogAdmin(ScalableAdminMixin, admin.ModelAdmin):
+    """
+    Journal des actions de modération en masse (lecture seule).
+    """
+    list_display = ('created_at', 'actor', 'action', 'target_owner_id', 'affected', 'reason')
+    list_select_related = ('actor',)
+    list_filter = ('action',)
+    raw_id_fields = ('actor',)
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
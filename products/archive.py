@@ -0,0 +1,91 @@
+from collections import Counter
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from djibtrade.counting import bump_table_version
+from mediastore.models import StoredFile
+from .models import ArchivedProduct, Product, listing_expiry, next_change_seq
+
+# Colonnes recopiées telles quelles entre les deux tables (la colonne générée est recalculée)
+ARCHIVED_FIELDS = tuple(field.attname for field in Product._meta.concrete_fields if not field.generated)
+
+
+def _hold_images(names):
+    """
+    L'archive garde sa propre référence vers les images : la suppression de l'annonce
+    (qui retire celle de Product) ne rend donc pas le fichier orphelin.
+    """
+    for name, count in Counter(name for name in names if name).items():
+        StoredFile.objects.filter(name=name).update(refcount=F('refcount') + count)
+
+
+def archive_batch(ids, reason, now=None):
+    """
+    Déplace un lot d'annonces vers ArchivedProduct, dans une transaction.
+    Les lignes sont verrouillées à la lecture : une modification concurrente ne peut pas
+    se perdre entre la copie et la suppression.
+    La suppression passe par l'ORM : pierres tombales du flux des changements, index
+    de suggestions, signatures de doublons et correspondances d'alertes suivent.
+    Retourne le nombre d'annonces archivées.
+    """
+    now = now or timezone.now()
+    with transaction.atomic():
+        # Compteur du flux des changements verrouillé avant les annonces (même ordre que partout)
+        next_change_seq()
+        rows = list(Product.objects.filter(pk__in=ids).select_for_update().values(*ARCHIVED_FIELDS))
+        ArchivedProduct.objects.bulk_create(
+            [ArchivedProduct(archived_at=now, archive_reason=reason, **row) for row in rows],
+        )
+        _hold_images(row['image'] for row in rows)
+        Product.objects.filter(pk__in=[row['id'] for row in rows]).delete()
+    return len(rows)
+
+
+def archive_listings(now=None, batch_size=None):
+    """
+    Archive par lots les annonces expirées (index expires_at) puis épuisées (index partiel quantity = 0).
+    Chaque lot est une transaction courte. Retourne {'expired': n, 'sold_out': n}.
+    """
+    now = now or timezone.now()
+    batch_size = batch_size or getattr(settings, 'LISTING_ARCHIVE_BATCH_SIZE', 500)
+    candidates = {
+        'expired': Product.objects.filter(expires_at__lte=now).order_by('expires_at', 'id'),
+        'sold_out': Product.objects.filter(quantity=0).order_by('id'),
+    }
+    archived = {}
+    for reason, queryset in candidates.items():
+        archived[reason] = 0
+        while True:
+            ids = list(queryset.values_list('pk', flat=True)[:batch_size])
+            if not ids:
+                break
+            archived[reason] += archive_batch(ids, reason, now)
+    if any(archived.values()):
+        bump_table_version(Product)
+    return archived
+
+
+def restore_listing(archived, quantity=None):
+    """
+    Remet une annonce archivée en ligne, avec son identifiant d'origine et une nouvelle expiration.
+    L'enregistrement passe par Product.save() : les signaux réindexent l'annonce et la diffusent.
+    """
+    with transaction.atomic():
+        values = {name: getattr(archived, name) for name in ARCHIVED_FIELDS}
+        values['expires_at'] = listing_expiry()
+        if quantity is not None:
+            values['quantity'] = quantity
+        # L'annonce d'origine du doublon a pu être archivée ou supprimée entre-temps
+        if values['duplicate_of_id'] and not Product.objects.filter(pk=values['duplicate_of_id']).exists():
+            values['duplicate_of_id'] = None
+        product = Product(**values)
+        product.save(force_insert=True)
+        # auto_now_add a daté l'annonce du jour : elle reprend sa date de publication d'origine
+        Product.objects.filter(pk=product.pk).update(created_at=archived.created_at)
+        product.created_at = archived.created_at
+        # Libère la référence de l'archive vers l'image (Product.save en a pris une)
+        archived.delete()
+    return product
@@ -0,0 +1,144 @@
+import base64
+import re
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Max, Q
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from .models import ChangeSequence, Product, ProductTombstone, next_change_seq
+
+
+class InvalidCursor(ValueError):
+    """Curseur illisible."""
+
+
+class ExpiredCursor(InvalidCursor):
+    """Curseur plus ancien que la rétention des suppressions : le client doit tout recharger."""
+
+
+# ==========================
+# 🔹 Curseur opaque
+# ==========================
+# Position dans le flux = (numéro de changement, identifiant de l'annonce).
+# Les numéros sont attribués dans l'ordre de validation des transactions (next_change_seq) :
+# une fois lus, aucun changement ne peut apparaître avant eux, même après une longue transaction.
+CURSOR_RE = re.compile(r's(\d+)\.(\d+)')
+# Ancien format (date en microsecondes) : le client doit tout recharger
+LEGACY_CURSOR_RE = re.compile(r'\d+\.\d+')
+
+
+def encode_cursor(seq, pk):
+    return base64.urlsafe_b64encode(f"s{seq}.{pk}".encode()).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4)).decode()
+    except (ValueError, UnicodeDecodeError):
+        raise InvalidCursor("Curseur invalide.")
+    match = CURSOR_RE.fullmatch(raw)
+    if match:
+        return int(match.group(1)), int(match.group(2))
+    if LEGACY_CURSOR_RE.fullmatch(raw):
+        raise ExpiredCursor("Curseur expiré : une resynchronisation complète est nécessaire.")
+    raise InvalidCursor("Curseur invalide.")
+
+
+def _after(queryset, id_field, seq, pk):
+    """Lignes strictement après (seq, pk) dans l'ordre (change_seq, id_field)."""
+    return queryset.filter(Q(change_seq__gt=seq) | Q(change_seq=seq, **{f'{id_field}__gt': pk}))
+
+
+def _sequence():
+    """(dernier numéro validé, plus petit numéro de curseur encore servi)."""
+    return ChangeSequence.objects.filter(pk=1).values_list('value', 'min_cursor_seq').first() or (0, 0)
+
+
+# ==========================
+# 🔹 Lecture du flux
+# ==========================
+def fetch_changes(since=None, limit=100):
+    """
+    Retourne les changements postérieurs au curseur `since`, au plus `limit` :
+    (annonces créées ou modifiées, identifiants supprimés, curseur suivant, reste-t-il des changements).
+
+    Le compteur est lu avant les lignes : tous les numéros jusqu'à sa valeur sont validés
+    (un numéro n'est visible qu'avec la transaction qui l'a pris), le curseur peut donc avancer
+    jusque-là quand tout est lu, sans délai d'attente.
+    """
+    committed, min_cursor_seq = _sequence()
+
+    if since:
+        seq, pk = decode_cursor(since)
+        if seq < min_cursor_seq:
+            raise ExpiredCursor("Curseur expiré : une resynchronisation complète est nécessaire.")
+    else:
+        seq, pk = 0, 0
+
+    # Deux parcours d'index bornés, fusionnés ensuite dans l'ordre du curseur
+    products = list(
+        _after(Product.objects.all(), 'id', seq, pk)
+        .select_related('owner', 'category')
+        .order_by('change_seq', 'id')[:limit + 1]
+    )
+    tombstones = list(
+        _after(ProductTombstone.objects.all(), 'product_id', seq, pk)
+        .order_by('change_seq', 'product_id')
+        .values_list('change_seq', 'product_id')[:limit + 1]
+    )
+
+    events = sorted(
+        [(product.change_seq, product.pk, product) for product in products]
+        + [(change_seq, product_id, None) for change_seq, product_id in tombstones],
+        key=lambda event: (event[0], event[1]),
+    )
+    has_more = len(events) > limit
+    events = events[:limit]
+
+    position = (events[-1][0], events[-1][1]) if events else (seq, pk)
+    if not has_more:
+        # Tout est lu jusqu'au compteur : le curseur passe après son dernier numéro (il ne vieillit pas)
+        position = max(position, (committed + 1, 0))
+    cursor = encode_cursor(*position)
+    # Une annonce masquée par la modération disparaît des clients comme une suppression
+    upserts = [product for _, _, product in events if product is not None and not product.is_hidden]
+    deletes = [product_id for _, product_id, product in events if product is None or product.is_hidden]
+    return upserts, deletes, cursor, has_more
+
+
+# ==========================
+# 🔹 Suppressions
+# ==========================
+def record_tombstones(product_ids, deleted_at=None, change_seq=None):
+    """
+    Trace les suppressions, dans la transaction qui supprime.
+    `change_seq` : numéro pris avant de verrouiller les annonces (next_change_seq), sinon pris ici.
+    """
+    deleted_at = deleted_at or timezone.now()
+    change_seq = change_seq or next_change_seq()
+    ProductTombstone.objects.bulk_create(
+        [
+            ProductTombstone(product_id=product_id, deleted_at=deleted_at, change_seq=change_seq)
+            for product_id in product_ids
+        ],
+        batch_size=1000,
+    )
+
+
+def prune_tombstones(now=None):
+    """Purge les traces de suppression plus anciennes que CHANGES_TOMBSTONE_RETENTION."""
+    now = now or timezone.now()
+    retention = getattr(settings, 'CHANGES_TOMBSTONE_RETENTION', timedelta(days=30))
+    expired = ProductTombstone.objects.filter(deleted_at__lt=now - retention)
+    with transaction.atomic():
+        last = expired.aggregate(last=Max('change_seq'))['last']
+        if last is None:
+            return 0
+        # Les curseurs antérieurs à ces suppressions ne peuvent plus être servis sans elles
+        ChangeSequence.objects.get_or_create(pk=1)
+        ChangeSequence.objects.filter(pk=1).update(min_cursor_seq=Greatest('min_cursor_seq', last + 1))
+        deleted, _ = expired.filter(change_seq__lte=last).delete()
+    return deleted
@@ -0,0 +1,18 @@
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Product, next_change_seq, whatsapp_link_for
+
+
+def propagate_contact(owner_id, phone):
+    """
+    Recopie le numéro du vendeur (lien WhatsApp) sur toutes ses annonces en un seul UPDATE.
+    À appeler dans la transaction qui modifie le numéro : annonces et profil changent ensemble.
+    updated_at et change_seq sont avancés pour que le flux des changements diffuse le nouveau lien.
+    Retourne le nombre d'annonces modifiées.
+    """
+    link = whatsapp_link_for(phone)
+    products = Product.objects.filter(owner_id=owner_id)
+    products = products.exclude(whatsapp_link=link) if link else products.exclude(whatsapp_link__isnull=True)
+    with transaction.atomic():
+        return products.update(whatsapp_link=link, updated_at=timezone.now(), change_seq=next_change_seq())
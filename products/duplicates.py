@@ -0,0 +1,155 @@
+import hashlib
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from cities.normalization import fold
+from .models import Product, ProductSignature, ProductLSHBucket, next_change_seq
+
+# ==========================
+# 🔹 Paramètres MinHash / LSH
+# ==========================
+NUM_PERMUTATIONS = 128
+BANDS = 32                      # 32 bandes × 4 lignes : un doublon à 70 % est candidat dans plus de 99,9 % des cas
+ROWS_PER_BAND = NUM_PERMUTATIONS // BANDS
+SHINGLE_SIZE = 4                # n-grammes de caractères : robustes aux petites retouches de texte
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+
+# Permutations fixes (graine constante) : les signatures restent comparables d'un processus à l'autre
+_generator = np.random.RandomState(20250815)
+_A = _generator.randint(1, (1 << 61) - 1, size=NUM_PERMUTATIONS, dtype=np.uint64)
+_B = _generator.randint(0, (1 << 61) - 1, size=NUM_PERMUTATIONS, dtype=np.uint64)
+
+
+def shingles(title, description):
+    """Ensemble des n-grammes de caractères du titre et de la description normalisés."""
+    text = fold(f"{title or ''} {description or ''}")
+    if len(text) <= SHINGLE_SIZE:
+        return {text} if text else set()
+    return {text[i:i + SHINGLE_SIZE] for i in range(len(text) - SHINGLE_SIZE + 1)}
+
+
+def minhash(title, description):
+    """
+    Signature MinHash (NUM_PERMUTATIONS entiers 32 bits) du texte d'une annonce.
+    Toutes les permutations sont calculées d'un coup avec NumPy.
+    """
+    values = shingles(title, description)
+    if not values:
+        return np.full(NUM_PERMUTATIONS, _MAX_HASH, dtype=np.uint64)
+    hashes = np.fromiter(
+        (int.from_bytes(hashlib.blake2b(value.encode(), digest_size=4).digest(), 'little') for value in values),
+        dtype=np.uint64,
+        count=len(values),
+    )
+    permuted = np.bitwise_and((_A[:, None] * hashes[None, :] + _B[:, None]) % _MERSENNE_PRIME, _MAX_HASH)
+    return permuted.min(axis=1)
+
+
+def band_keys(signature):
+    """Clés LSH : une empreinte 63 bits par bande (numéro de bande inclus)."""
+    keys = []
+    for band in range(BANDS):
+        chunk = signature[band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND].astype('<u4').tobytes()
+        digest = hashlib.blake2b(bytes([band]) + chunk, digest_size=8).digest()
+        keys.append(int.from_bytes(digest, 'little', signed=True))
+    return keys
+
+
+def similarity(first, second):
+    """Estimation de la similarité de Jaccard entre deux signatures."""
+    return float(np.count_nonzero(first == second)) / NUM_PERMUTATIONS
+
+
+def to_bytes(signature):
+    return signature.astype('<u4').tobytes()
+
+
+def from_bytes(data):
+    return np.frombuffer(bytes(data), dtype='<u4').astype(np.uint64)
+
+
+# ==========================
+# 🔹 Recherche et indexation
+# ==========================
+def find_duplicate(owner_id, signature, exclude_pk=None, before_pk=None):
+    """
+    Cherche une annonce quasi identique du même vendeur.
+    Une seule requête indexée (owner, key) sur les seaux LSH, puis comparaison des signatures candidates.
+    Retourne (product_id, similarité) ou None.
+    """
+    candidates = ProductLSHBucket.objects.filter(owner_id=owner_id, key__in=band_keys(signature))
+    if exclude_pk is not None:
+        candidates = candidates.exclude(product_id=exclude_pk)
+    if before_pk is not None:
+        candidates = candidates.filter(product_id__lt=before_pk)
+    candidate_ids = set(candidates.values_list('product_id', flat=True))
+    if not candidate_ids:
+        return None
+
+    threshold = getattr(settings, 'DUPLICATE_SIMILARITY_THRESHOLD', 0.7)
+    best = None
+    for product_id, data in ProductSignature.objects.filter(product_id__in=candidate_ids).values_list('product_id', 'signature'):
+        score = similarity(signature, from_bytes(data))
+        if score >= threshold and (best is None or score > best[1] or (score == best[1] and product_id < best[0])):
+            best = (product_id, score)
+    return best
+
+
+def index_product(product, signature=None):
+    """
+    Enregistre (ou remplace) la signature et les seaux LSH d'une annonce.
+    """
+    if signature is None:
+        signature = minhash(product.title, product.description)
+    with transaction.atomic():
+        ProductSignature.objects.update_or_create(product_id=product.pk, defaults={'signature': to_bytes(signature)})
+        ProductLSHBucket.objects.filter(product_id=product.pk).delete()
+        ProductLSHBucket.objects.bulk_create([
+            ProductLSHBucket(product_id=product.pk, owner_id=product.owner_id, key=key)
+            for key in band_keys(signature)
+        ])
+    return signature
+
+
+def index_products_bulk(rows):
+    """
+    Indexe un lot de (pk, owner_id, title, description) avec des insertions groupées.
+    Retourne {pk: signature}.
+    """
+    signatures = {pk: minhash(title, description) for pk, _, title, description in rows}
+    pks = list(signatures)
+    with transaction.atomic():
+        ProductSignature.objects.filter(product_id__in=pks).delete()
+        ProductLSHBucket.objects.filter(product_id__in=pks).delete()
+        ProductSignature.objects.bulk_create(
+            [ProductSignature(product_id=pk, signature=to_bytes(signature)) for pk, signature in signatures.items()],
+            batch_size=1000,
+        )
+        ProductLSHBucket.objects.bulk_create(
+            [
+                ProductLSHBucket(product_id=pk, owner_id=owner_id, key=key)
+                for pk, owner_id, _, _ in rows
+                for key in band_keys(signatures[pk])
+            ],
+            batch_size=5000,
+        )
+    return signatures
+
+
+def flag_duplicate(product, signature):
+    """Marque l'annonce comme doublon d'une annonce plus ancienne du même vendeur, le cas échéant."""
+    match = find_duplicate(product.owner_id, signature, exclude_pk=product.pk, before_pk=product.pk)
+    duplicate_of = match[0] if match else None
+    if duplicate_of != product.duplicate_of_id:
+        # updated_at et change_seq avancés à la main (update() les ignore) : le changement apparaît dans le flux
+        with transaction.atomic():
+            Product.objects.filter(pk=product.pk).update(
+                duplicate_of=duplicate_of, updated_at=timezone.now(), change_seq=next_change_seq(),
+            )
+        product.duplicate_of_id = duplicate_of
+    return match
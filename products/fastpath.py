@@ -0,0 +1,224 @@
+import decimal
+
+from django.conf import settings
+from django.utils import timezone
+from rest_framework import serializers
+from rest_framework.response import Response
+from rest_framework.settings import ISO_8601, api_settings
+
+from .serializers import ProductSerializer, CategorySerializer
+
+
+# Valeur sentinelle : le champ est omis de la ligne (équivalent de SkipField côté DRF)
+SKIP = object()
+
+
+# ==========================
+# 🔹 Convertisseurs précompilés
+# ==========================
+def _identity(value):
+    return value
+
+
+def _decimal_converter(field):
+    """
+    Version rapide de DecimalField.to_representation pour le cas courant
+    (chaîne, sans localisation ni normalisation). Sinon on garde celle de DRF.
+    """
+    coerce_to_string = getattr(field, 'coerce_to_string', api_settings.COERCE_DECIMAL_TO_STRING)
+    if not coerce_to_string or field.localize or field.normalize_output or field.decimal_places is None:
+        return field.to_representation
+
+    quantum = decimal.Decimal('.1') ** field.decimal_places
+    context = decimal.getcontext().copy()
+    if field.max_digits is not None:
+        context.prec = field.max_digits
+    rounding = field.rounding
+
+    def convert(value):
+        return f'{value.quantize(quantum, rounding=rounding, context=context):f}'
+    return convert
+
+
+def _datetime_converter(field):
+    """
+    Version rapide de DateTimeField.to_representation au format ISO 8601 :
+    le fuseau est résolu une seule fois par requête.
+    """
+    output_format = getattr(field, 'format', api_settings.DATETIME_FORMAT)
+    if output_format is None or output_format.lower() != ISO_8601 or not settings.USE_TZ:
+        return field.to_representation
+
+    field_timezone = field.timezone if hasattr(field, 'timezone') else timezone.get_current_timezone()
+
+    def convert(value):
+        if value.tzinfo is None:
+            return field.to_representation(value)
+        value = value.astimezone(field_timezone).isoformat()
+        if value.endswith('+00:00'):
+            value = value[:-6] + 'Z'
+        return value
+    return convert
+
+
+def _file_converter(field, model_field, request):
+    """
+    Version rapide de FileField/ImageField.to_representation à partir du nom stocké en base.
+    """
+    use_url = getattr(field, 'use_url', api_settings.UPLOADED_FILES_USE_URL)
+    if not use_url:
+        return _identity
+
+    storage = model_field.storage
+    scheme_host = request.build_absolute_uri('/')[:-1] if request is not None else None
+
+    def convert(name):
+        if not name:
+            return None
+        url = storage.url(name)
+        if scheme_host is None:
+            return url
+        # Même raccourci que HttpRequest.build_absolute_uri pour les chemins absolus simples
+        if url.startswith('/') and not url.startswith('//') and '/./' not in url and '/../' not in url:
+            return scheme_host + url
+        return request.build_absolute_uri(url)
+    return convert
+
+
+# ==========================
+# 🔹 Sérialisation rapide à partir de values_list()
+# ==========================
+class ValuesRowSerializer:
+    """
+    Chemin rapide optionnel pour les listes en lecture seule.
+    - Les lignes sont lues directement via values_list(), sans instancier de modèles.
+    - Chaque champ du sérialiseur DRF associé est compilé une fois par requête en convertisseur.
+    - La sortie est identique à celle de `serializer_class(many=True).data`.
+
+    Les SerializerMethodField doivent être déclarés dans `method_sources`
+    (nom du champ -> colonnes nécessaires) et implémentés par une méthode du même nom.
+    """
+    serializer_class = None
+    method_sources = {}
+
+    def __init__(self, context=None):
+        self.context = context or {}
+        self.columns = []
+        self.plan = []
+        self._compile()
+
+    def _add_column(self, lookup):
+        self.columns.append(lookup)
+        return len(self.columns) - 1
+
+    def _add_columns(self, lookups):
+        start = len(self.columns)
+        self.columns.extend(lookups)
+        return slice(start, start + len(lookups))
+
+    def _compile(self):
+        request = self.context.get('request')
+        model = self.serializer_class.Meta.model
+        fields = self.serializer_class(context=self.context).fields
+
+        for name, field in fields.items():
+            if field.write_only:
+                continue
+
+            if isinstance(field, serializers.SerializerMethodField):
+                index = self._add_columns(self.method_sources[name])
+                converter = getattr(self, name)
+                self.plan.append((name, index, converter, False))
+                continue
+
+            lookup = field.source.replace('.', '__')
+            # Une relation nulle dans une source pointée fait sauter le champ en lecture seule
+            skip_none = '__' in lookup and not field.required and field.default is serializers.empty
+
+            if isinstance(field, serializers.DecimalField):
+                converter = _decimal_converter(field)
+            elif isinstance(field, serializers.DateTimeField):
+                converter = _datetime_converter(field)
+            elif isinstance(field, serializers.FileField):
+                converter = _file_converter(field, model._meta.get_field(field.source), request)
+            elif isinstance(field, (serializers.CharField, serializers.IntegerField,
+                                    serializers.ChoiceField, serializers.PrimaryKeyRelatedField,
+                                    serializers.BooleanField)):
+                converter = _identity
+            else:
+                converter = field.to_representation
+
+            self.plan.append((name, self._add_column(lookup), converter, skip_none))
+
+    def get_queryset(self, queryset):
+        """Transforme le queryset filtré en queryset de tuples."""
+        return queryset.values_list(*self.columns)
+
+    def to_representation(self, rows):
+        plan = self.plan
+        data = []
+        for row in rows:
+            item = {}
+            for name, index, converter, skip_none in plan:
+                if index.__class__ is slice:
+                    value = converter(*row[index])
+                    if value is SKIP:
+                        continue
+                    item[name] = value
+                    continue
+                value = row[index]
+                if value is None:
+                    if not skip_none:
+                        item[name] = None
+                    continue
+                item[name] = converter(value)
+            data.append(item)
+        return data
+
+
+class ProductRowSerializer(ValuesRowSerializer):
+    """
+    Chemin rapide équivalent à ProductSerializer pour la liste des produits.
+    """
+    serializer_class = ProductSerializer
+    method_sources = {
+        'owner_name': ('owner__company_name', 'owner__role'),
+    }
+
+    def owner_name(self, company_name, role):
+        # Même rendu que str(owner) : voir User.__str__
+        return f"{company_name} ({role})"
+
+
+class CategoryRowSerializer(ValuesRowSerializer):
+    """
+    Chemin rapide équivalent à CategorySerializer.
+    """
+    serializer_class = CategorySerializer
+
+
+# ==========================
+# 🔹 Mixin pour les ViewSets
+# ==========================
+class FastListMixin:
+    """
+    Active le chemin rapide sur l'action `list` quand FAST_LIST_SERIALIZATION est vrai.
+    La pagination et les filtres du ViewSet restent inchangés.
+    """
+    row_serializer_class = None
+
+    def use_fast_list(self):
+        return bool(getattr(settings, 'FAST_LIST_SERIALIZATION', False)) and self.row_serializer_class is not None
+
+    def list(self, request, *args, **kwargs):
+        if not self.use_fast_list():
+            return super().list(request, *args, **kwargs)
+
+        row_serializer = self.row_serializer_class(context=self.get_serializer_context())
+        queryset = row_serializer.get_queryset(self.filter_queryset(self.get_queryset()))
+
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(row_serializer.to_representation(page))
+        return Response(row_serializer.to_representation(queryset))
+
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from products.archive import archive_listings
+
+
+class Command(BaseCommand):
+    help = "Déplace par lots les annonces expirées ou épuisées vers la table d'archive"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=None, help="Annonces par lot (défaut : LISTING_ARCHIVE_BATCH_SIZE)")
+
+    def handle(self, *args, **options):
+        archived = archive_listings(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ {archived['expired']} annonces expirées et {archived['sold_out']} annonces épuisées archivées."
+        ))
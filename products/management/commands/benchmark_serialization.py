@@ -0,0 +1,88 @@
+import time
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test import RequestFactory
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+
+from accounts.models import User
+from djibtrade.renderers import ORJSONRenderer
+from products.fastpath import ProductRowSerializer
+from products.models import Product, Category
+from products.serializers import ProductSerializer
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = "Compare la sérialisation DRF standard et le chemin rapide (values_list + orjson) sur la liste des produits"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=2000, help="Nombre de produits synthétiques à insérer (annulés en fin de test)")
+        parser.add_argument('--page-size', type=int, default=20, help="Taille de page sérialisée à chaque itération")
+        parser.add_argument('--iterations', type=int, default=200, help="Nombre d'itérations par méthode")
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self._seed(options['rows'])
+                self._run(options['page_size'], options['iterations'])
+                raise _Rollback
+        except _Rollback:
+            self.stdout.write(self.style.WARNING("🗑️ Données synthétiques annulées."))
+
+    def _seed(self, rows):
+        owner = User.objects.create_user(
+            email='bench-serialization@djibtrade.local',
+            company_name='Bench SARL',
+            phone='+253 77 00 00 00',
+            password=None,
+        )
+        category = Category.objects.create(name='Bench - catégorie')
+        Product.objects.bulk_create(
+            Product(
+                owner=owner,
+                title=f"Produit {i} – qualité export",
+                description="Lot en gros, livraison au port de Djibouti.",
+                unit_price=Decimal('1250.50') + i,
+                quantity=i % 50 + 1,
+                currency='DJF' if i % 3 else 'USD',
+                category=category if i % 4 else None,
+                city='Djibouti',
+                image=f'products/photo_{i}.jpg' if i % 2 else '',
+                whatsapp_link='https://wa.me/25377000000',
+            )
+            for i in range(rows)
+        )
+
+    def _run(self, page_size, iterations):
+        request = Request(RequestFactory().get('/api/annonces/products/'))
+        context = {'request': request}
+        queryset = Product.objects.select_related('owner', 'category').order_by('-created_at', '-id')
+
+        def standard():
+            page = list(queryset[:page_size])
+            return JSONRenderer().render(ProductSerializer(page, many=True, context=context).data)
+
+        def fast():
+            rows = ProductRowSerializer(context=context)
+            page = list(rows.get_queryset(queryset)[:page_size])
+            return ORJSONRenderer().render(rows.to_representation(page))
+
+        if standard() != fast():
+            raise CommandError("❌ La sortie du chemin rapide diffère de ProductSerializer.")
+        self.stdout.write(self.style.SUCCESS("✅ Sorties identiques octet par octet."))
+
+        results = {}
+        for name, func in (('standard', standard), ('rapide', fast)):
+            start = time.perf_counter()
+            for _ in range(iterations):
+                func()
+            results[name] = (time.perf_counter() - start) / iterations
+            self.stdout.write(f"{name:>10} : {results[name] * 1000:.3f} ms / page de {page_size}")
+
+        self.stdout.write(self.style.SUCCESS(f"🚀 Accélération : x{results['standard'] / results['rapide']:.2f}"))
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from products.similarity import build_neighbours
+
+
+class Command(BaseCommand):
+    help = "Calcule les annonces similaires (voisins TF-IDF) des annonces publiées ou modifiées"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--full', action='store_true', help="Recalcule toutes les annonces (après un import en masse)")
+        parser.add_argument('--memory-mb', type=int, default=None, help="Mémoire allouée aux blocs de scores (Mo)")
+
+    def handle(self, *args, **options):
+        processed, updated = build_neighbours(full=options['full'], memory_mb=options['memory_mb'])
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ {processed} annonce(s) traitée(s), {updated} liste(s) existante(s) mise(s) à jour."
+        ))
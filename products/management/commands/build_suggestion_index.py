@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from products.suggestions import title_index
+
+
+class Command(BaseCommand):
+    help = "Reconstruit l'index de suggestions de titres et écrit l'instantané utilisé au démarrage des workers"
+
+    def handle(self, *args, **kwargs):
+        title_index.rebuild()
+        title_index.save_snapshot()
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Index de suggestions reconstruit : {len(title_index.keys)} titres → {title_index.snapshot_path}"
+        ))
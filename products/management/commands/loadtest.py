@@ -0,0 +1,400 @@
+import http.client
+import json
+import math
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+from collections import defaultdict
+from datetime import timedelta
+from decimal import Decimal
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from accounts.models import User
+from cities.models import City
+from djibtrade.counting import bump_table_version
+from products.models import Category, Product, whatsapp_link_for
+from products.suggestions import bump_version as bump_suggestions_version
+from subscriptions.models import Subscription
+
+# Comptes de test reconnaissables (réutilisés d'un lancement à l'autre, supprimés par --cleanup)
+EMAIL_DOMAIN = 'loadtest.djibtrade.local'
+PASSWORD = 'LoadTest-2024!'
+
+# Répartition du trafic par défaut (poids relatifs)
+DEFAULT_MIX = {'browse': 40, 'category': 25, 'retrieve': 25, 'login': 5, 'create': 5}
+
+# Attente avant de retenter une connexion refusée (429, identifiants) : doublée à chaque échec
+LOGIN_BACKOFF = 1.0
+LOGIN_BACKOFF_MAX = 30.0
+
+PRODUCT_WORDS = ('Lot', 'Carton', 'Palette', 'Conteneur', 'Sac', 'Fût', 'Caisse', 'Stock')
+QUALITIES = ('qualité export', 'premier choix', 'import Dubaï', 'origine Éthiopie', 'livraison port', 'prix de gros')
+
+
+class Command(BaseCommand):
+    help = ("Peuple une place de marché réaliste puis envoie un trafic concurrent mixte sur les vraies URLs "
+            "et rapporte débit, latences p50/p95/p99 et taux d'erreur par endpoint (JSON)")
+
+    def add_arguments(self, parser):
+        # --- Données ---
+        parser.add_argument('--users', type=int, default=1000, help="Nombre d'utilisateurs à créer")
+        parser.add_argument('--products', type=int, default=20000, help="Nombre d'annonces à créer")
+        parser.add_argument('--premium-ratio', type=float, default=0.1, help="Part de vendeurs premium")
+        parser.add_argument('--moderator-ratio', type=float, default=0.01, help="Part de modérateurs")
+        parser.add_argument('--skip-seed', action='store_true', help="Réutilise les données d'un lancement précédent")
+        parser.add_argument('--cleanup', action='store_true', help="Supprime les données de test à la fin")
+        # --- Trafic ---
+        parser.add_argument('--url', help="Serveur déjà démarré (ex. http://127.0.0.1:8000) ; sinon runserver local")
+        parser.add_argument('--port', type=int, default=8765, help="Port du serveur local")
+        parser.add_argument(
+            '--no-throttle', action='store_true',
+            help="Serveur local sans limites de débit (sinon les refus 429 sont attendus et comptés à part)",
+        )
+        parser.add_argument('--concurrency', type=int, default=20, help="Clients virtuels simultanés")
+        parser.add_argument('--duration', type=float, default=30, help="Durée de la mesure (secondes)")
+        parser.add_argument('--mix', help="Répartition du trafic, ex. browse=40,category=25,retrieve=25,login=5,create=5")
+        parser.add_argument('--output', help="Fichier où écrire le rapport JSON")
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        self.random = random.Random(options['seed'])
+        mix = self._parse_mix(options['mix'])
+
+        if not options['skip_seed']:
+            self._seed(options)
+        self.accounts = list(
+            User.objects.filter(email__endswith=f'@{EMAIL_DOMAIN}', role='user').values_list('email', flat=True)
+        )
+        self.category_ids = list(Category.objects.values_list('pk', flat=True))
+        self.product_ids = list(Product.objects.filter(owner__email__endswith=f'@{EMAIL_DOMAIN}').values_list('pk', flat=True))
+        if not self.accounts or not self.product_ids:
+            raise CommandError("Aucune donnée de test : relancez sans --skip-seed.")
+
+        server = None
+        base_url = options['url']
+        if base_url and options['no_throttle']:
+            raise CommandError("--no-throttle ne s'applique qu'au serveur local (sans --url).")
+        if not base_url:
+            base_url = f"http://127.0.0.1:{options['port']}"
+            server = self._start_server(options['port'], throttle=not options['no_throttle'])
+        try:
+            self._wait_ready(base_url)
+            report = self._run(base_url, mix, options['concurrency'], options['duration'])
+        finally:
+            if server is not None:
+                server.terminate()
+                server.wait(timeout=10)
+
+        report['config'] = {
+            'url': base_url,
+            'concurrency': options['concurrency'],
+            'duration_s': options['duration'],
+            'mix': mix,
+            'users': len(self.accounts),
+            'products': len(self.product_ids),
+            'categories': len(self.category_ids),
+            # None : serveur externe, ses propres réglages s'appliquent
+            'throttling': None if options['url'] else not options['no_throttle'],
+        }
+        output = json.dumps(report, indent=2, ensure_ascii=False)
+        self.stdout.write(output)
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                f.write(output)
+
+        if options['cleanup']:
+            deleted, _ = User.objects.filter(email__endswith=f'@{EMAIL_DOMAIN}').delete()
+            bump_table_version(User)
+            bump_table_version(Product)
+            bump_suggestions_version()
+            self.stdout.write(self.style.WARNING(f"🗑️ {deleted} enregistrements de test supprimés."))
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ {report['total']['requests']} requêtes, {report['total']['rps']} req/s, "
+            f"{report['total']['error_rate'] * 100:.2f} % d'erreurs, "
+            f"{report['total']['throttled']} refus des limites de débit."
+        ))
+
+    def _parse_mix(self, raw):
+        if not raw:
+            return dict(DEFAULT_MIX)
+        mix = {}
+        for part in raw.split(','):
+            name, _, weight = part.partition('=')
+            if name.strip() not in DEFAULT_MIX:
+                raise CommandError(f"Scénario inconnu : {name} (attendus : {', '.join(DEFAULT_MIX)})")
+            mix[name.strip()] = int(weight)
+        return mix
+
+    # ==========================
+    # 🔹 Données de test (insertions groupées)
+    # ==========================
+    def _seed(self, options):
+        started = time.perf_counter()
+        if not Category.objects.exists():
+            call_command('populate_categories', stdout=self.stdout)
+        categories = list(Category.objects.values_list('pk', flat=True))
+        cities = list(City.objects.values_list('pk', 'name'))
+
+        User.objects.filter(email__endswith=f'@{EMAIL_DOMAIN}').delete()
+        # Un seul hachage pour tous les comptes : même mot de passe, login réel côté serveur
+        password = make_password(PASSWORD)
+        users = []
+        for i in range(options['users']):
+            roll = self.random.random()
+            city = self.random.choice(cities) if cities else None
+            users.append(User(
+                email=f'user{i}@{EMAIL_DOMAIN}',
+                company_name=f'Négoce {i}',
+                phone=f'+253 77 {i // 10000 % 100:02d} {i // 100 % 100:02d} {i % 100:02d}',
+                password=password,
+                role='moderator' if roll < options['moderator_ratio'] else 'user',
+                is_premium=self.random.random() < options['premium_ratio'],
+                city_ref_id=city[0] if city else None,
+                city=city[1] if city else None,
+            ))
+        users = User.objects.bulk_create(users, batch_size=1000)
+
+        now = timezone.now()
+        Subscription.objects.bulk_create(
+            [
+                Subscription(user=user, plan='PREMIUM', end_date=now + timedelta(days=self.random.randint(1, 365)))
+                if user.is_premium else Subscription(user=user, plan='FREE')
+                for user in users
+            ],
+            batch_size=1000,
+        )
+
+        sellers = [user for user in users if user.role == 'user']
+        products = []
+        for i in range(options['products']):
+            # Quelques gros vendeurs, beaucoup de petits
+            owner = sellers[min(int(self.random.paretovariate(1.2)) - 1, len(sellers) - 1)] if self.random.random() < 0.3 \
+                else self.random.choice(sellers)
+            city = self.random.choice(cities) if cities else None
+            products.append(Product(
+                owner=owner,
+                title=f"{self.random.choice(PRODUCT_WORDS)} {i} – {self.random.choice(QUALITIES)}",
+                description="Marchandise disponible immédiatement, enlèvement ou livraison à Djibouti.",
+                unit_price=Decimal(round(self.random.lognormvariate(8, 1.5), 2)),
+                currency='DJF' if self.random.random() < 0.8 else 'USD',
+                quantity=self.random.randint(1, 500),
+                category_id=self.random.choice(categories),
+                city_ref_id=city[0] if city else None,
+                city=city[1] if city else None,
+                whatsapp_link=whatsapp_link_for(owner.phone),
+                boost=1 if owner.is_premium else 0,
+            ))
+        Product.objects.bulk_create(products, batch_size=2000)
+
+        # bulk_create n'envoie pas de signaux : les comptages en cache sont invalidés ici
+        for model in (User, Subscription, Product):
+            bump_table_version(model)
+        bump_suggestions_version()
+        self.stdout.write(
+            f"🌱 {len(users)} utilisateurs ({sum(u.is_premium for u in users)} premium), "
+            f"{len(products)} annonces dans {len(categories)} catégories en {time.perf_counter() - started:.1f}s"
+        )
+
+    # ==========================
+    # 🔹 Serveur
+    # ==========================
+    def _start_server(self, port, throttle=True):
+        """
+        runserver local (mêmes réglages et même base que cette commande).
+        Sans `throttle`, le serveur est lancé avec THROTTLE_DISABLED : les clients virtuels partagent
+        tous l'adresse 127.0.0.1 et épuiseraient sinon les seaux par adresse en quelques requêtes.
+        """
+        env = dict(os.environ, DJANGO_SETTINGS_MODULE=settings.SETTINGS_MODULE)
+        if not throttle:
+            env['THROTTLE_DISABLED'] = 'True'
+        return subprocess.Popen(
+            [sys.executable, 'manage.py', 'runserver', f'127.0.0.1:{port}', '--noreload'],
+            cwd=settings.BASE_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+
+    def _wait_ready(self, base_url, timeout=30):
+        client = HttpClient(base_url)
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            try:
+                if client.request('GET', '/api/annonces/categories/')[0] == 200:
+                    return
+            except (OSError, http.client.HTTPException):
+                pass
+            time.sleep(0.2)
+        raise CommandError(f"Le serveur {base_url} ne répond pas.")
+
+    # ==========================
+    # 🔹 Trafic
+    # ==========================
+    def _run(self, base_url, mix, concurrency, duration):
+        stats = Stats()
+        deadline = time.monotonic() + duration
+        threads = [
+            threading.Thread(target=self._virtual_user, args=(i, base_url, mix, deadline, stats))
+            for i in range(concurrency)
+        ]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return stats.report(time.perf_counter() - started)
+
+    def _virtual_user(self, index, base_url, mix, deadline, stats):
+        rng = random.Random(index)
+        # Tous les clients virtuels partagent l'adresse de cette machine : avec les limites de débit
+        # actives, les refus 429 (connexion, consultation) sont le comportement attendu
+        client = HttpClient(base_url)
+        email = rng.choice(self.accounts)
+        token = None
+        scenarios, weights = zip(*mix.items())
+        # Sans jeton, 'create' est remplacé par le reste du mix en attendant la prochaine tentative de connexion
+        anonymous = {name: weight for name, weight in mix.items() if name != 'create'}
+        backoff, next_login = LOGIN_BACKOFF, 0.0
+        # Pages réellement servies : au-delà, la liste répond 404
+        pages = max(1, math.ceil(len(self.product_ids) / settings.REST_FRAMEWORK['PAGE_SIZE']))
+        while (now := time.monotonic()) < deadline:
+            if token is None and 'create' in mix:
+                if now >= next_login:
+                    scenario = 'login'
+                elif anonymous:
+                    scenario = rng.choices(list(anonymous), list(anonymous.values()))[0]
+                else:
+                    time.sleep(min(next_login, deadline) - now)
+                    continue
+            else:
+                scenario = rng.choices(scenarios, weights)[0]
+            try:
+                if scenario == 'browse':
+                    result = client.request('GET', f'/api/annonces/products/?page={rng.randint(1, pages)}')
+                elif scenario == 'category':
+                    result = client.request('GET', f'/api/annonces/products/?category={rng.choice(self.category_ids)}')
+                elif scenario == 'retrieve':
+                    # Consultation anonyme : incrémente le compteur de vues
+                    result = client.request('GET', f'/api/annonces/products/{rng.choice(self.product_ids)}/')
+                elif scenario == 'login':
+                    result = client.request('POST', '/api/auth/login/', {'email': email, 'password': PASSWORD})
+                    if result[0] == 200:
+                        token = json.loads(result[2])['access']
+                        backoff = LOGIN_BACKOFF
+                else:
+                    result = client.request('POST', '/api/annonces/products/', {
+                        'title': f"Arrivage {rng.randint(1, 10 ** 6)} – {rng.choice(QUALITIES)}",
+                        'description': "Annonce créée par le test de charge.",
+                        'unit_price': f"{rng.lognormvariate(8, 1.5):.2f}",
+                        'quantity': rng.randint(1, 500),
+                        'currency': 'DJF',
+                        'category': rng.choice(self.category_ids),
+                    }, token=token)
+                status, elapsed, _ = result
+            except (OSError, http.client.HTTPException):
+                status, elapsed = None, 0.0
+            if scenario == 'login' and token is None:
+                next_login = time.monotonic() + backoff
+                backoff = min(backoff * 2, LOGIN_BACKOFF_MAX)
+            stats.record(scenario, status, elapsed)
+
+
+class HttpClient:
+    """Connexion HTTP persistante (keep-alive) d'un client virtuel."""
+
+    def __init__(self, base_url):
+        parts = urlsplit(base_url)
+        self.connection_class = http.client.HTTPSConnection if parts.scheme == 'https' else http.client.HTTPConnection
+        self.netloc = parts.netloc
+        self.connection = None
+
+    def reset(self):
+        if self.connection is not None:
+            self.connection.close()
+        self.connection = None
+
+    def request(self, method, path, payload=None, token=None):
+        """Retourne (statut, durée en secondes, corps)."""
+        if self.connection is None:
+            self.connection = self.connection_class(self.netloc, timeout=30)
+        headers = {'Accept': 'application/json'}
+        body = None
+        if payload is not None:
+            body = json.dumps(payload)
+            headers['Content-Type'] = 'application/json'
+        if token:
+            headers['Authorization'] = f'Bearer {token}'
+        started = time.perf_counter()
+        try:
+            self.connection.request(method, path, body=body, headers=headers)
+            response = self.connection.getresponse()
+            data = response.read()
+        except (OSError, http.client.HTTPException):
+            # Connexion inutilisable : la suivante sera rouverte
+            self.reset()
+            raise
+        elapsed = time.perf_counter() - started
+        if response.getheader('Connection', '').lower() == 'close':
+            self.reset()
+        return response.status, elapsed, data
+
+
+class Stats:
+    """Mesures par endpoint, partagées entre les clients virtuels."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.statuses = defaultdict(lambda: defaultdict(int))
+
+    def record(self, scenario, status, elapsed):
+        with self.lock:
+            self.statuses[scenario][str(status) if status else 'connection_error'] += 1
+            if status:
+                self.latencies[scenario].append(elapsed)
+
+    @staticmethod
+    def _percentile(values, q):
+        return round(values[min(int(len(values) * q), len(values) - 1)] * 1000, 2) if values else None
+
+    def _summary(self, latencies, statuses, elapsed):
+        requests = sum(statuses.values())
+        # Refus des limites de débit : comportement attendu, comptés à part (pas dans les erreurs)
+        errors = sum(
+            count for status, count in statuses.items() if not status.startswith(('2', '3')) and status != '429'
+        )
+        latencies = sorted(latencies)
+        return {
+            'requests': requests,
+            'rps': round(requests / elapsed, 1),
+            'p50_ms': self._percentile(latencies, 0.50),
+            'p95_ms': self._percentile(latencies, 0.95),
+            'p99_ms': self._percentile(latencies, 0.99),
+            'errors': errors,
+            'error_rate': round(errors / requests, 4) if requests else 0,
+            'throttled': statuses.get('429', 0),
+            'statuses': dict(statuses),
+        }
+
+    def report(self, elapsed):
+        with self.lock:
+            endpoints = {
+                scenario: self._summary(self.latencies[scenario], statuses, elapsed)
+                for scenario, statuses in sorted(self.statuses.items())
+            }
+            total_statuses = defaultdict(int)
+            for statuses in self.statuses.values():
+                for status, count in statuses.items():
+                    total_statuses[status] += count
+            all_latencies = [value for values in self.latencies.values() for value in values]
+            return {
+                'elapsed_s': round(elapsed, 2),
+                'total': self._summary(all_latencies, total_statuses, elapsed),
+                'endpoints': endpoints,
+            }
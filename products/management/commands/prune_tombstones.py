@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from products.changes import prune_tombstones
+
+
+class Command(BaseCommand):
+    help = "Purge les traces d'annonces supprimées plus anciennes que CHANGES_TOMBSTONE_RETENTION"
+
+    def handle(self, *args, **options):
+        deleted = prune_tombstones()
+        self.stdout.write(self.style.SUCCESS(f"✅ {deleted} traces de suppression purgées."))
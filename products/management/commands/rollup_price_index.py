@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from products.price_index import rollup_price_index
+
+
+class Command(BaseCommand):
+    help = "Met à jour l'indice quotidien des prix par catégorie et devise (jours modifiés uniquement)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--full', action='store_true', help="Recalcule tous les jours (après un import en masse)")
+
+    def handle(self, *args, **options):
+        days, rows = rollup_price_index(full=options['full'])
+        self.stdout.write(self.style.SUCCESS(f"✅ {days} jour(s) recalculé(s), {rows} ligne(s) d'indice écrite(s)."))
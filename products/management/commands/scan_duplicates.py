@@ -0,0 +1,47 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from products.duplicates import index_products_bulk, find_duplicate
+from products.models import Product, next_change_seq
+
+
+class Command(BaseCommand):
+    help = "Calcule les signatures MinHash du catalogue existant par lots et marque les annonces en double"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=1000, help="Nombre d'annonces traitées par lot")
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        queryset = Product.objects.order_by('pk').values_list('pk', 'owner_id', 'title', 'description', 'duplicate_of_id')
+
+        last_pk = 0
+        scanned = flagged = 0
+        while True:
+            rows = list(queryset.filter(pk__gt=last_pk)[:chunk_size])
+            if not rows:
+                break
+            last_pk = rows[-1][0]
+
+            signatures = index_products_bulk([row[:4] for row in rows])
+
+            # Parcours par clé croissante : l'annonce la plus ancienne reste l'originale
+            updates = {}
+            for pk, owner_id, _, _, duplicate_of_id in rows:
+                match = find_duplicate(owner_id, signatures[pk], before_pk=pk)
+                duplicate_of = match[0] if match else None
+                if duplicate_of != duplicate_of_id:
+                    updates.setdefault(duplicate_of, []).append(pk)
+                flagged += bool(match)
+
+            for duplicate_of, pks in updates.items():
+                with transaction.atomic():
+                    Product.objects.filter(pk__in=pks).update(
+                        duplicate_of=duplicate_of, updated_at=timezone.now(), change_seq=next_change_seq(),
+                    )
+
+            scanned += len(rows)
+            self.stdout.write(f"… {scanned} annonces analysées")
+
+        self.stdout.write(self.style.SUCCESS(f"✅ {scanned} annonces analysées, {flagged} doublons détectés."))
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:50
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_boost(apps, schema_editor):
+    # Un seul UPDATE : les annonces des vendeurs déjà premium passent en tête
+    Product = apps.get_model('products', 'Product')
+    Product.objects.filter(owner__is_premium=True).update(boost=1)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0005_alter_product_category_alter_product_city_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='boost',
+            field=models.PositiveSmallIntegerField(default=0, editable=False, help_text='Clé de classement dénormalisée (1 = vendeur premium), mise à jour en masse'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['-boost', '-created_at'], name='product_feed_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['category', '-boost', '-created_at'], name='product_category_feed_idx'),
+        ),
+        migrations.RunPython(backfill_boost, migrations.RunPython.noop),
+    ]
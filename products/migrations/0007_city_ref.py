@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:51
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+from cities.backfill import backfill_city_refs
+
+
+def backfill(apps, schema_editor):
+    backfill_city_refs(apps, 'products.Product')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cities', '0001_initial'),
+        ('products', '0006_product_boost'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='city_ref',
+            field=models.ForeignKey(blank=True, editable=False, help_text='Ville normalisée (renseignée automatiquement à partir de `city`)', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='products', to='cities.city'),
+        ),
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:54
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0007_city_ref'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductSignature',
+            fields=[
+                ('product', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='signature', serialize=False, to='products.product')),
+                ('signature', models.BinaryField(help_text='128 entiers 32 bits (petit-boutiste)')),
+            ],
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='duplicate_of',
+            field=models.ForeignKey(blank=True, editable=False, help_text='Annonce plus ancienne du même vendeur dont celle-ci est quasi identique', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='duplicates', to='products.product'),
+        ),
+        migrations.CreateModel(
+            name='ProductLSHBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.BigIntegerField(help_text='Empreinte de la bande (numéro de bande inclus)')),
+                ('owner', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='lsh_buckets', to='products.product')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['owner', 'key'], name='product_lsh_owner_key_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.18 on 2026-10-19 13:01
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def backfill_updated_at(apps, schema_editor):
+    """Les annonces existantes sont datées de leur création (un seul UPDATE)."""
+    Product = apps.get_model('products', 'Product')
+    Product.objects.update(updated_at=F('created_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0008_duplicate_detection'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductTombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('product_id', models.BigIntegerField(help_text="Identifiant de l'annonce supprimée")),
+                ('deleted_at', models.DateTimeField(help_text='Date de suppression')),
+            ],
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, help_text='Date de dernière modification (flux des changements)'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['updated_at', 'id'], name='product_changes_idx'),
+        ),
+        migrations.RunPython(backfill_updated_at, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='producttombstone',
+            index=models.Index(fields=['deleted_at', 'product_id'], name='product_tombstone_idx'),
+        ),
+    ]
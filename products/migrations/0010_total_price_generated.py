@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-19 13:17
+
+import django.db.models.expressions
+import django.db.models.functions.math
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    """
+    total_price devient une colonne générée (unit_price × quantity).
+    Une colonne ordinaire ne peut pas être convertie : elle est supprimée puis recréée,
+    et la base calcule elle-même la valeur de chaque ligne existante lors de l'ajout
+    (sans aller-retour Python ni fenêtre où le prix total serait faux).
+    """
+
+    dependencies = [
+        ('products', '0009_change_feed'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='product',
+            name='total_price',
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='total_price',
+            field=models.GeneratedField(db_persist=True, expression=django.db.models.functions.math.Round(django.db.models.expressions.CombinedExpression(models.F('unit_price'), '*', models.F('quantity')), 2), help_text='Prix total (unit_price × quantity) calculé par la base de données', output_field=models.DecimalField(decimal_places=2, max_digits=12)),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['total_price', 'id'], name='product_total_price_idx'),
+        ),
+    ]
@@ -0,0 +1,118 @@
+# Generated by Django 5.2.18 on 2026-10-19 13:23
+
+import django.db.models.deletion
+import django.db.models.expressions
+import django.db.models.functions.math
+import products.models
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import DateTimeField, F, Value
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+BACKFILL_BATCH_SIZE = 10000
+
+
+def backfill_expires_at(apps, schema_editor):
+    """
+    Annonces existantes : expiration = création + LISTING_LIFETIME, mais jamais avant
+    maintenant + LISTING_EXPIRY_GRACE (les anciennes annonces ne sont pas archivées dès le déploiement),
+    par tranches d'identifiants (transactions et verrous courts sur une grande table).
+    """
+    Product = apps.get_model('products', 'Product')
+    lifetime = getattr(settings, 'LISTING_LIFETIME', timedelta(days=90))
+    grace = getattr(settings, 'LISTING_EXPIRY_GRACE', timedelta(days=7))
+    earliest = Value(timezone.now() + grace, output_field=DateTimeField())
+    last_pk = 0
+    while True:
+        bound = Product.objects.filter(pk__gt=last_pk).order_by('pk').values_list('pk', flat=True)[BACKFILL_BATCH_SIZE - 1:BACKFILL_BATCH_SIZE]
+        upper = bound[0] if bound else None
+        batch = Product.objects.filter(pk__gt=last_pk, expires_at__isnull=True)
+        if upper is not None:
+            batch = batch.filter(pk__lte=upper)
+        batch.update(expires_at=Greatest(F('created_at') + lifetime, earliest))
+        if upper is None:
+            break
+        last_pk = upper
+
+
+class Migration(migrations.Migration):
+    # Chaque lot du remplissage est validé séparément (pas de transaction unique sur toute la table)
+    atomic = False
+
+    dependencies = [
+        ('cities', '0001_initial'),
+        ('products', '0010_total_price_generated'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedProduct',
+            fields=[
+                ('id', models.BigIntegerField(help_text="Identifiant d'origine de l'annonce", primary_key=True, serialize=False)),
+                ('title', models.CharField(max_length=255)),
+                ('description', models.TextField(blank=True, null=True)),
+                ('unit_price', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('currency', models.CharField(choices=[('DJF', 'Franc Djiboutien'), ('USD', 'Dollar Américain')], default='DJF', max_length=3)),
+                ('quantity', models.PositiveIntegerField(default=1)),
+                ('total_price', models.GeneratedField(db_persist=True, expression=django.db.models.functions.math.Round(django.db.models.expressions.CombinedExpression(models.F('unit_price'), '*', models.F('quantity')), 2), output_field=models.DecimalField(decimal_places=2, max_digits=12))),
+                ('city', models.CharField(blank=True, max_length=100, null=True)),
+                ('image', models.ImageField(blank=True, null=True, upload_to='products/')),
+                ('whatsapp_link', models.URLField(blank=True, max_length=255, null=True)),
+                ('views', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+                ('expires_at', models.DateTimeField()),
+                ('duplicate_of_id', models.BigIntegerField(blank=True, null=True)),
+                ('boost', models.PositiveSmallIntegerField(default=0)),
+                ('archived_at', models.DateTimeField(help_text="Date d'archivage")),
+                ('archive_reason', models.CharField(choices=[('expired', 'Expirée'), ('sold_out', 'Épuisée')], max_length=10)),
+            ],
+            options={
+                'verbose_name': 'Annonce archivée',
+                'verbose_name_plural': 'Annonces archivées',
+            },
+        ),
+        # Colonne ajoutée vide, remplie par lots, puis rendue obligatoire
+        migrations.AddField(
+            model_name='product',
+            name='expires_at',
+            field=models.DateTimeField(null=True, help_text="Date à laquelle l'annonce est archivée"),
+        ),
+        migrations.RunPython(backfill_expires_at, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='product',
+            name='expires_at',
+            field=models.DateTimeField(default=products.models.listing_expiry, help_text="Date à laquelle l'annonce est archivée"),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['expires_at', 'id'], name='product_expiry_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(condition=models.Q(('quantity', 0)), fields=['id'], name='product_sold_out_idx'),
+        ),
+        migrations.AddField(
+            model_name='archivedproduct',
+            name='category',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='products.category'),
+        ),
+        migrations.AddField(
+            model_name='archivedproduct',
+            name='city_ref',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='cities.city'),
+        ),
+        migrations.AddField(
+            model_name='archivedproduct',
+            name='owner',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_products', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='archivedproduct',
+            index=models.Index(fields=['owner', '-archived_at'], name='archived_product_owner_idx'),
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.18 on 2026-10-19 13:25
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0011_listing_archive'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PriceIndexDirtyDay',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(unique=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='PriceIndex',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('currency', models.CharField(choices=[('DJF', 'Franc Djiboutien'), ('USD', 'Dollar Américain')], max_length=3)),
+                ('day', models.DateField()),
+                ('count', models.PositiveIntegerField(help_text="Nombre d'annonces")),
+                ('min_price', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('p25_price', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('median_price', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('p75_price', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('max_price', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('avg_price', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('category', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='price_index', to='products.category')),
+            ],
+            options={
+                'verbose_name': 'Indice de prix',
+                'verbose_name_plural': 'Indices de prix',
+                'constraints': [models.UniqueConstraint(fields=('category', 'currency', 'day'), name='price_index_unique')],
+            },
+        ),
+    ]
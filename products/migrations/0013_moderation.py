@@ -0,0 +1,45 @@
+# Generated by Django 5.2.18 on 2026-10-19 13:27
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0012_price_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='archivedproduct',
+            name='is_hidden',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='is_hidden',
+            field=models.BooleanField(default=False, help_text='Masquée par la modération : absente des listes, de la consultation et du flux des changements'),
+        ),
+        migrations.CreateModel(
+            name='ModerationLog',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('action', models.CharField(choices=[('delete', 'Suppression'), ('hide', 'Masquage'), ('unhide', 'Remise en ligne'), ('recategorize', 'Changement de catégorie')], max_length=20)),
+                ('product_ids', models.JSONField(blank=True, default=list, help_text="Annonces visées (vide si l'action vise un vendeur)")),
+                ('target_owner_id', models.BigIntegerField(blank=True, help_text='Vendeur visé (toutes ses annonces)', null=True)),
+                ('category_id', models.BigIntegerField(blank=True, help_text='Nouvelle catégorie (changement de catégorie)', null=True)),
+                ('reason', models.CharField(blank=True, max_length=255)),
+                ('affected', models.PositiveIntegerField(default=0, help_text="Nombre d'annonces effectivement touchées")),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('actor', models.ForeignKey(help_text="Auteur de l'action", null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='moderation_actions', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Action de modération',
+                'verbose_name_plural': 'Journal de modération',
+                'indexes': [models.Index(fields=['-created_at'], name='moderation_log_created_idx')],
+            },
+        ),
+    ]
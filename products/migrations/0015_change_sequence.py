@@ -0,0 +1,65 @@
+# Generated by Django 5.2.18 on 2026-10-19 13:50
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def create_sequence(apps, schema_editor):
+    """Ligne unique du compteur ; les annonces et suppressions existantes restent au numéro 0."""
+    apps.get_model('products', 'ChangeSequence').objects.get_or_create(pk=1)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cities', '0001_initial'),
+        ('products', '0014_similar_products'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChangeSequence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('value', models.BigIntegerField(default=0)),
+                ('min_cursor_seq', models.BigIntegerField(default=0)),
+            ],
+        ),
+        migrations.RemoveIndex(
+            model_name='product',
+            name='product_changes_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='producttombstone',
+            name='product_tombstone_idx',
+        ),
+        migrations.AddField(
+            model_name='archivedproduct',
+            name='change_seq',
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='change_seq',
+            field=models.BigIntegerField(default=0, editable=False, help_text='Position dans le flux des changements (next_change_seq), attribuée à chaque modification'),
+        ),
+        migrations.AddField(
+            model_name='producttombstone',
+            name='change_seq',
+            field=models.BigIntegerField(default=0, help_text='Position dans le flux des changements'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['change_seq', 'id'], name='product_changes_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='producttombstone',
+            index=models.Index(fields=['change_seq', 'product_id'], name='product_tombstone_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='producttombstone',
+            index=models.Index(fields=['deleted_at'], name='product_tombstone_prune_idx'),
+        ),
+        migrations.RunPython(create_sequence, migrations.RunPython.noop),
+    ]
@@ -1,5 +1,36 @@
-from django.db import models
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db import models, transaction
+from django.db.models import F, Q
+from django.db.models.functions import Round
 from django.conf import settings
+from django.utils import timezone
+
+
+def whatsapp_link_for(phone):
+    """Lien WhatsApp direct à partir du numéro du vendeur (None sans numéro)."""
+    if not phone:
+        return None
+    return f"https://wa.me/{str(phone).replace(' ', '').replace('+', '')}"
+
+
+def next_change_seq():
+    """
+    Numéro suivant du flux des changements, à prendre dans la transaction qui écrit les annonces,
+    avant de verrouiller des lignes Product (même ordre des verrous partout : pas d'interblocage).
+    La ligne du compteur reste verrouillée jusqu'au commit : les numéros sont attribués dans l'ordre
+    de validation, et un numéro déjà lu par un client ne peut plus apparaître « derrière » son curseur.
+    """
+    if not ChangeSequence.objects.filter(pk=1).update(value=F('value') + 1):
+        ChangeSequence.objects.get_or_create(pk=1)
+        ChangeSequence.objects.filter(pk=1).update(value=F('value') + 1)
+    return ChangeSequence.objects.values_list('value', flat=True).get(pk=1)
+
+
+def listing_expiry():
+    """Date d'expiration par défaut d'une nouvelle annonce (aussi appliquée par bulk_create)."""
+    return timezone.now() + getattr(settings, 'LISTING_LIFETIME', timedelta(days=90))
 
 
 class Category(models.Model):
@@ -47,11 +78,13 @@ class Product(models.Model):
         help_text="Devise du prix"
     )
     quantity = models.PositiveIntegerField(default=1, help_text="Quantité disponible")
-    total_price = models.DecimalField(
-        max_digits=12,
-        decimal_places=2,
-        blank=True,
-        help_text="Prix total calculé automatiquement"
+    # Colonne générée par la base : toujours exacte, y compris après update(), bulk_create() et bulk_update().
+    # Arrondie au centime : SQLite calcule le produit en virgule flottante (19.99 × 7 = 139.92999999999998)
+    total_price = models.GeneratedField(
+        expression=Round(models.F('unit_price') * models.F('quantity'), 2),
+        output_field=models.DecimalField(max_digits=12, decimal_places=2),
+        db_persist=True,
+        help_text="Prix total (unit_price × quantity) calculé par la base de données"
     )
 
     # --- Classification ---
@@ -63,6 +96,15 @@ class Product(models.Model):
         help_text="Catégorie du produit"
     )
     city = models.CharField(max_length=100, blank=True, null=True, help_text="Ville de disponibilité")
+    city_ref = models.ForeignKey(
+        'cities.City',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        editable=False,
+        related_name='products',
+        help_text="Ville normalisée (renseignée automatiquement à partir de `city`)"
+    )
 
     # --- Médias ---
     image = models.ImageField(upload_to='products/', blank=True, null=True, help_text="Image du produit")
@@ -73,22 +115,311 @@ class Product(models.Model):
     # --- Statistiques ---
     views = models.PositiveIntegerField(default=0, help_text="Nombre de vues")
     created_at = models.DateTimeField(auto_now_add=True, help_text="Date de création de l'annonce")
+    updated_at = models.DateTimeField(auto_now=True, help_text="Date de dernière modification (flux des changements)")
+    change_seq = models.BigIntegerField(
+        default=0,
+        editable=False,
+        help_text="Position dans le flux des changements (next_change_seq), attribuée à chaque modification"
+    )
+    expires_at = models.DateTimeField(default=listing_expiry, help_text="Date à laquelle l'annonce est archivée")
+
+    # --- Doublons ---
+    duplicate_of = models.ForeignKey(
+        'self',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        editable=False,
+        related_name='duplicates',
+        help_text="Annonce plus ancienne du même vendeur dont celle-ci est quasi identique"
+    )
+
+    # --- Classement ---
+    boost = models.PositiveSmallIntegerField(
+        default=0,
+        editable=False,
+        help_text="Clé de classement dénormalisée (1 = vendeur premium), mise à jour en masse"
+    )
+
+    # --- Modération ---
+    is_hidden = models.BooleanField(
+        default=False,
+        help_text="Masquée par la modération : absente des listes, de la consultation et du flux des changements"
+    )
+
+    class Meta:
+        indexes = [
+            # Fil boosté : ORDER BY boost DESC, created_at DESC parcouru directement dans l'index
+            models.Index(fields=['-boost', '-created_at'], name='product_feed_idx'),
+            models.Index(fields=['category', '-boost', '-created_at'], name='product_category_feed_idx'),
+            # Flux des changements : parcours par (change_seq, id) croissants
+            models.Index(fields=['change_seq', 'id'], name='product_changes_idx'),
+            # Tri et filtres par fourchette sur le prix total
+            models.Index(fields=['total_price', 'id'], name='product_total_price_idx'),
+            # Indice des prix : annonces publiées pendant des plages de jours
+            models.Index(fields=['created_at'], name='product_created_idx'),
+            # Archivage : annonces expirées, puis annonces épuisées (index partiel, quelques lignes)
+            models.Index(fields=['expires_at', 'id'], name='product_expiry_idx'),
+            models.Index(fields=['id'], name='product_sold_out_idx', condition=Q(quantity=0)),
+        ]
 
     def save(self, *args, **kwargs):
         """
-        - Calcule automatiquement le prix total = unit_price × quantity.
         - Génère automatiquement le lien WhatsApp si l'utilisateur a un numéro de téléphone.
+        - Initialise la clé de classement selon le statut premium du vendeur.
+        - Prend le numéro suivant du flux des changements dans la même transaction que l'écriture
+          (sauf pour le seul compteur de vues, absent du flux).
+        Les champs dérivés du vendeur ne sont calculés qu'à partir d'un vendeur déjà chargé
+        (request.user, formulaire d'admin) : une modification d'annonce ne relit jamais le vendeur.
+        Ensuite, propagate_contact() et propagate_boost() les maintiennent par UPDATE groupés.
         """
-        # Calcul automatique du prix total
-        if self.unit_price and self.quantity:
-            self.total_price = self.unit_price * self.quantity
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and set(update_fields) <= {'views'}:
+            return self._save_product(*args, **kwargs)
+        if update_fields is not None:
+            kwargs['update_fields'] = {*update_fields, 'change_seq'}
+        with transaction.atomic():
+            self.change_seq = next_change_seq()
+            self._save_product(*args, **kwargs)
 
-        # Génération automatique du lien WhatsApp
-        if self.owner and hasattr(self.owner, 'phone') and self.owner.phone:
-            phone_number = str(self.owner.phone).replace(" ", "").replace("+", "")
-            self.whatsapp_link = f"https://wa.me/{phone_number}"
+    def _save_product(self, *args, **kwargs):
+        owner = self._loaded_owner()
+        if owner is not None:
+            # Génération automatique du lien WhatsApp
+            self.whatsapp_link = whatsapp_link_for(owner.phone)
+
+            # Clé de classement à la création ; ensuite maintenue par propagate_boost()
+            if self._state.adding:
+                self.boost = 1 if owner.is_premium else 0
 
         super().save(*args, **kwargs)
 
+        # Valeur calculée par la base, reproduite ici pour éviter de relire la ligne
+        if self.unit_price is not None and self.quantity is not None:
+            self.total_price = (Decimal(self.unit_price) * self.quantity).quantize(Decimal('0.01'))
+
+    def _loaded_owner(self):
+        """
+        Vendeur de l'annonce sans requête supplémentaire lorsqu'il est déjà en mémoire.
+        À la création avec un simple owner_id, seules les deux colonnes utiles sont lues.
+        """
+        if Product.owner.is_cached(self):
+            return self.owner
+        if self._state.adding and self.owner_id is not None:
+            from django.contrib.auth import get_user_model
+
+            return get_user_model().objects.only('phone', 'is_premium').filter(pk=self.owner_id).first()
+        return None
+
     def __str__(self):
         return self.title
+
+
+class ProductSignature(models.Model):
+    """
+    Signature MinHash du titre et de la description d'une annonce (détection des doublons).
+    """
+    product = models.OneToOneField(Product, on_delete=models.CASCADE, primary_key=True, related_name='signature')
+    signature = models.BinaryField(help_text="128 entiers 32 bits (petit-boutiste)")
+
+
+class ProductLSHBucket(models.Model):
+    """
+    Seau LSH d'une bande de la signature MinHash.
+    Deux annonces du même vendeur partageant un seau sont candidates au doublon.
+    """
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='lsh_buckets')
+    # Index composite (owner, key) ci-dessous : pas d'index séparé sur owner
+    owner = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='+', db_index=False)
+    key = models.BigIntegerField(help_text="Empreinte de la bande (numéro de bande inclus)")
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['owner', 'key'], name='product_lsh_owner_key_idx'),
+        ]
+
+
+class ProductTombstone(models.Model):
+    """
+    Trace d'une annonce supprimée, pour que les clients synchronisés la retirent.
+    Conservée CHANGES_TOMBSTONE_RETENTION, puis purgée (`prune_tombstones`).
+    """
+    product_id = models.BigIntegerField(help_text="Identifiant de l'annonce supprimée")
+    deleted_at = models.DateTimeField(help_text="Date de suppression")
+    change_seq = models.BigIntegerField(default=0, help_text="Position dans le flux des changements")
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['change_seq', 'product_id'], name='product_tombstone_idx'),
+            # Purge par date
+            models.Index(fields=['deleted_at'], name='product_tombstone_prune_idx'),
+        ]
+
+    def __str__(self):
+        return f"Annonce {self.product_id} supprimée le {self.deleted_at:%Y-%m-%d %H:%M}"
+
+
+class ChangeSequence(models.Model):
+    """
+    Compteur du flux des changements (une seule ligne, pk=1), incrémenté par next_change_seq().
+    `min_cursor_seq` : suit la dernière suppression purgée ; un curseur antérieur a pu en manquer (expiré).
+    """
+    value = models.BigIntegerField(default=0)
+    min_cursor_seq = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return f"Flux des changements : {self.value}"
+
+
+class ArchivedProduct(models.Model):
+    """
+    Annonce expirée ou épuisée, sortie de la table Product par la commande `archive_listings`.
+    Même schéma que Product (identifiant d'origine conservé) : le vendeur peut la restaurer à l'identique.
+    Les listes et recherches ne lisent jamais cette table.
+    """
+    REASON_CHOICES = [
+        ('expired', 'Expirée'),
+        ('sold_out', 'Épuisée'),
+    ]
+
+    id = models.BigIntegerField(primary_key=True, help_text="Identifiant d'origine de l'annonce")
+    owner = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='archived_products')
+    title = models.CharField(max_length=255)
+    description = models.TextField(blank=True, null=True)
+    unit_price = models.DecimalField(max_digits=10, decimal_places=2)
+    currency = models.CharField(max_length=3, choices=Product.CURRENCY_CHOICES, default='DJF')
+    quantity = models.PositiveIntegerField(default=1)
+    total_price = models.GeneratedField(
+        expression=Round(models.F('unit_price') * models.F('quantity'), 2),
+        output_field=models.DecimalField(max_digits=12, decimal_places=2),
+        db_persist=True,
+    )
+    category = models.ForeignKey(Category, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    city = models.CharField(max_length=100, blank=True, null=True)
+    city_ref = models.ForeignKey('cities.City', on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    image = models.ImageField(upload_to='products/', blank=True, null=True)
+    whatsapp_link = models.URLField(max_length=255, blank=True, null=True)
+    views = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    change_seq = models.BigIntegerField(default=0)
+    expires_at = models.DateTimeField()
+    # L'annonce d'origine peut elle-même être archivée : simple identifiant
+    duplicate_of_id = models.BigIntegerField(null=True, blank=True)
+    boost = models.PositiveSmallIntegerField(default=0)
+    is_hidden = models.BooleanField(default=False)
+
+    # --- Archivage ---
+    archived_at = models.DateTimeField(help_text="Date d'archivage")
+    archive_reason = models.CharField(max_length=10, choices=REASON_CHOICES)
+
+    class Meta:
+        verbose_name = "Annonce archivée"
+        verbose_name_plural = "Annonces archivées"
+        indexes = [
+            # Annonces archivées d'un vendeur, les plus récentes d'abord
+            models.Index(fields=['owner', '-archived_at'], name='archived_product_owner_idx'),
+            models.Index(fields=['created_at'], name='archived_product_created_idx'),
+        ]
+
+    def __str__(self):
+        return self.title
+
+
+class PriceIndex(models.Model):
+    """
+    Cours du jour : statistiques des prix unitaires des annonces publiées un jour donné,
+    par catégorie et devise (annonces archivées comprises).
+    Série compacte calculée par la commande `rollup_price_index`, lue par /categories/<id>/price-index/.
+    """
+    category = models.ForeignKey(Category, on_delete=models.CASCADE, related_name='price_index')
+    currency = models.CharField(max_length=3, choices=Product.CURRENCY_CHOICES)
+    day = models.DateField()
+    count = models.PositiveIntegerField(help_text="Nombre d'annonces")
+    min_price = models.DecimalField(max_digits=12, decimal_places=2)
+    p25_price = models.DecimalField(max_digits=12, decimal_places=2)
+    median_price = models.DecimalField(max_digits=12, decimal_places=2)
+    p75_price = models.DecimalField(max_digits=12, decimal_places=2)
+    max_price = models.DecimalField(max_digits=12, decimal_places=2)
+    avg_price = models.DecimalField(max_digits=12, decimal_places=2)
+
+    class Meta:
+        verbose_name = "Indice de prix"
+        verbose_name_plural = "Indices de prix"
+        constraints = [
+            # Sert aussi d'index pour la lecture d'une série (catégorie, devise, période)
+            models.UniqueConstraint(fields=['category', 'currency', 'day'], name='price_index_unique'),
+        ]
+
+
+class PriceIndexDirtyDay(models.Model):
+    """
+    Jour dont les annonces ont changé depuis le dernier calcul de l'indice de prix.
+    Seuls ces jours sont recalculés par `rollup_price_index`.
+    """
+    day = models.DateField(unique=True)
+
+
+class ProductNeighbour(models.Model):
+    """
+    Voisin précalculé d'une annonce (« annonces similaires ») : les TOP_K plus proches par rang.
+    Table construite par la commande `build_similar_products`, lue par /products/<id>/similar/.
+    """
+    # Index unique (product, rank) ci-dessous : pas d'index séparé sur product
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='neighbours', db_index=False)
+    neighbour = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='neighbour_of')
+    rank = models.PositiveSmallIntegerField(help_text="1 = la plus proche")
+    score = models.FloatField(help_text="Similarité cosinus (0 à 1)")
+
+    class Meta:
+        constraints = [
+            # Lecture des voisins d'une annonce dans l'ordre, directement dans l'index
+            models.UniqueConstraint(fields=['product', 'rank'], name='product_neighbour_rank_unique'),
+        ]
+
+
+class ProductNeighbourDirty(models.Model):
+    """
+    Annonce publiée ou modifiée (texte, catégorie, ville) depuis le dernier calcul des voisins.
+    Seules ces annonces sont traitées par `build_similar_products` sans --full.
+    """
+    product_id = models.BigIntegerField(unique=True)
+
+
+class ModerationLog(models.Model):
+    """
+    Journal des actions de modération en masse (suppression, masquage, changement de catégorie).
+    Une ligne par action : cible demandée (annonces ou vendeur), paramètres et nombre d'annonces touchées.
+    """
+    ACTION_CHOICES = [
+        ('delete', 'Suppression'),
+        ('hide', 'Masquage'),
+        ('unhide', 'Remise en ligne'),
+        ('recategorize', 'Changement de catégorie'),
+    ]
+
+    actor = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name='moderation_actions',
+        help_text="Auteur de l'action"
+    )
+    action = models.CharField(max_length=20, choices=ACTION_CHOICES)
+    # Simples identifiants : le journal survit aux annonces et aux vendeurs supprimés
+    product_ids = models.JSONField(default=list, blank=True, help_text="Annonces visées (vide si l'action vise un vendeur)")
+    target_owner_id = models.BigIntegerField(null=True, blank=True, help_text="Vendeur visé (toutes ses annonces)")
+    category_id = models.BigIntegerField(null=True, blank=True, help_text="Nouvelle catégorie (changement de catégorie)")
+    reason = models.CharField(max_length=255, blank=True)
+    affected = models.PositiveIntegerField(default=0, help_text="Nombre d'annonces effectivement touchées")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Action de modération"
+        verbose_name_plural = "Journal de modération"
+        indexes = [
+            models.Index(fields=['-created_at'], name='moderation_log_created_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.get_action_display()} : {self.affected} annonce(s)"
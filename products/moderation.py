@@ -0,0 +1,197 @@
+from django.conf import settings
+from django.db import models, transaction
+from django.utils import timezone
+
+from accounts.permissions import can_moderate, owner_or_moderator_q
+from djibtrade.counting import bump_table_version
+from mediastore.signals import decref_many
+from .changes import record_tombstones
+from .models import ModerationLog, Product, next_change_seq
+from .price_index import listing_day, mark_dirty
+from .similarity import mark_for_neighbours
+from .streaming import publish_deletion, publish_product
+from .suggestions import bump_version, title_index
+
+# Actions réservées aux modérateurs (un vendeur ne remet pas en ligne une annonce masquée)
+MODERATOR_ONLY_ACTIONS = ('hide', 'unhide')
+
+
+class ModerationDenied(Exception):
+    """Action réservée aux modérateurs et administrateurs."""
+
+
+def moderated_products(user, product_ids=None, owner_id=None):
+    """
+    Annonces visées, restreintes en SQL à celles que l'utilisateur peut modifier
+    (règles de accounts/permissions.py) : les annonces des autres sont simplement ignorées.
+    """
+    queryset = Product.objects.filter(owner_or_moderator_q(user))
+    if product_ids is not None:
+        queryset = queryset.filter(pk__in=product_ids)
+    if owner_id is not None:
+        queryset = queryset.filter(owner_id=owner_id)
+    return queryset
+
+
+# ==========================
+# 🔹 Actions (un UPDATE / un DELETE)
+# ==========================
+def set_hidden(queryset, hidden=True, now=None):
+    """
+    Masque (ou remet en ligne) les annonces en un UPDATE. updated_at avance :
+    le flux des changements les signale comme supprimées (ou de nouveau présentes).
+    Les lignes visées sont lues (verrouillées) dans la même transaction pour suivre ailleurs :
+    index de suggestions et diffusion SSE (suppression au masquage, annonce complète à la remise en ligne).
+    """
+    queryset = queryset.exclude(is_hidden=hidden)
+    with transaction.atomic():
+        # Numéro du flux des changements pris avant de verrouiller les annonces
+        change_seq = next_change_seq()
+        rows = list(queryset.select_for_update().values_list('pk', 'category_id', 'title', 'views'))
+        if not rows:
+            return 0
+        updated = queryset.update(is_hidden=hidden, updated_at=now or timezone.now(), change_seq=change_seq)
+        transaction.on_commit(bump_version)
+        if title_index.is_loaded:
+            for _, _, title, views in rows:
+                if hidden:
+                    title_index.remove(title, views=views)
+                else:
+                    title_index.add(title, views=views)
+        if hidden:
+            transaction.on_commit(lambda: [publish_deletion(pk, category_id) for pk, category_id, *_ in rows])
+        else:
+            transaction.on_commit(lambda: _publish_products([row[0] for row in rows]))
+    return updated
+
+
+def _publish_products(ids):
+    for product in Product.objects.filter(pk__in=ids, is_hidden=False).select_related('owner', 'category'):
+        publish_product(product)
+
+
+def recategorize(queryset, category_id, now=None):
+    """
+    Change la catégorie en un UPDATE. Les lignes visées sont lues (verrouillées) dans la même transaction :
+    jours de l'indice de prix à recalculer, voisins à recalculer (la catégorie entre dans les vecteurs)
+    et diffusion SSE (suppression dans l'ancienne catégorie, annonce complète dans la nouvelle).
+    """
+    queryset = queryset.exclude(category_id=category_id)
+    with transaction.atomic():
+        change_seq = next_change_seq()
+        rows = list(queryset.select_for_update().values_list('pk', 'category_id', 'created_at', 'is_hidden'))
+        if not rows:
+            return 0
+        ids = [row[0] for row in rows]
+        updated = Product.objects.filter(pk__in=ids).update(
+            category_id=category_id, updated_at=now or timezone.now(), change_seq=change_seq,
+        )
+        mark_dirty(listing_day(created_at) for _, _, created_at, _ in rows)
+        mark_for_neighbours(ids)
+        visible = [(pk, old_category_id) for pk, old_category_id, _, is_hidden in rows if not is_hidden]
+
+        def publish():
+            for pk, old_category_id in visible:
+                publish_deletion(pk, old_category_id)
+            _publish_products([pk for pk, _ in visible])
+
+        transaction.on_commit(publish)
+    return updated
+
+
+def _delete_dependents(ids):
+    """
+    Ce que la suppression ORM ferait en cascade, en une requête par relation :
+    CASCADE supprime les lignes liées (signatures, seaux LSH, correspondances d'alertes),
+    SET_NULL détache (doublons qui pointaient vers ces annonces).
+    """
+    for relation in Product._meta.related_objects:
+        related = relation.related_model._base_manager.filter(**{f'{relation.field.name}__in': ids})
+        if relation.on_delete is models.CASCADE:
+            related.delete()
+        elif relation.on_delete is models.SET_NULL:
+            related.update(**{relation.field.name: None})
+
+
+def delete_batch(ids, now=None):
+    """
+    Supprime un lot d'annonces par un seul DELETE, sans charger d'instance ni émettre de signal par ligne.
+    Les effets des signaux post_delete sont appliqués en masse : pierres tombales du flux des changements,
+    références d'images, index de suggestions, indice de prix et diffusion SSE.
+    Retourne le nombre d'annonces supprimées.
+    """
+    now = now or timezone.now()
+    with transaction.atomic():
+        change_seq = next_change_seq()
+        rows = list(
+            Product.objects.filter(pk__in=ids)
+            .select_for_update()
+            .values_list('pk', 'category_id', 'title', 'views', 'image', 'created_at', 'is_hidden')
+        )
+        if not rows:
+            return 0
+        ids = [row[0] for row in rows]
+        _delete_dependents(ids)
+        # DELETE ... WHERE id IN (...) : les dépendances sont déjà traitées ci-dessus
+        deleted = Product.objects.filter(pk__in=ids)._raw_delete(Product.objects.db)
+
+        record_tombstones(ids, now, change_seq)
+        decref_many(image for _, _, _, _, image, _, _ in rows)
+        mark_dirty(listing_day(created_at) for _, _, _, _, _, created_at, _ in rows)
+        transaction.on_commit(bump_version)
+        if title_index.is_loaded:
+            # Les titres des annonces masquées ne sont plus dans l'index
+            for _, _, title, views, _, _, is_hidden in rows:
+                if not is_hidden:
+                    title_index.remove(title, views=views)
+        transaction.on_commit(lambda: [publish_deletion(pk, category_id) for pk, category_id, *_ in rows])
+    return deleted
+
+
+def delete_products(queryset, now=None, batch_size=None):
+    """Supprime les annonces visées par lots (transactions courtes, paramètres SQL bornés)."""
+    batch_size = batch_size or getattr(settings, 'MODERATION_DELETE_BATCH_SIZE', 500)
+    deleted = 0
+    while True:
+        ids = list(queryset.order_by('pk').values_list('pk', flat=True)[:batch_size])
+        if not ids:
+            return deleted
+        deleted += delete_batch(ids, now)
+
+
+# ==========================
+# 🔹 Point d'entrée
+# ==========================
+def moderate(user, action, product_ids=None, owner_id=None, category_id=None, reason=''):
+    """
+    Applique une action de modération en masse et la consigne dans ModerationLog.
+    Cible : une liste d'annonces (`product_ids`) ou toutes celles d'un vendeur (`owner_id`).
+    Retourne l'entrée du journal (`affected` : nombre d'annonces réellement touchées).
+    """
+    if action in MODERATOR_ONLY_ACTIONS and not can_moderate(user):
+        raise ModerationDenied("Action réservée aux modérateurs.")
+
+    queryset = moderated_products(user, product_ids=product_ids, owner_id=owner_id)
+    now = timezone.now()
+    if action == 'delete':
+        affected = delete_products(queryset, now)
+    elif action == 'hide':
+        affected = set_hidden(queryset, True, now)
+    elif action == 'unhide':
+        affected = set_hidden(queryset, False, now)
+    elif action == 'recategorize':
+        affected = recategorize(queryset, category_id, now)
+    else:
+        raise ValueError(f"Action de modération inconnue : {action}")
+
+    if affected:
+        bump_table_version(Product)
+    return ModerationLog.objects.create(
+        actor=user,
+        action=action,
+        product_ids=list(product_ids or []),
+        target_owner_id=owner_id,
+        category_id=category_id,
+        reason=reason,
+        affected=affected,
+    )
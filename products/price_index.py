@@ -0,0 +1,189 @@
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+import numpy as np
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import ArchivedProduct, PriceIndex, PriceIndexDirtyDay, Product
+
+# Jours recalculés ensemble (une lecture des annonces par lot)
+DAYS_PER_BATCH = 31
+
+CENT = Decimal('0.01')
+
+
+def listing_day(moment):
+    """Jour de publication d'une annonce, dans le fuseau du site (Africa/Djibouti)."""
+    return timezone.localdate(moment)
+
+
+def mark_dirty(days):
+    """Signale des jours à recalculer (sans doublon, sans conflit entre requêtes concurrentes)."""
+    PriceIndexDirtyDay.objects.bulk_create(
+        [PriceIndexDirtyDay(day=day) for day in set(days)],
+        ignore_conflicts=True,
+    )
+
+
+# ==========================
+# 🔹 Calcul vectorisé
+# ==========================
+def _quantiles(prices, starts, counts, q):
+    """
+    Quantile q de chaque groupe, interpolation linéaire (comme numpy.percentile),
+    sur un tableau trié par (groupe, prix) : pur calcul d'indices, sans boucle Python.
+    """
+    position = starts + q * (counts - 1)
+    lower = np.floor(position).astype(np.int64)
+    upper = np.minimum(lower + 1, starts + counts - 1)
+    return prices[lower] + (prices[upper] - prices[lower]) * (position - lower)
+
+
+def compute_rollups(day_ordinals, category_ids, currency_codes, prices):
+    """
+    Statistiques par (jour, catégorie, devise) en quelques passes NumPy.
+    Entrées : tableaux alignés (une ligne par annonce). Retourne un dict de tableaux, un élément par groupe.
+    """
+    order = np.lexsort((prices, currency_codes, category_ids, day_ordinals))
+    day_ordinals, category_ids = day_ordinals[order], category_ids[order]
+    currency_codes, prices = currency_codes[order], prices[order]
+
+    # Début de chaque groupe : la clé change par rapport à la ligne précédente
+    boundary = np.ones(len(prices), dtype=bool)
+    boundary[1:] = (
+        (day_ordinals[1:] != day_ordinals[:-1])
+        | (category_ids[1:] != category_ids[:-1])
+        | (currency_codes[1:] != currency_codes[:-1])
+    )
+    starts = np.flatnonzero(boundary)
+    counts = np.diff(np.append(starts, len(prices)))
+
+    return {
+        'day': day_ordinals[starts],
+        'category': category_ids[starts],
+        'currency': currency_codes[starts],
+        'count': counts,
+        'min': prices[starts],
+        'max': prices[starts + counts - 1],
+        'avg': np.add.reduceat(prices, starts) / counts,
+        'p25': _quantiles(prices, starts, counts, 0.25),
+        'median': _quantiles(prices, starts, counts, 0.5),
+        'p75': _quantiles(prices, starts, counts, 0.75),
+    }
+
+
+def _decimal(value):
+    return Decimal(repr(float(value))).quantize(CENT)
+
+
+# ==========================
+# 🔹 Lots de jours
+# ==========================
+def _day_runs(days):
+    """Jours consécutifs regroupés : [(premier, dernier), ...] dans l'ordre."""
+    runs = []
+    for day in sorted(set(days)):
+        if runs and day == runs[-1][1] + timedelta(days=1):
+            runs[-1][1] = day
+        else:
+            runs.append([day, day])
+    return runs
+
+
+def _listing_rows(days):
+    """
+    Prix des annonces publiées ces jours-là, en ligne ou archivées.
+    Une plage de created_at par suite de jours consécutifs (OR de plages sur l'index) :
+    des jours épars ne font pas lire tout l'intervalle qui les sépare.
+    """
+    tz = timezone.get_current_timezone()
+    ranges = Q()
+    for first, last in _day_runs(days):
+        ranges |= Q(
+            created_at__gte=timezone.make_aware(datetime.combine(first, time.min), tz),
+            created_at__lt=timezone.make_aware(datetime.combine(last + timedelta(days=1), time.min), tz),
+        )
+    for model in (Product, ArchivedProduct):
+        rows = (
+            model.objects
+            .filter(ranges, category__isnull=False)
+            .values_list('created_at', 'category_id', 'currency', 'unit_price')
+        )
+        for created_at, category_id, currency, unit_price in rows.iterator(chunk_size=5000):
+            yield listing_day(created_at).toordinal(), category_id, currency, unit_price
+
+
+def rollup_days(days):
+    """
+    Recalcule l'indice des jours donnés : les lignes de ces jours sont remplacées en une transaction.
+    Retourne le nombre de lignes d'indice écrites.
+    """
+    rows = list(_listing_rows(days))
+    currencies = [code for code, _ in Product.CURRENCY_CHOICES]
+    entries = []
+    if rows:
+        day_ordinals, category_ids, currency_names, prices = zip(*rows)
+        stats = compute_rollups(
+            np.array(day_ordinals, dtype=np.int64),
+            np.array(category_ids, dtype=np.int64),
+            np.array([currencies.index(name) for name in currency_names], dtype=np.int64),
+            np.array(prices, dtype=np.float64),
+        )
+        for i in range(len(stats['count'])):
+            entries.append(PriceIndex(
+                day=datetime.fromordinal(int(stats['day'][i])).date(),
+                category_id=int(stats['category'][i]),
+                currency=currencies[stats['currency'][i]],
+                count=int(stats['count'][i]),
+                min_price=_decimal(stats['min'][i]),
+                p25_price=_decimal(stats['p25'][i]),
+                median_price=_decimal(stats['median'][i]),
+                p75_price=_decimal(stats['p75'][i]),
+                max_price=_decimal(stats['max'][i]),
+                avg_price=_decimal(stats['avg'][i]),
+            ))
+    with transaction.atomic():
+        PriceIndex.objects.filter(day__in=days).delete()
+        PriceIndex.objects.bulk_create(entries, batch_size=1000)
+    return len(entries)
+
+
+def _batches(days):
+    days = sorted(days)
+    for i in range(0, len(days), DAYS_PER_BATCH):
+        yield days[i:i + DAYS_PER_BATCH]
+
+
+def rollup_price_index(full=False):
+    """
+    Met à jour l'indice de prix.
+    - Incrémental (par défaut) : seuls les jours signalés depuis le dernier passage sont recalculés.
+      Les signalements sont retirés avant le calcul : un changement survenu pendant le calcul
+      est de nouveau signalé et traité au passage suivant.
+    - full=True : reconstruction complète (après un import en masse sans signaux, par exemple).
+    Retourne (jours recalculés, lignes d'indice écrites).
+    """
+    if full:
+        days = set()
+        for model in (Product, ArchivedProduct):
+            days.update(model.objects.dates('created_at', 'day'))
+        PriceIndexDirtyDay.objects.all().delete()
+        # Les jours qui n'ont plus aucune annonce disparaissent de l'indice
+        PriceIndex.objects.exclude(day__in=days).delete()
+    else:
+        with transaction.atomic():
+            dirty = PriceIndexDirtyDay.objects.select_for_update()
+            days = set(dirty.values_list('day', flat=True))
+            PriceIndexDirtyDay.objects.filter(day__in=days).delete()
+
+    written = 0
+    try:
+        for batch in _batches(days):
+            written += rollup_days(batch)
+    except Exception:
+        # Rien n'est perdu : les jours restent à recalculer
+        mark_dirty(days)
+        raise
+    return len(days), written
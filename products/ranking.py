@@ -0,0 +1,21 @@
+from .models import Product
+
+
+# Ordre du fil : vendeurs premium d'abord, puis les annonces les plus récentes
+FEED_ORDERING = ('-boost', '-created_at')
+
+
+def boost_for(is_premium):
+    return 1 if is_premium else 0
+
+
+def propagate_boost(owner_ids, is_premium):
+    """
+    Recopie le statut premium des vendeurs sur toutes leurs annonces en un seul UPDATE.
+    Retourne le nombre d'annonces modifiées.
+    """
+    owner_ids = list(owner_ids)
+    if not owner_ids:
+        return 0
+    boost = boost_for(is_premium)
+    return Product.objects.filter(owner_id__in=owner_ids).exclude(boost=boost).update(boost=boost)
@@ -1,5 +1,8 @@
+from django.conf import settings
 from rest_framework import serializers
-from .models import Product, Category
+from mediastore.models import UploadSession
+from .duplicates import minhash, find_duplicate
+from .models import ArchivedProduct, ModerationLog, Product, Category
 
 
 class CategorySerializer(serializers.ModelSerializer):
@@ -17,6 +20,9 @@ class ProductSerializer(serializers.ModelSerializer):
     """
     owner_name = serializers.SerializerMethodField(read_only=True)  # Nom du propriétaire
     category_name = serializers.CharField(source='category.name', read_only=True)  # Nom de la catégorie
+    upload_id = serializers.UUIDField(write_only=True, required=False)  # Image envoyée par morceaux
+    # Colonne générée : sans déclaration explicite, DRF la sert comme ModelField (nombre JSON, pas de chemin rapide)
+    total_price = serializers.DecimalField(max_digits=12, decimal_places=2, read_only=True)
 
     class Meta:
         model = Product
@@ -36,8 +42,12 @@ class ProductSerializer(serializers.ModelSerializer):
             'whatsapp_link',
             'views',
             'created_at',
+            'updated_at',
+            'expires_at',
+            'duplicate_of',
+            'upload_id',
         ]
-        read_only_fields = ['owner_name', 'total_price', 'whatsapp_link', 'views', 'created_at']
+        read_only_fields = ['owner_name', 'total_price', 'whatsapp_link', 'views', 'created_at', 'updated_at', 'expires_at', 'duplicate_of']
 
     def get_owner_name(self, obj):
         """
@@ -55,20 +65,136 @@ class ProductSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError("La devise doit être DJF ou USD.")
         return value
 
+    def validate_upload_id(self, value):
+        """
+        Vérifie que l'envoi découpé est terminé et appartient à l'utilisateur.
+        """
+        request = self.context.get('request')
+        session = UploadSession.objects.filter(
+            pk=value,
+            owner_id=getattr(getattr(request, 'user', None), 'pk', None),
+            status='complete',
+        ).first()
+        if session is None:
+            raise serializers.ValidationError("Envoi introuvable ou incomplet.")
+        return session
+
+    def validate(self, attrs):
+        """
+        Détection des doublons à la création : si DUPLICATE_POLICY vaut 'reject',
+        une annonce quasi identique à une autre du même vendeur est refusée.
+        (En mode 'flag', l'annonce est acceptée puis marquée via `duplicate_of`.)
+        """
+        request = self.context.get('request')
+        user = getattr(request, 'user', None)
+        if (
+            self.instance is None
+            and getattr(settings, 'DUPLICATE_POLICY', 'flag') == 'reject'
+            and user is not None
+            and user.is_authenticated
+        ):
+            if find_duplicate(user.pk, minhash(attrs.get('title'), attrs.get('description'))):
+                raise serializers.ValidationError("Vous avez déjà publié une annonce quasi identique.")
+        return attrs
+
+    def _attach_upload(self, validated_data):
+        """
+        Remplace `upload_id` par l'image déjà stockée de l'envoi découpé.
+        """
+        session = validated_data.pop('upload_id', None)
+        if session is not None:
+            validated_data['image'] = session.file_name
+        return session
+
     def create(self, validated_data):
         """
         Création du produit :
         - L'owner est défini automatiquement depuis la requête.
         - Le prix total est calculé automatiquement par le modèle.
+        - L'image peut provenir d'un envoi découpé (`upload_id`).
         """
         request = self.context.get('request')
         if request and hasattr(request, 'user'):
             validated_data['owner'] = request.user
-        return super().create(validated_data)
+        session = self._attach_upload(validated_data)
+        product = super().create(validated_data)
+        if session is not None:
+            session.delete()
+        return product
 
     def update(self, instance, validated_data):
         """
         Mise à jour du produit :
         - Le prix total est recalculé automatiquement.
+        - L'image peut provenir d'un envoi découpé (`upload_id`).
         """
-        return super().update(instance, validated_data)
+        session = self._attach_upload(validated_data)
+        product = super().update(instance, validated_data)
+        if session is not None:
+            session.delete()
+        return product
+
+
+class ArchivedProductSerializer(serializers.ModelSerializer):
+    """
+    Annonce archivée, visible uniquement par son vendeur.
+    """
+    category_name = serializers.CharField(source='category.name', read_only=True)
+    total_price = serializers.DecimalField(max_digits=12, decimal_places=2, read_only=True)
+
+    class Meta:
+        model = ArchivedProduct
+        fields = [
+            'id',
+            'title',
+            'description',
+            'unit_price',
+            'currency',
+            'quantity',
+            'total_price',
+            'category',
+            'category_name',
+            'city',
+            'image',
+            'views',
+            'created_at',
+            'expires_at',
+            'archived_at',
+            'archive_reason',
+        ]
+        read_only_fields = fields
+
+
+class RestoreProductSerializer(serializers.Serializer):
+    """
+    Restauration d'une annonce archivée : une annonce épuisée doit recevoir une nouvelle quantité.
+    """
+    quantity = serializers.IntegerField(min_value=1, required=False)
+
+    def validate(self, attrs):
+        if self.context['archived'].quantity == 0 and 'quantity' not in attrs:
+            raise serializers.ValidationError({'quantity': "Indiquez la quantité disponible pour remettre l'annonce en ligne."})
+        return attrs
+
+
+class ModerationSerializer(serializers.Serializer):
+    """
+    Action de modération en masse : une liste d'annonces (`ids`) ou toutes les annonces d'un vendeur (`owner`).
+    """
+    action = serializers.ChoiceField(choices=ModerationLog.ACTION_CHOICES)
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        required=False,
+        allow_empty=False,
+        max_length=getattr(settings, 'MODERATION_MAX_IDS', 1000),
+    )
+    owner = serializers.IntegerField(min_value=1, required=False)
+    category = serializers.PrimaryKeyRelatedField(queryset=Category.objects.all(), required=False)
+    reason = serializers.CharField(max_length=255, required=False, allow_blank=True, default='')
+
+    def validate(self, attrs):
+        if ('ids' in attrs) == ('owner' in attrs):
+            raise serializers.ValidationError("Indiquez soit `ids`, soit `owner`.")
+        if attrs['action'] == 'recategorize' and 'category' not in attrs:
+            raise serializers.ValidationError({'category': "Catégorie requise pour un changement de catégorie."})
+        return attrs
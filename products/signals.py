@@ -0,0 +1,155 @@
+from django.db.models.signals import post_init, post_save, pre_delete, post_delete
+from django.db import transaction
+from django.dispatch import receiver
+from djibtrade.counting import track_table_versions
+from .changes import record_tombstones
+from .duplicates import index_product, flag_duplicate
+from .models import Product, next_change_seq
+from .price_index import listing_day, mark_dirty
+from .similarity import mark_for_neighbours
+from .streaming import publish_deletion, publish_product
+from .suggestions import bump_version, title_index
+
+
+# 🔹 Signaux : mise à jour incrémentale de l'index de suggestions
+@receiver(post_init, sender=Product)
+def remember_suggestion_state(sender, instance, **kwargs):
+    """
+    Mémorise le titre, la description et les vues chargés, pour ne traiter ensuite que les différences.
+    """
+    instance._suggestion_state = (instance.__dict__.get('title'), instance.__dict__.get('views') or 0)
+    instance._duplicate_state = (instance.__dict__.get('title'), instance.__dict__.get('description'))
+    instance._price_state = (
+        instance.__dict__.get('unit_price'), instance.__dict__.get('currency'), instance.__dict__.get('category_id'),
+    )
+    instance._similarity_state = (
+        instance.__dict__.get('title'), instance.__dict__.get('description'),
+        instance.__dict__.get('category_id'), instance.__dict__.get('city_ref_id'),
+    )
+
+
+@receiver(post_save, sender=Product)
+def update_suggestions_on_save(sender, instance, created, update_fields=None, **kwargs):
+    if update_fields is not None and not {'title', 'views'} & set(update_fields):
+        return
+    old_title, old_views = (None, 0) if created else instance._suggestion_state
+    new_title, new_views = instance.title, instance.views or 0
+    instance._suggestion_state = (new_title, new_views)
+
+    # Une annonce masquée n'y figure pas (retirée par la modération)
+    if instance.is_hidden:
+        return
+    if created or old_title != new_title:
+        # Titres ajoutés/retirés : les autres processus reconstruisent leur index
+        transaction.on_commit(bump_version)
+    # L'index n'est pas encore chargé : il sera construit à jour au premier usage
+    if not title_index.is_loaded:
+        return
+    if created:
+        title_index.add(new_title, views=new_views)
+    elif old_title != new_title:
+        title_index.remove(old_title, views=old_views)
+        title_index.add(new_title, views=new_views)
+    elif new_views != old_views:
+        title_index.add(new_title, views=new_views - old_views, count=0)
+
+
+@receiver(post_delete, sender=Product)
+def update_suggestions_on_delete(sender, instance, **kwargs):
+    if instance.is_hidden:
+        return
+    transaction.on_commit(bump_version)
+    if title_index.is_loaded:
+        old_title, old_views = instance._suggestion_state
+        title_index.remove(old_title, views=old_views)
+
+
+# 🔹 Signal : signature MinHash et seaux LSH pour la détection des doublons
+@receiver(post_save, sender=Product)
+def index_for_duplicates(sender, instance, created, update_fields=None, **kwargs):
+    """
+    À la création (ou si le titre/la description changent), la signature est recalculée
+    et l'annonce est marquée si elle double une annonce plus ancienne du même vendeur.
+    """
+    if update_fields is not None and not {'title', 'description'} & set(update_fields):
+        return
+    text = (instance.title, instance.description)
+    if not created and text == instance._duplicate_state:
+        return
+    instance._duplicate_state = text
+    signature = index_product(instance)
+    flag_duplicate(instance, signature)
+
+
+# 🔹 Signaux : trace des suppressions pour le flux des changements
+@receiver(pre_delete, sender=Product)
+def take_deletion_seq(sender, instance, **kwargs):
+    # Numéro pris avant la suppression de la ligne (compteur verrouillé avant les annonces, comme partout)
+    instance._deletion_seq = next_change_seq()
+
+
+@receiver(post_delete, sender=Product)
+def record_deletion(sender, instance, **kwargs):
+    """
+    Toute suppression (API, admin, cascade depuis le vendeur) laisse une trace numérotée,
+    lue par /products/changes/ pour que les clients retirent l'annonce.
+    """
+    record_tombstones([instance.pk], change_seq=getattr(instance, '_deletion_seq', None))
+
+
+# 🔹 Signaux : diffusion en temps réel (SSE) des annonces créées, modifiées ou supprimées
+@receiver(post_save, sender=Product)
+def push_product(sender, instance, update_fields=None, **kwargs):
+    # Le compteur de vues n'intéresse pas les abonnés ; une annonce masquée n'est jamais rediffusée
+    if update_fields is not None and set(update_fields) <= {'views'}:
+        return
+    if instance.is_hidden:
+        return
+    transaction.on_commit(lambda: publish_product(instance))
+
+
+@receiver(post_delete, sender=Product)
+def push_deletion(sender, instance, **kwargs):
+    product_id, category_id = instance.pk, instance.category_id
+    transaction.on_commit(lambda: publish_deletion(product_id, category_id))
+
+
+# 🔹 Signaux : jours à recalculer dans l'indice de prix
+@receiver(post_save, sender=Product)
+def mark_price_index_on_save(sender, instance, created, update_fields=None, **kwargs):
+    """
+    Une annonce publiée, ou dont le prix, la devise ou la catégorie change,
+    rend son jour de publication à recalculer.
+    """
+    if update_fields is not None and not {'unit_price', 'currency', 'category'} & set(update_fields):
+        return
+    state = (instance.unit_price, instance.currency, instance.category_id)
+    if not created and state == instance._price_state:
+        return
+    instance._price_state = state
+    mark_dirty([listing_day(instance.created_at)])
+
+
+@receiver(post_delete, sender=Product)
+def mark_price_index_on_delete(sender, instance, **kwargs):
+    # Suppression définitive (un archivage laisse l'indice inchangé, recalculé sans effet)
+    if instance.created_at is not None:
+        mark_dirty([listing_day(instance.created_at)])
+
+
+# 🔹 Signal : annonces dont les voisins (« annonces similaires ») sont à recalculer
+@receiver(post_save, sender=Product)
+def mark_neighbours_on_save(sender, instance, created, update_fields=None, **kwargs):
+    """Annonce publiée, ou dont le texte, la catégorie ou la ville change."""
+    if update_fields is not None and not {'title', 'description', 'category', 'city', 'city_ref'} & set(update_fields):
+        return
+    state = (instance.title, instance.description, instance.category_id, instance.city_ref_id)
+    if not created and state == instance._similarity_state:
+        return
+    instance._similarity_state = state
+    mark_for_neighbours([instance.pk])
+
+
+# 🔹 Version de la table : invalide les comptages de pagination en cache
+# (l'incrément du compteur de vues ne change aucun total)
+track_table_versions(Product, ignored_fields={'views'})
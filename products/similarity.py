@@ -0,0 +1,259 @@
+import re
+from array import array
+from collections import Counter
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Min
+from scipy import sparse
+
+from cities.normalization import fold
+from .models import Product, ProductNeighbour, ProductNeighbourDirty
+
+# ==========================
+# 🔹 Texte
+# ==========================
+TOKEN_RE = re.compile(r'[a-z0-9]{2,}')
+# Mots vides : présents partout, ils rapprochent des annonces sans rapport
+STOP_WORDS = frozenset({
+    'au', 'aux', 'avec', 'ce', 'ces', 'dans', 'de', 'des', 'du', 'en', 'est', 'et', 'la', 'le', 'les',
+    'ou', 'par', 'pas', 'pour', 'plus', 'sans', 'se', 'sur', 'un', 'une', 'tres', 'tout', 'tous',
+})
+TITLE_WEIGHT = 2                # un mot du titre compte double
+
+
+def tokens(title, description):
+    """Occurrences pondérées des mots du titre et de la description normalisés."""
+    counts = Counter()
+    for weight, text in ((TITLE_WEIGHT, title), (1, description)):
+        for word in TOKEN_RE.findall(fold(text or '')):
+            if word not in STOP_WORDS:
+                counts[word] += weight
+    return counts
+
+
+def mark_for_neighbours(product_ids):
+    """Signale des annonces dont les voisins sont à (re)calculer."""
+    ProductNeighbourDirty.objects.bulk_create(
+        [ProductNeighbourDirty(product_id=product_id) for product_id in set(product_ids)],
+        ignore_conflicts=True,
+    )
+
+
+# ==========================
+# 🔹 Vecteurs (matrices creuses)
+# ==========================
+def _normalize_rows(matrix):
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    norms[norms == 0] = 1
+    return sparse.diags((1 / norms).astype(np.float32)) @ matrix
+
+
+def _one_hot(codes, weight):
+    """Une colonne par valeur (catégorie, ville) ; les lignes sans valeur (code 0) restent vides."""
+    codes = np.asarray(codes, dtype=np.int64)
+    present = np.flatnonzero(codes)
+    values, columns = np.unique(codes[present], return_inverse=True)
+    return sparse.csr_matrix(
+        (np.full(len(present), weight, dtype=np.float32), (present, columns)),
+        shape=(len(codes), len(values)),
+    )
+
+
+def build_vectors():
+    """
+    Vecteurs des annonces visibles, une ligne par annonce (ordre des identifiants) :
+    TF-IDF du texte (tf logarithmique, idf lissé) complété par la catégorie et la ville,
+    le tout normalisé : le produit scalaire de deux lignes est leur similarité cosinus.
+    Retourne (identifiants triés, matrice CSR float32).
+    """
+    ids, categories, cities = array('q'), array('q'), array('q')
+    indptr, indices, counts = array('q', [0]), array('i'), array('f')
+    vocabulary = {}
+    rows = (
+        Product.objects.filter(is_hidden=False).order_by('pk')
+        .values_list('pk', 'title', 'description', 'category_id', 'city_ref_id')
+    )
+    for pk, title, description, category_id, city_id in rows.iterator(chunk_size=5000):
+        for word, count in tokens(title, description).items():
+            indices.append(vocabulary.setdefault(word, len(vocabulary)))
+            counts.append(count)
+        indptr.append(len(indices))
+        ids.append(pk)
+        categories.append(category_id or 0)
+        cities.append(city_id or 0)
+
+    n = len(ids)
+    tf = sparse.csr_matrix(
+        (np.frombuffer(counts, dtype=np.float32), np.frombuffer(indices, dtype=np.int32), np.frombuffer(indptr, dtype=np.int64)),
+        shape=(n, len(vocabulary)),
+    )
+    tf.data = 1 + np.log(tf.data)
+    document_frequency = np.bincount(tf.indices, minlength=len(vocabulary))
+    # Un mot présent dans une seule annonce ne la rapproche d'aucune autre : colonne retirée
+    tf = tf[:, np.flatnonzero(document_frequency > 1)]
+    idf = np.log((1 + n) / (1 + document_frequency[document_frequency > 1])) + 1
+    text = _normalize_rows(tf @ sparse.diags(idf.astype(np.float32)))
+
+    vectors = sparse.hstack([
+        text,
+        _one_hot(categories, getattr(settings, 'SIMILAR_PRODUCTS_CATEGORY_WEIGHT', 0.5)),
+        _one_hot(cities, getattr(settings, 'SIMILAR_PRODUCTS_CITY_WEIGHT', 0.2)),
+    ], format='csr', dtype=np.float32)
+    return np.frombuffer(ids, dtype=np.int64), _normalize_rows(vectors).tocsr()
+
+
+# ==========================
+# 🔹 Plus proches voisins, par blocs
+# ==========================
+def _block_size(n, memory_mb):
+    # Par cellule : scores et leur opposé (float32), indices de argpartition (int64), masque : 17 octets
+    return max(1, int(memory_mb * 1024 * 1024 // (17 * max(n, 1))))
+
+
+def score_blocks(vectors, rows, memory_mb):
+    """
+    Similarités des lignes `rows` avec toutes les annonces, par blocs tenant dans `memory_mb`.
+    Produit (lignes du bloc, scores denses len(bloc) × n) ; l'annonce elle-même vaut -1.
+    """
+    transposed = vectors.T.tocsc()
+    step = _block_size(vectors.shape[0], memory_mb)
+    for start in range(0, len(rows), step):
+        block = rows[start:start + step]
+        scores = (vectors[block] @ transposed).toarray()
+        scores[np.arange(len(block)), block] = -1
+        yield block, scores
+
+
+def top_k(scores, k, min_score):
+    """Les k meilleurs voisins de chaque ligne, triés : (colonnes, scores) ; -1 marque une place vide."""
+    k = min(k, scores.shape[1] - 1)
+    if k <= 0:
+        empty = np.empty((scores.shape[0], 0))
+        return empty.astype(np.int64), empty
+    columns = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    best = np.take_along_axis(scores, columns, axis=1)
+    order = np.argsort(-best, axis=1, kind='stable')
+    columns, best = np.take_along_axis(columns, order, axis=1), np.take_along_axis(best, order, axis=1)
+    columns[best <= min_score] = -1
+    return columns, best
+
+
+def _replace_neighbours(neighbours):
+    """Réécrit la liste de voisins des annonces données : {product_id: [(neighbour_id, score), ...]}."""
+    product_ids = list(neighbours)
+    for i in range(0, len(product_ids), 500):
+        batch = product_ids[i:i + 500]
+        with transaction.atomic():
+            ProductNeighbour.objects.filter(product_id__in=batch).delete()
+            ProductNeighbour.objects.bulk_create([
+                ProductNeighbour(product_id=product_id, neighbour_id=neighbour_id, rank=rank, score=score)
+                for product_id in batch
+                for rank, (neighbour_id, score) in enumerate(neighbours[product_id], start=1)
+            ], batch_size=1000)
+
+
+def _thresholds(ids, k, min_score):
+    """
+    Score à dépasser pour entrer dans la liste actuelle de chaque annonce :
+    celui de son k-ième voisin si la liste est pleine, sinon le score minimal.
+    """
+    thresholds = np.full(len(ids), min_score, dtype=np.float32)
+    rows = (
+        ProductNeighbour.objects.values('product_id')
+        .annotate(size=Count('pk'), lowest=Min('score'))
+        .filter(size__gte=k)
+        .values_list('product_id', 'lowest')
+    )
+    for product_id, lowest in rows.iterator(chunk_size=5000):
+        position = np.searchsorted(ids, product_id)
+        if position < len(ids) and ids[position] == product_id:
+            thresholds[position] = max(lowest, min_score)
+    return thresholds
+
+
+def _merge_into_existing(candidates, changed_ids, k):
+    """
+    Insère les annonces nouvelles ou modifiées dans les listes existantes qu'elles améliorent :
+    candidates = {product_id: {neighbour_id: score}}. Retourne le nombre de listes réécrites.
+    """
+    product_ids = list(candidates)
+    merged = {}
+    for i in range(0, len(product_ids), 500):
+        batch = product_ids[i:i + 500]
+        current = {product_id: {} for product_id in batch}
+        rows = ProductNeighbour.objects.filter(product_id__in=batch).values_list('product_id', 'neighbour_id', 'score')
+        for product_id, neighbour_id, score in rows:
+            # Le score d'une annonce modifiée est remplacé par sa nouvelle valeur
+            if neighbour_id not in changed_ids:
+                current[product_id][neighbour_id] = score
+        for product_id in batch:
+            current[product_id].update(candidates[product_id])
+            merged[product_id] = sorted(current[product_id].items(), key=lambda item: -item[1])[:k]
+    _replace_neighbours(merged)
+    return len(merged)
+
+
+def build_neighbours(full=False, memory_mb=None):
+    """
+    Met à jour la table des voisins.
+    - Incrémental (par défaut) : les annonces signalées depuis le dernier passage reçoivent leurs voisins,
+      puis entrent dans les listes existantes qu'elles améliorent (même passe de calcul, lue en colonnes).
+      Les autres scores gardent l'idf de leur calcul : un passage --full périodique les réaligne.
+    - full=True : recalcul de toutes les annonces (après un import en masse sans signaux, par exemple).
+    Retourne (annonces traitées, listes existantes mises à jour).
+    """
+    k = getattr(settings, 'SIMILAR_PRODUCTS_TOP_K', 10)
+    min_score = getattr(settings, 'SIMILAR_PRODUCTS_MIN_SCORE', 0.05)
+    memory_mb = memory_mb or getattr(settings, 'SIMILAR_PRODUCTS_MEMORY_MB', 256)
+
+    if full:
+        ProductNeighbourDirty.objects.all().delete()
+        changed = None
+    else:
+        with transaction.atomic():
+            dirty = ProductNeighbourDirty.objects.select_for_update()
+            changed = set(dirty.values_list('product_id', flat=True))
+            ProductNeighbourDirty.objects.filter(product_id__in=changed).delete()
+        if not changed:
+            return 0, 0
+
+    try:
+        ids, vectors = build_vectors()
+        if not len(ids):
+            return 0, 0
+        if full:
+            rows = np.arange(len(ids))
+            # Annonces masquées : leurs listes disparaissent (les annonces supprimées partent en cascade)
+            ProductNeighbour.objects.filter(product__is_hidden=True).delete()
+        else:
+            # Les listes qui contiennent une annonce modifiée sont recalculées entièrement
+            # (son ancien score pourrait y rester alors qu'elle n'y a plus sa place)
+            listing = set(ProductNeighbour.objects.filter(neighbour_id__in=changed).values_list('product_id', flat=True))
+            wanted = np.fromiter(changed | listing, dtype=np.int64, count=len(changed | listing))
+            rows = np.flatnonzero(np.isin(ids, wanted))
+            ProductNeighbour.objects.filter(product_id__in=set(changed) - set(ids[rows].tolist())).delete()
+            thresholds = _thresholds(ids, k, min_score)
+            thresholds[rows] = np.inf
+            candidates = {}
+
+        processed = 0
+        for block, scores in score_blocks(vectors, rows, memory_mb):
+            columns, best = top_k(scores, k, min_score)
+            _replace_neighbours({
+                int(ids[row]): [(int(ids[c]), float(s)) for c, s in zip(columns[i], best[i]) if c >= 0]
+                for i, row in enumerate(block)
+            })
+            processed += len(block)
+            if not full:
+                # Colonnes : annonces existantes dont la liste est améliorée par une annonce du bloc
+                for i, column in zip(*np.nonzero(scores > thresholds)):
+                    candidates.setdefault(int(ids[column]), {})[int(ids[block[i]])] = float(scores[i, column])
+        updated = 0 if full else _merge_into_existing(candidates, changed, k)
+    except Exception:
+        # Rien n'est perdu : les annonces restent à traiter
+        if changed:
+            mark_for_neighbours(changed)
+        raise
+    return processed, updated
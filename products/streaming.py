@@ -0,0 +1,172 @@
+import asyncio
+import re
+from urllib.parse import parse_qs, urljoin
+
+import orjson
+from django.conf import settings
+
+from djibtrade.pubsub import OVERFLOW, hub
+from djibtrade.renderers import ORJSONRenderer
+
+# Chemin servi directement par djibtrade/asgi.py (hors de la pile de middlewares Django)
+STREAM_PATH = '/api/annonces/products/stream/'
+
+ALL_TOPIC = 'products'
+
+
+def category_topic(category_id):
+    return f"products:category:{category_id}"
+
+
+def sse_frame(event, data, event_id=None):
+    """Message Server-Sent Events, encodé une seule fois quel que soit le nombre d'abonnés."""
+    head = f"id: {event_id}\n" if event_id else ''
+    return f"{head}event: {event}\n".encode() + b'data: ' + data + b'\n\n'
+
+
+# ==========================
+# 🔹 Publication (côté Django, synchrone)
+# ==========================
+def _topics_for(category_id):
+    topics = [ALL_TOPIC]
+    if category_id is not None:
+        topics.append(category_topic(category_id))
+    return [topic for topic in topics if hub.wants(topic)]
+
+
+class _PublicRequest:
+    """
+    Tient lieu de requête pour la sérialisation hors requête : ImageField construit
+    ses URLs absolues à partir de PUBLIC_BASE_URL, comme les réponses REST à partir de l'hôte appelé.
+    """
+
+    def build_absolute_uri(self, location='/'):
+        return urljoin(settings.PUBLIC_BASE_URL.rstrip('/') + '/', location)
+
+
+def publish_product(product):
+    """Diffuse une annonce créée ou modifiée aux abonnés de sa catégorie (et du flux global)."""
+    topics = _topics_for(product.category_id)
+    if not topics:
+        return
+    from .changes import encode_cursor
+    from .serializers import ProductSerializer
+
+    data = ORJSONRenderer().render(ProductSerializer(product, context={'request': _PublicRequest()}).data)
+    # L'identifiant de l'événement est un curseur du flux des changements : le client peut reprendre avec ?since=
+    frame = sse_frame('product', data, encode_cursor(product.change_seq, product.pk))
+    for topic in topics:
+        hub.publish(topic, frame)
+
+
+def publish_deletion(product_id, category_id):
+    topics = _topics_for(category_id)
+    if not topics:
+        return
+    frame = sse_frame('product_deleted', b'{"id":%d}' % product_id)
+    for topic in topics:
+        hub.publish(topic, frame)
+
+
+# ==========================
+# 🔹 Application ASGI (Server-Sent Events)
+# ==========================
+def _cors_headers(scope):
+    """
+    En-têtes CORS calculés à partir des mêmes réglages que django-cors-headers
+    (le flux ne passe pas par CorsMiddleware) : Access-Control-Allow-Origin si l'origine est autorisée.
+    """
+    headers = [(b'vary', b'Origin')]
+    origin = dict(scope.get('headers', [])).get(b'origin', b'').decode('latin-1')
+    if not origin:
+        return headers
+    allow_credentials = getattr(settings, 'CORS_ALLOW_CREDENTIALS', False)
+    if getattr(settings, 'CORS_ALLOW_ALL_ORIGINS', False):
+        headers.append((b'access-control-allow-origin', b'*' if not allow_credentials else origin.encode('latin-1')))
+    elif origin in getattr(settings, 'CORS_ALLOWED_ORIGINS', ()) or any(
+        re.match(pattern, origin) for pattern in getattr(settings, 'CORS_ALLOWED_ORIGIN_REGEXES', ())
+    ):
+        headers.append((b'access-control-allow-origin', origin.encode('latin-1')))
+    else:
+        return headers
+    if allow_credentials:
+        headers.append((b'access-control-allow-credentials', b'true'))
+    return headers
+
+
+async def _send_error(scope, send, status, message):
+    headers = [(b'content-type', b'application/json'), *_cors_headers(scope)]
+    await send({'type': 'http.response.start', 'status': status, 'headers': headers})
+    await send({'type': 'http.response.body', 'body': orjson.dumps({'detail': message})})
+
+
+def _parse_categories(query_string):
+    params = parse_qs(query_string.decode('latin-1'))
+    raw = ','.join(params.get('category', []))
+    return {int(value) for value in raw.split(',') if value.strip()}
+
+
+async def product_stream(scope, receive, send):
+    """
+    GET /api/annonces/products/stream/?category=3,7
+    Flux SSE des annonces créées ou modifiées dans ces catégories (toutes, sans paramètre).
+    - Événements `product` (annonce sérialisée) et `product_deleted` ({"id": ...}).
+    - Commentaire `: ping` toutes les PUBSUB_HEARTBEAT_INTERVAL secondes pour garder la connexion.
+    - Événement `overflow` puis fermeture si le client ne suit pas : il reprend via /products/changes/.
+    - En-têtes CORS des réglages CORS_* (EventSource depuis le front sur un autre domaine).
+    """
+    if scope['method'] != 'GET':
+        return await _send_error(scope, send, 405, "Méthode non autorisée.")
+    try:
+        categories = _parse_categories(scope.get('query_string', b''))
+    except ValueError:
+        return await _send_error(scope, send, 400, "Paramètre category invalide.")
+    if len(categories) > getattr(settings, 'PUBSUB_MAX_TOPICS', 50):
+        return await _send_error(scope, send, 400, "Trop de catégories demandées.")
+    if hub.subscriber_count >= getattr(settings, 'PUBSUB_MAX_SUBSCRIBERS', 10000):
+        return await _send_error(scope, send, 503, "Trop de connexions, réessayez plus tard.")
+
+    topics = [category_topic(category_id) for category_id in categories] or [ALL_TOPIC]
+    heartbeat = getattr(settings, 'PUBSUB_HEARTBEAT_INTERVAL', 15)
+    subscription = hub.subscribe(topics)
+
+    # Déconnexion du client détectée sans interrompre l'attente des messages
+    disconnected = asyncio.Event()
+
+    async def watch_disconnect():
+        while (await receive())['type'] != 'http.disconnect':
+            pass
+        disconnected.set()
+        subscription.put(None)
+
+    watcher = asyncio.create_task(watch_disconnect())
+    try:
+        await send({
+            'type': 'http.response.start',
+            'status': 200,
+            'headers': [
+                (b'content-type', b'text/event-stream; charset=utf-8'),
+                (b'cache-control', b'no-cache'),
+                (b'x-accel-buffering', b'no'),  # pas de mise en tampon par nginx
+                *_cors_headers(scope),
+            ],
+        })
+        await send({'type': 'http.response.body', 'body': b'retry: 5000\n\n', 'more_body': True})
+        while not disconnected.is_set():
+            message = await subscription.get(heartbeat)
+            if disconnected.is_set():
+                break
+            if message is None:
+                body = b': ping\n\n'
+            elif message is OVERFLOW:
+                await send({'type': 'http.response.body', 'body': sse_frame('overflow', b'{}'), 'more_body': False})
+                return
+            else:
+                body = message
+            await send({'type': 'http.response.body', 'body': body, 'more_body': True})
+    except OSError:
+        # Connexion coupée pendant un envoi
+        pass
+    finally:
+        watcher.cancel()
+        hub.unsubscribe(subscription)
@@ -0,0 +1,240 @@
+import heapq
+import logging
+import os
+import tempfile
+import threading
+import time
+from array import array
+from bisect import bisect_left
+
+import orjson
+from django.conf import settings
+from django.core.cache import cache
+
+from cities.normalization import fold
+
+# Configuration du logger
+logger = logging.getLogger(__name__)
+
+VERSION_CACHE_KEY = 'suggestions:version'
+
+
+def bump_version():
+    """
+    Signale à tous les processus qu'un titre a été ajouté ou retiré (à appeler après validation :
+    un processus qui reconstruirait avant ne verrait pas encore la ligne).
+    """
+    try:
+        cache.incr(VERSION_CACHE_KEY)
+    except ValueError:
+        cache.set(VERSION_CACHE_KEY, 1, None)
+
+
+class TitleSuggestionIndex:
+    """
+    Index en mémoire des titres d'annonces pour l'autocomplétion de la recherche.
+    - Tableaux triés et alignés (clé normalisée, titre affiché, poids, nombre d'annonces) :
+      pas de nœud par caractère, la mémoire reste proche de la taille des titres.
+    - Poids = somme des vues des annonces portant ce titre.
+    - Mis à jour au fil des enregistrements/suppressions de Product dans le processus qui écrit,
+      borné à SUGGEST_MAX_ENTRIES.
+    - Les autres processus suivent une version partagée dans le cache (comme cities/index.py) :
+      vérifiée au plus toutes les SUGGEST_REFRESH_INTERVAL secondes, reconstruction depuis la base
+      quand elle a changé. Les vues ne changent pas la version (une par consultation) : les poids
+      sont recalés par une reconstruction au plus tard après SUGGEST_MAX_AGE secondes.
+    - Démarrage à chaud depuis un fichier instantané ; s'il est plus ancien que la version partagée,
+      la vérification suivante reconstruit depuis la base.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        # Un seul thread vérifie et reconstruit ; les autres servent l'index courant pendant ce temps
+        self._refresh_lock = threading.Lock()
+        self._loaded = False
+        self._version = None
+        self._built_at = 0.0
+        self._checked_at = 0.0
+        self._reset()
+
+    @property
+    def is_loaded(self):
+        return self._loaded
+
+    def _reset(self):
+        self.keys = []
+        self.titles = []
+        self.weights = array('q')
+        self.counts = array('L')
+
+    # --- Paramètres ---
+    @property
+    def max_entries(self):
+        return getattr(settings, 'SUGGEST_MAX_ENTRIES', 100000)
+
+    @property
+    def snapshot_path(self):
+        return getattr(settings, 'SUGGEST_SNAPSHOT_PATH', None)
+
+    @property
+    def refresh_interval(self):
+        return getattr(settings, 'SUGGEST_REFRESH_INTERVAL', 30)
+
+    @property
+    def max_age(self):
+        return getattr(settings, 'SUGGEST_MAX_AGE', 900)
+
+    # --- Chargement ---
+    def ensure_loaded(self):
+        """
+        Charge l'instantané (ou reconstruit depuis la base) au premier usage, puis reconstruit
+        quand la version partagée a changé ou que l'index dépasse SUGGEST_MAX_AGE.
+        """
+        if self._loaded and time.monotonic() - self._checked_at < self.refresh_interval:
+            return
+        # Premier chargement : les autres threads attendent ; ensuite, ils ne bloquent jamais
+        if not self._refresh_lock.acquire(blocking=not self._loaded):
+            return
+        try:
+            now = time.monotonic()
+            if self._loaded and now - self._checked_at < self.refresh_interval:
+                return
+            self._checked_at = now
+            if not self._loaded:
+                if not self.load_snapshot():
+                    self.rebuild()
+                    self.save_snapshot()
+                self._loaded = True
+            elif cache.get(VERSION_CACHE_KEY, 0) != self._version or now - self._built_at > self.max_age:
+                self.rebuild()
+        finally:
+            self._refresh_lock.release()
+
+    def rebuild(self, rows=None):
+        """Reconstruit entièrement l'index à partir des paires (titre, vues)."""
+        # Version lue avant la base : un changement validé pendant la lecture déclenchera la reconstruction suivante
+        version, built_at = cache.get(VERSION_CACHE_KEY, 0), time.monotonic()
+        if rows is None:
+            from .models import Product
+            rows = Product.objects.filter(is_hidden=False).values_list('title', 'views').iterator(chunk_size=5000)
+
+        entries = {}
+        for title, views in rows:
+            key = fold(title or '')
+            if not key:
+                continue
+            entry = entries.get(key)
+            if entry is None:
+                entries[key] = [title.strip(), views, 1]
+            else:
+                entry[1] += views
+                entry[2] += 1
+
+        with self._lock:
+            self._reset()
+            for key in sorted(entries):
+                title, weight, count = entries[key]
+                self.keys.append(key)
+                self.titles.append(title)
+                self.weights.append(weight)
+                self.counts.append(count)
+            self._trim()
+            self._version, self._built_at = version, built_at
+
+    def load_snapshot(self):
+        """Charge l'instantané s'il existe ; sa version et son âge décident de la prochaine reconstruction."""
+        if not self.snapshot_path:
+            return False
+        try:
+            with open(self.snapshot_path, 'rb') as snapshot:
+                data = orjson.loads(snapshot.read())
+        except FileNotFoundError:
+            return False
+        with self._lock:
+            self.keys = data['keys']
+            self.titles = data['titles']
+            self.weights = array('q', data['weights'])
+            self.counts = array('L', data['counts'])
+            self._version = data.get('version')
+            self._built_at = time.monotonic() - (time.time() - data.get('built_at', 0))
+        logger.info(f"🔎 Index de suggestions chargé depuis l'instantané ({len(self.keys)} titres)")
+        return True
+
+    def save_snapshot(self):
+        """Écrit l'instantané de façon atomique (fichier temporaire puis renommage)."""
+        if not self.snapshot_path:
+            return
+        with self._lock:
+            data = orjson.dumps({
+                'keys': self.keys,
+                'titles': self.titles,
+                'weights': self.weights.tolist(),
+                'counts': self.counts.tolist(),
+                'version': self._version,
+                # Horloge murale : l'instantané est relu par d'autres processus
+                'built_at': time.time() - (time.monotonic() - self._built_at),
+            })
+        directory = os.path.dirname(self.snapshot_path)
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory)
+        with os.fdopen(fd, 'wb') as tmp:
+            tmp.write(data)
+        os.replace(tmp_path, self.snapshot_path)
+
+    # --- Mises à jour incrémentales ---
+    def add(self, title, views=0, count=1):
+        key = fold(title or '')
+        if not key:
+            return
+        with self._lock:
+            position = bisect_left(self.keys, key)
+            if position < len(self.keys) and self.keys[position] == key:
+                self.weights[position] = max(self.weights[position] + views, 0)
+                self.counts[position] = max(self.counts[position] + count, 0)
+                if self.counts[position] == 0:
+                    self._remove_at(position)
+                return
+            if count <= 0:
+                return
+            self.keys.insert(position, key)
+            self.titles.insert(position, title.strip())
+            self.weights.insert(position, max(views, 0))
+            self.counts.insert(position, count)
+            if len(self.keys) > self.max_entries:
+                self._trim()
+
+    def remove(self, title, views=0):
+        self.add(title, views=-views, count=-1)
+
+    def _remove_at(self, position):
+        del self.keys[position]
+        del self.titles[position]
+        del self.weights[position]
+        del self.counts[position]
+
+    def _trim(self):
+        """Au-delà de la limite, on ne garde que les titres les plus consultés (90 % de la limite)."""
+        if len(self.keys) <= self.max_entries:
+            return
+        keep = int(self.max_entries * 0.9)
+        kept = sorted(heapq.nlargest(keep, range(len(self.keys)), key=self.weights.__getitem__))
+        self.keys = [self.keys[i] for i in kept]
+        self.titles = [self.titles[i] for i in kept]
+        self.weights = array('q', (self.weights[i] for i in kept))
+        self.counts = array('L', (self.counts[i] for i in kept))
+
+    # --- Recherche ---
+    def suggest(self, prefix, limit=10):
+        """Retourne les `limit` titres les plus consultés commençant par le préfixe normalisé."""
+        self.ensure_loaded()
+        prefix = fold(prefix or '')
+        if len(prefix) < getattr(settings, 'SUGGEST_MIN_PREFIX', 2):
+            return []
+        with self._lock:
+            low = bisect_left(self.keys, prefix)
+            high = bisect_left(self.keys, prefix + '\uffff', low)
+            best = heapq.nlargest(limit, range(low, high), key=self.weights.__getitem__)
+            return [self.titles[i] for i in best]
+
+
+# Instance partagée par tous les threads du processus
+title_index = TitleSuggestionIndex()
@@ -0,0 +1,55 @@
+from decimal import Decimal
+
+from django.contrib.admin import helpers
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from products.models import Product
+
+
+def create_user(email, role='user', phone='77000000'):
+    return get_user_model().objects.create_user(
+        email=email, company_name=email.split('@')[0], phone=phone, password='x', role=role,
+    )
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class BulkDeleteActionTests(TestCase):
+    """La suppression groupée de l'admin passe par une page de confirmation (un comptage)."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = get_user_model().objects.create_superuser('admin@example.com', 'Admin', '77000001', password='x')
+        cls.seller = create_user('vendeur@example.com')
+        for i in range(3):
+            Product.objects.create(owner=cls.seller, title=f'Riz {i}', unit_price=Decimal('10.00'), quantity=1)
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+
+    def post_action(self, url, ids, **extra):
+        return self.client.post(url, {
+            'action': 'delete_selected_bulk', helpers.ACTION_CHECKBOX_NAME: ids, **extra,
+        })
+
+    def test_products_need_confirmation(self):
+        url = reverse('admin:products_product_changelist')
+        ids = list(Product.objects.values_list('pk', flat=True)[:2])
+
+        response = self.post_action(url, ids)
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, 'admin/delete_selected_bulk_confirmation.html')
+        self.assertEqual(response.context['count'], 2)
+        self.assertEqual(Product.objects.count(), 3)
+
+        response = self.post_action(url, ids, post='yes')
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(Product.objects.count(), 1)
+
+    def test_user_confirmation_lists_cascades(self):
+        url = reverse('admin:accounts_user_changelist')
+        response = self.post_action(url, [self.seller.pk])
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(str(Product._meta.verbose_name_plural), response.context['cascades'])
+        self.assertTrue(get_user_model().objects.filter(pk=self.seller.pk).exists())
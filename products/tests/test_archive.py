@@ -0,0 +1,44 @@
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+
+from mediastore.models import StoredFile
+from products.archive import ARCHIVED_FIELDS, archive_batch, restore_listing
+from products.models import ArchivedProduct, Product, ProductTombstone
+
+
+def create_user(email, role='user', phone='77000000'):
+    return get_user_model().objects.create_user(
+        email=email, company_name=email.split('@')[0], phone=phone, password='x', role=role,
+    )
+
+
+class ArchiveTests(TestCase):
+    """L'archivage par lots conserve toutes les colonnes et la référence vers l'image."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.seller = create_user('vendeur@example.com')
+
+    def test_archive_and_restore_round_trip(self):
+        product = Product.objects.create(
+            owner=self.seller, title='Frigo', description='Bon état', unit_price=Decimal('150.50'), quantity=0,
+            image='products/frigo.jpg',
+        )
+        original = Product.objects.filter(pk=product.pk).values(*ARCHIVED_FIELDS).get()
+
+        self.assertEqual(archive_batch([product.pk], 'sold_out'), 1)
+        archived = ArchivedProduct.objects.get(pk=product.pk)
+        self.assertEqual({name: getattr(archived, name) for name in ARCHIVED_FIELDS}, original)
+        self.assertEqual(archived.total_price, Decimal('0.00'))
+        self.assertFalse(Product.objects.filter(pk=product.pk).exists())
+        self.assertTrue(ProductTombstone.objects.filter(product_id=product.pk).exists())
+        self.assertEqual(StoredFile.objects.get(name='products/frigo.jpg').refcount, 1)
+
+        restored = restore_listing(archived, quantity=2)
+        self.assertEqual(restored.pk, product.pk)
+        self.assertEqual(Product.objects.get(pk=product.pk).created_at, original['created_at'])
+        self.assertEqual(Product.objects.get(pk=product.pk).total_price, Decimal('301.00'))
+        self.assertFalse(ArchivedProduct.objects.filter(pk=product.pk).exists())
+        self.assertEqual(StoredFile.objects.get(name='products/frigo.jpg').refcount, 1)
@@ -0,0 +1,85 @@
+import base64
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.test import TestCase
+from django.utils import timezone
+
+from products.changes import ExpiredCursor, decode_cursor, fetch_changes, prune_tombstones
+from products.models import Product, ProductTombstone, next_change_seq
+
+
+def create_user(email, role='user', phone='77000000'):
+    return get_user_model().objects.create_user(
+        email=email, company_name=email.split('@')[0], phone=phone, password='x', role=role,
+    )
+
+
+class ChangeFeedTests(TestCase):
+    """Le curseur suit l'ordre de validation des transactions, pas l'horloge."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.seller = create_user('vendeur@example.com')
+
+    def create_product(self, title):
+        return Product.objects.create(
+            owner=self.seller, title=title, description='', unit_price=Decimal('10.00'), quantity=1,
+        )
+
+    def test_change_dated_before_cursor_is_still_served(self):
+        product = self.create_product('Frigo')
+        upserts, _, cursor, has_more = fetch_changes()
+        self.assertEqual([p.pk for p in upserts], [product.pk])
+        self.assertFalse(has_more)
+
+        # Transaction commencée avant la lecture du client, validée après : updated_at est dans le passé
+        with transaction.atomic():
+            Product.objects.filter(pk=product.pk).update(
+                title='Frigo neuf', updated_at=timezone.now() - timedelta(hours=1), change_seq=next_change_seq(),
+            )
+        upserts, _, _, _ = fetch_changes(cursor)
+        self.assertEqual([(p.pk, p.title) for p in upserts], [(product.pk, 'Frigo neuf')])
+
+    def test_cursor_advances_without_changes(self):
+        self.create_product('Frigo')
+        _, _, cursor, _ = fetch_changes()
+        _, _, same, _ = fetch_changes(cursor)
+        self.assertEqual(fetch_changes(same)[:2], ([], []))
+
+    def test_pagination_within_one_transaction(self):
+        with transaction.atomic():
+            ids = [self.create_product(f'Annonce {i}').pk for i in range(5)]
+            Product.objects.filter(pk__in=ids).update(change_seq=next_change_seq())
+        seen, cursor, has_more = [], None, True
+        while has_more:
+            upserts, _, cursor, has_more = fetch_changes(cursor, limit=2)
+            seen += [p.pk for p in upserts]
+        self.assertEqual(seen, ids)
+
+    def test_deletions_are_served_after_cursor(self):
+        product = self.create_product('Frigo')
+        _, _, cursor, _ = fetch_changes()
+        product_id = product.pk
+        product.delete()
+        upserts, deletes, _, _ = fetch_changes(cursor)
+        self.assertEqual((upserts, deletes), ([], [product_id]))
+
+    def test_cursor_older_than_pruned_tombstones_expires(self):
+        product = self.create_product('Frigo')
+        _, _, cursor, _ = fetch_changes()
+        product.delete()
+        ProductTombstone.objects.update(deleted_at=timezone.now() - timedelta(days=365))
+        self.assertEqual(prune_tombstones(), 1)
+        with self.assertRaises(ExpiredCursor):
+            fetch_changes(cursor)
+        # Un curseur émis après la purge reste valable
+        _, _, fresh, _ = fetch_changes()
+        fetch_changes(fresh)
+
+    def test_legacy_time_cursor_expires(self):
+        legacy = base64.urlsafe_b64encode(b'1760000000000000.42').decode().rstrip('=')
+        with self.assertRaises(ExpiredCursor):
+            decode_cursor(legacy)
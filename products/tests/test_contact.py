@@ -0,0 +1,28 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+
+from products.models import Product, whatsapp_link_for
+
+
+def create_user(email, role='user', phone='77000000'):
+    return get_user_model().objects.create_user(
+        email=email, company_name=email.split('@')[0], phone=phone, password='x', role=role,
+    )
+
+
+class ContactPropagationTests(TestCase):
+    """Le lien WhatsApp recopié en masse est celui que Product.save() calculerait."""
+
+    def test_phone_change_updates_all_listings(self):
+        seller = create_user('vendeur@example.com', phone='77 11 11 11')
+        products = [Product.objects.create(owner=seller, title=f'Sac {i}', unit_price=1, quantity=1) for i in range(3)]
+        before = Product.objects.get(pk=products[0].pk).updated_at
+
+        seller.phone = '+253 77 22 22 22'
+        seller.save()
+
+        fresh = Product.objects.create(owner=seller, title='Nouveau', unit_price=1, quantity=1)
+        links = set(Product.objects.filter(owner=seller).values_list('whatsapp_link', flat=True))
+        self.assertEqual(links, {whatsapp_link_for(seller.phone)})
+        self.assertEqual(fresh.whatsapp_link, whatsapp_link_for(seller.phone))
+        self.assertGreater(Product.objects.get(pk=products[0].pk).updated_at, before)
@@ -0,0 +1,212 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from alerts.digests import send_digests
+from alerts.models import SavedSearch, SearchMatch
+from mediastore.models import StoredFile
+from products.models import (
+    Category, PriceIndexDirtyDay, Product, ProductLSHBucket, ProductNeighbour, ProductNeighbourDirty, ProductTombstone,
+)
+from products.moderation import moderate
+from products.price_index import listing_day
+from products.suggestions import title_index
+from tasks.models import Job
+
+MODERATE_URL = '/api/annonces/products/moderate/'
+ORPHAN_TASK = 'mediastore.tasks.delete_orphan_file'
+
+
+def create_user(email, role='user'):
+    return get_user_model().objects.create_user(
+        email=email, company_name=email.split('@')[0], phone='77000000', password='x', role=role,
+    )
+
+
+@override_settings(SUGGEST_SNAPSHOT_PATH=None)
+class HiddenListingTests(TestCase):
+    """Une annonce masquée ne doit plus sortir par aucun canal (SSE, suggestions, résumés d'alertes)."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.seller = create_user('vendeur@example.com')
+        cls.moderator = create_user('moderateur@example.com', role='moderator')
+        cls.product = Product.objects.create(owner=cls.seller, title='Arnaque garantie', unit_price=10, quantity=1)
+
+    def setUp(self):
+        # Index de suggestions reconstruit depuis la base de test
+        title_index._loaded = False
+        title_index.ensure_loaded()
+        self.client = APIClient()
+        self.client.force_authenticate(self.moderator)
+
+    def hide(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(MODERATE_URL, {'action': 'hide', 'ids': [self.product.pk]}, format='json')
+        self.assertEqual(response.json()['affected'], 1)
+
+    def test_hide_publishes_deletion(self):
+        with mock.patch('products.moderation.publish_deletion') as publish_deletion:
+            self.hide()
+        publish_deletion.assert_called_once_with(self.product.pk, self.product.category_id)
+
+    def test_hide_removes_title_from_suggestions(self):
+        self.assertEqual(title_index.suggest('arnaque'), ['Arnaque garantie'])
+        self.hide()
+        self.assertEqual(title_index.suggest('arnaque'), [])
+        title_index.rebuild()
+        self.assertEqual(title_index.suggest('arnaque'), [])
+
+    def test_unhide_restores_title(self):
+        self.hide()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(MODERATE_URL, {'action': 'unhide', 'ids': [self.product.pk]}, format='json')
+        self.assertEqual(title_index.suggest('arnaque'), ['Arnaque garantie'])
+
+    def test_saving_hidden_listing_is_not_broadcast(self):
+        self.hide()
+        product = Product.objects.get(pk=self.product.pk)
+        product.title = 'Arnaque renommée'
+        with mock.patch('products.signals.publish_product') as publish_product:
+            with self.captureOnCommitCallbacks(execute=True):
+                product.save()
+        publish_product.assert_not_called()
+        self.assertEqual(title_index.suggest('arnaque'), [])
+
+    def test_digest_skips_hidden_listing(self):
+        buyer = create_user('acheteur@example.com')
+        search = SavedSearch.objects.create(user=buyer, keywords='arnaque')
+        SearchMatch.objects.get_or_create(saved_search=search, product=self.product, user=buyer)
+        self.hide()
+        with mock.patch('alerts.digests.get_connection') as get_connection:
+            get_connection.return_value.send_messages.return_value = 0
+            send_digests()
+        get_connection.return_value.send_messages.assert_called_once_with([])
+        self.assertFalse(SearchMatch.objects.filter(notified_at__isnull=True).exists())
+
+
+class BulkDeleteTests(TestCase):
+    """
+    La suppression en masse (un DELETE par lot) doit laisser la base dans le même état
+    que instance.delete() et ses signaux.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.seller = create_user('vendeur@example.com')
+        cls.moderator = create_user('moderateur@example.com', role='moderator')
+        cls.buyer = create_user('acheteur@example.com')
+        cls.search = SavedSearch.objects.create(user=cls.buyer, keywords='tapis')
+
+    def setUp(self):
+        cache.clear()
+
+    def build(self, image):
+        """Deux annonces à supprimer (même image) et une annonce conservée qui les référence."""
+        doomed = [
+            Product.objects.create(
+                owner=self.seller, title=f'Tapis persan {i}', description='Laine tissée main',
+                unit_price=100, quantity=1, image=image,
+            )
+            for i in range(2)
+        ]
+        kept = Product.objects.create(owner=self.seller, title='Lampe', unit_price=5, quantity=1)
+        Product.objects.filter(pk=kept.pk).update(duplicate_of=doomed[0])
+        for product in doomed:
+            SearchMatch.objects.get_or_create(saved_search=self.search, product=product, user=self.buyer)
+        ProductNeighbour.objects.create(product=kept, neighbour=doomed[0], rank=1, score=0.5)
+        ProductNeighbour.objects.create(product=doomed[0], neighbour=kept, rank=1, score=0.5)
+        return doomed, kept
+
+    def listed_count(self):
+        return APIClient().get('/api/annonces/products/').json()['count']
+
+    def state(self, ids, day, kept, image):
+        listed_count = self.listed_count()
+        return {
+            'remaining': Product.objects.filter(pk__in=ids).count(),
+            'tombstones': ProductTombstone.objects.filter(product_id__in=ids).count(),
+            'refcount': StoredFile.objects.filter(name=image).values_list('refcount', flat=True).first(),
+            'orphan_jobs': any(job.args == [image] for job in Job.objects.filter(name=ORPHAN_TASK)),
+            'lsh_buckets': ProductLSHBucket.objects.filter(product_id__in=ids).count(),
+            'search_matches': SearchMatch.objects.filter(product_id__in=ids).count(),
+            'neighbours': ProductNeighbour.objects.filter(neighbour_id__in=ids).count()
+            + ProductNeighbour.objects.filter(product_id__in=ids).count(),
+            'duplicate_of': Product.objects.get(pk=kept.pk).duplicate_of_id,
+            'dirty_day': PriceIndexDirtyDay.objects.filter(day=day).exists(),
+            # Le comptage mis en cache avant la suppression n'est plus servi
+            'count_is_fresh': listed_count == Product.objects.filter(is_hidden=False).count(),
+        }
+
+    def test_bulk_delete_matches_orm_delete(self):
+        orm_doomed, orm_kept = self.build('products/orm.jpg')
+        self.assertEqual(StoredFile.objects.get(name='products/orm.jpg').refcount, 2)
+        self.assertTrue(ProductLSHBucket.objects.filter(product=orm_doomed[0]).exists())
+        # delete() remet pk à None : identifiants relevés avant
+        ids, day = [product.pk for product in orm_doomed], listing_day(orm_doomed[0].created_at)
+        self.listed_count()  # comptage mis en cache
+        with self.captureOnCommitCallbacks(execute=True):
+            for product in orm_doomed:
+                product.delete()
+        expected = self.state(ids, day, orm_kept, 'products/orm.jpg')
+
+        PriceIndexDirtyDay.objects.all().delete()
+        bulk_doomed, bulk_kept = self.build('products/bulk.jpg')
+        ids, day = [product.pk for product in bulk_doomed], listing_day(bulk_doomed[0].created_at)
+        self.listed_count()
+        with self.captureOnCommitCallbacks(execute=True):
+            log = moderate(self.moderator, 'delete', product_ids=ids)
+        self.assertEqual(log.affected, 2)
+        self.assertEqual(self.state(ids, day, bulk_kept, 'products/bulk.jpg'), expected)
+        self.assertEqual(expected['tombstones'], 2)
+        self.assertEqual(expected['refcount'], 0)
+        self.assertTrue(expected['count_is_fresh'])
+
+    def test_seller_cannot_bulk_delete_others_listings(self):
+        doomed, _ = self.build('products/other.jpg')
+        log = moderate(self.buyer, 'delete', owner_id=self.seller.pk)
+        self.assertEqual(log.affected, 0)
+        self.assertEqual(Product.objects.filter(pk__in=[product.pk for product in doomed]).count(), 2)
+
+
+class RecategorizeTests(TestCase):
+    """Le changement de catégorie en masse suit les mêmes canaux que Product.save()."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.seller = create_user('vendeur@example.com')
+        cls.moderator = create_user('moderateur@example.com', role='moderator')
+        cls.old, cls.new = Category.objects.create(name='Riz'), Category.objects.create(name='Farine')
+        cls.product = Product.objects.create(
+            owner=cls.seller, category=cls.old, title='Riz basmati', unit_price=10, quantity=1,
+        )
+        cls.hidden = Product.objects.create(
+            owner=cls.seller, category=cls.old, title='Riz douteux', unit_price=10, quantity=1, is_hidden=True,
+        )
+
+    def recategorize(self):
+        ProductNeighbourDirty.objects.all().delete()
+        with mock.patch('products.moderation.publish_deletion') as publish_deletion, \
+                mock.patch('products.moderation.publish_product') as publish_product, \
+                self.captureOnCommitCallbacks(execute=True):
+            log = moderate(
+                self.moderator, 'recategorize', product_ids=[self.product.pk, self.hidden.pk], category_id=self.new.pk,
+            )
+        self.assertEqual(log.affected, 2)
+        return publish_deletion, publish_product
+
+    def test_neighbours_are_marked_for_recompute(self):
+        self.recategorize()
+        self.assertEqual(
+            set(ProductNeighbourDirty.objects.values_list('product_id', flat=True)), {self.product.pk, self.hidden.pk},
+        )
+
+    def test_visible_listing_moves_between_category_streams(self):
+        publish_deletion, publish_product = self.recategorize()
+        publish_deletion.assert_called_once_with(self.product.pk, self.old.pk)
+        published = publish_product.call_args.args[0]
+        self.assertEqual((published.pk, published.category_id), (self.product.pk, self.new.pk))
+        publish_product.assert_called_once()
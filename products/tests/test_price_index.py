@@ -0,0 +1,78 @@
+from datetime import timedelta
+from decimal import Decimal
+
+import numpy as np
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.utils import timezone
+
+from products.models import Category, PriceIndex, PriceIndexDirtyDay, Product
+from products.price_index import _day_runs, _listing_rows, listing_day, rollup_price_index
+
+
+def create_user(email, role='user', phone='77000000'):
+    return get_user_model().objects.create_user(
+        email=email, company_name=email.split('@')[0], phone=phone, password='x', role=role,
+    )
+
+
+class PriceIndexTests(TestCase):
+    """Le calcul incrémental (jours signalés) donne le même indice que la reconstruction complète."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.seller = create_user('vendeur@example.com')
+        cls.category = Category.objects.create(name='Riz')
+
+    def rows(self):
+        return list(PriceIndex.objects.order_by('day', 'currency').values(
+            'day', 'currency', 'count', 'min_price', 'p25_price', 'median_price', 'p75_price', 'max_price', 'avg_price',
+        ))
+
+    def test_incremental_matches_full_rebuild(self):
+        prices = [Decimal(value) for value in ('10.00', '12.50', '19.99', '40.00', '41.10')]
+        products = [
+            Product.objects.create(owner=self.seller, title='Riz', category=self.category, unit_price=price, quantity=1)
+            for price in prices
+        ]
+        rollup_price_index()
+        incremental = self.rows()
+        self.assertEqual(len(incremental), 1)
+        row = incremental[0]
+        values = np.array([float(price) for price in prices])
+        self.assertEqual(row['count'], 5)
+        self.assertEqual(row['median_price'], Decimal('19.99'))
+        self.assertEqual(row['p25_price'], Decimal(repr(float(np.percentile(values, 25)))).quantize(Decimal('0.01')))
+
+        # Suppression : le jour est de nouveau signalé, puis recalculé
+        products[0].delete()
+        self.assertTrue(PriceIndexDirtyDay.objects.exists())
+        rollup_price_index()
+        incremental = self.rows()
+        rollup_price_index(full=True)
+        self.assertEqual(self.rows(), incremental)
+        self.assertEqual(incremental[0]['min_price'], Decimal('12.50'))
+
+    def test_days_without_listings_disappear(self):
+        product = Product.objects.create(owner=self.seller, title='Riz', category=self.category, unit_price=1, quantity=1)
+        Product.objects.filter(pk=product.pk).update(created_at=timezone.now() - timedelta(days=3))
+        rollup_price_index(full=True)
+        product.refresh_from_db()
+        product.delete()
+        rollup_price_index()
+        self.assertEqual(self.rows(), [])
+
+    def test_sparse_days_read_only_their_listings(self):
+        now = timezone.now()
+        ages = {'dirty': 10, 'between': 5, 'dirty_too': 1}
+        for title, age in ages.items():
+            product = Product.objects.create(owner=self.seller, title=title, category=self.category, unit_price=1, quantity=1)
+            Product.objects.filter(pk=product.pk).update(created_at=now - timedelta(days=age))
+        days = [listing_day(now - timedelta(days=10)), listing_day(now - timedelta(days=1))]
+        self.assertEqual(_day_runs(days), [[day, day] for day in days])
+        self.assertEqual(sorted(row[0] for row in _listing_rows(days)), [day.toordinal() for day in days])
+
+    def test_consecutive_days_form_one_run(self):
+        today = timezone.localdate()
+        days = [today - timedelta(days=n) for n in (0, 1, 2, 5)]
+        self.assertEqual(_day_runs(days), [[days[3], days[3]], [days[2], days[0]]])
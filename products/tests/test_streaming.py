@@ -0,0 +1,55 @@
+from decimal import Decimal
+from unittest import mock
+
+import orjson
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+
+from products.models import Product
+from products.streaming import _cors_headers, publish_product
+
+
+def create_user(email, role='user', phone='77000000'):
+    return get_user_model().objects.create_user(
+        email=email, company_name=email.split('@')[0], phone=phone, password='x', role=role,
+    )
+
+
+@override_settings(CORS_ALLOW_ALL_ORIGINS=False, CORS_ALLOWED_ORIGINS=['https://djibtrade.com'])
+class StreamCorsTests(TestCase):
+    """Le flux SSE, servi hors des middlewares, applique les mêmes réglages CORS que l'API."""
+
+    def scope(self, origin=None):
+        return {'headers': [(b'origin', origin.encode())] if origin else []}
+
+    def test_allowed_origin_is_echoed(self):
+        headers = dict(_cors_headers(self.scope('https://djibtrade.com')))
+        self.assertEqual(headers[b'access-control-allow-origin'], b'https://djibtrade.com')
+        self.assertEqual(headers[b'vary'], b'Origin')
+
+    def test_other_origin_gets_no_allow_header(self):
+        headers = dict(_cors_headers(self.scope('https://autre.example')))
+        self.assertNotIn(b'access-control-allow-origin', headers)
+        self.assertEqual(headers[b'vary'], b'Origin')
+
+    @override_settings(CORS_ALLOW_ALL_ORIGINS=True)
+    def test_allow_all_origins(self):
+        headers = dict(_cors_headers(self.scope('https://autre.example')))
+        self.assertEqual(headers[b'access-control-allow-origin'], b'*')
+
+
+class PublishProductTests(TestCase):
+    """Les annonces diffusées portent les mêmes URLs d'image absolues que les réponses REST."""
+
+    @override_settings(PUBLIC_BASE_URL='https://api.djibtrade.com')
+    def test_image_url_is_absolute(self):
+        product = Product.objects.create(
+            owner=create_user('vendeur@example.com'), title='Frigo', description='Bon état',
+            unit_price=Decimal('150.50'), quantity=1, image='products/frigo.jpg',
+        )
+        with mock.patch('products.streaming.hub') as hub:
+            hub.wants.return_value = True
+            publish_product(product)
+        frame = hub.publish.call_args.args[1]
+        data = orjson.loads(frame.split(b'data: ', 1)[1])
+        self.assertEqual(data['image'], 'https://api.djibtrade.com/media/products/frigo.jpg')
@@ -0,0 +1,71 @@
+import os
+import tempfile
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from products.models import Product
+from products.suggestions import TitleSuggestionIndex, title_index
+
+
+def create_user(email, role='user', phone='77000000'):
+    return get_user_model().objects.create_user(
+        email=email, company_name=email.split('@')[0], phone=phone, password='x', role=role,
+    )
+
+
+@override_settings(SUGGEST_SNAPSHOT_PATH=None, SUGGEST_REFRESH_INTERVAL=0)
+class SharedVersionTests(TestCase):
+    """Les titres ajoutés ou retirés dans un processus atteignent l'index des autres (autre instance ici)."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.seller = create_user('vendeur@example.com')
+
+    def setUp(self):
+        cache.clear()
+        title_index._loaded = False
+        title_index.ensure_loaded()
+        self.other = TitleSuggestionIndex()
+        self.other.ensure_loaded()
+
+    def create(self, title):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Product.objects.create(owner=self.seller, title=title, unit_price=10, quantity=1)
+
+    def test_new_title_reaches_other_process(self):
+        self.create('Riz basmati')
+        self.assertEqual(title_index.suggest('riz'), ['Riz basmati'])
+        self.assertEqual(self.other.suggest('riz'), ['Riz basmati'])
+
+    def test_deleted_title_leaves_other_process(self):
+        product = self.create('Riz basmati')
+        self.other.ensure_loaded()
+        with self.captureOnCommitCallbacks(execute=True):
+            product.delete()
+        self.assertEqual(self.other.suggest('riz'), [])
+
+    def test_views_do_not_trigger_rebuild(self):
+        product = self.create('Riz basmati')
+        self.other.ensure_loaded()
+        product.views += 1
+        with self.captureOnCommitCallbacks(execute=True):
+            product.save(update_fields=['views'])
+        with mock.patch.object(self.other, 'rebuild') as rebuild:
+            self.other.ensure_loaded()
+        rebuild.assert_not_called()
+
+    def test_stale_snapshot_is_rebuilt_at_next_check(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'suggestions.json')
+            with override_settings(SUGGEST_SNAPSHOT_PATH=path):
+                title_index.rebuild()
+                title_index.save_snapshot()
+                self.create('Riz basmati')
+
+                worker = TitleSuggestionIndex()
+                worker.ensure_loaded()  # démarrage à chaud : instantané d'avant l'annonce
+                self.assertEqual(worker.keys, [])
+                self.assertEqual(worker.suggest('riz'), ['Riz basmati'])
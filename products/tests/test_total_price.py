@@ -0,0 +1,32 @@
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from products.models import Product
+
+
+class TotalPriceTests(TestCase):
+    """Prix total généré par la base : exact au centime, y compris sur SQLite."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = get_user_model().objects.create_user(
+            email='vendeur@example.com', company_name='Vendeur', phone='77000000', password='x',
+        )
+        # 19.99 × 7 : 139.92999999999998 en virgule flottante
+        cls.product = Product.objects.create(owner=cls.owner, title='Huile', unit_price=Decimal('19.99'), quantity=7)
+
+    def test_stored_total_is_rounded(self):
+        self.assertEqual(Product.objects.get(pk=self.product.pk).total_price, Decimal('139.93'))
+        self.assertTrue(Product.objects.filter(total_price=Decimal('139.93')).exists())
+
+    def test_range_filters_include_exact_boundary(self):
+        client = APIClient()
+        for query in ('min_total=139.93', 'max_total=139.93', 'min_total=139.93&max_total=139.93'):
+            response = client.get(f'/api/annonces/products/?{query}')
+            ids = [row['id'] for row in response.json()['results']]
+            self.assertIn(self.product.pk, ids, query)
+        response = client.get('/api/annonces/products/?min_total=139.94')
+        self.assertNotIn(self.product.pk, [row['id'] for row in response.json()['results']])
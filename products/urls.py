@@ -1,6 +1,6 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import ProductViewSet, CategoryViewSet
+from .views import ArchivedProductViewSet, ProductViewSet, CategoryViewSet
 
 # ================================
 # Configuration du routeur DRF
@@ -16,6 +16,13 @@ router.register(
     basename='products'     # Nom de référence interne
 )
 
+# Annonces archivées du vendeur connecté (consultation et restauration)
+router.register(
+    r'archived-products',   # URL prefix → /api/annonces/archived-products/
+    ArchivedProductViewSet,
+    basename='archived-products'
+)
+
 # Route pour la gestion des catégories
 router.register(
     r'categories',          # URL prefix → /api/categories/
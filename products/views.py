@@ -1,38 +1,95 @@
-from rest_framework import viewsets, permissions
-from rest_framework.exceptions import PermissionDenied
+from datetime import date, timedelta
+from decimal import Decimal, InvalidOperation
+
+from django.conf import settings
+from django.utils import timezone
+from rest_framework import viewsets, permissions, status
+from rest_framework.decorators import action
+from rest_framework.exceptions import PermissionDenied, ValidationError
 from rest_framework.parsers import JSONParser, MultiPartParser, FormParser
 from rest_framework.response import Response
-from .models import Product, Category
-from .serializers import ProductSerializer, CategorySerializer
+from accounts.permissions import can_moderate
+from cities.index import city_index
+from djibtrade.throttling import AnonTokenBucketThrottle
+from .archive import restore_listing
+from .models import ArchivedProduct, PriceIndex, Product, Category
+from .moderation import ModerationDenied, moderate
+from .serializers import (
+    ArchivedProductSerializer, ModerationSerializer, ProductSerializer, CategorySerializer, RestoreProductSerializer,
+)
+from .ranking import FEED_ORDERING
+from .changes import ExpiredCursor, InvalidCursor, fetch_changes
+from .suggestions import title_index
+from .fastpath import FastListMixin, ProductRowSerializer, CategoryRowSerializer
+
 
+def can_modify(user, product):
+    """Propriétaire (comparaison des identifiants, sans charger le vendeur) ou modérateur."""
+    return product.owner_id == user.pk or can_moderate(user)
 
-class ProductViewSet(viewsets.ModelViewSet):
+
+class ProductViewSet(FastListMixin, viewsets.ModelViewSet):
     """
     ViewSet pour gérer les produits.
     - List et Retrieve : accessible à tous
     - Create, Update, Delete : réservé aux utilisateurs authentifiés
     - Filtrage par catégorie : /products/?category=<id>
+    - Filtrage par ville : /products/?city=<nom> (ville normalisée, clé étrangère indexée)
+    - Filtrage par prix total : /products/?min_total=100&max_total=500
+    - Tri par prix total : /products/?ordering=total_price (ou -total_price), index (total_price, id)
+    - Annonces des vendeurs premium en tête (clé `boost` indexée)
+    - Liste servie par le chemin rapide si FAST_LIST_SERIALIZATION est activé
+    - Modération en masse : POST /products/moderate/
+    - Annonces similaires : /products/<id>/similar/ (voisins précalculés)
     """
-    queryset = Product.objects.all().order_by('-created_at')
+    queryset = Product.objects.all().order_by(*FEED_ORDERING)
     serializer_class = ProductSerializer
+    row_serializer_class = ProductRowSerializer
     parser_classes = (JSONParser, MultiPartParser, FormParser)
 
     def get_permissions(self):
         """Définit les permissions en fonction de l'action."""
-        if self.action in ['list', 'retrieve']:
+        if self.action in ['list', 'retrieve', 'suggest', 'changes', 'similar']:
             permission_classes = [permissions.AllowAny]
         else:
             permission_classes = [permissions.IsAuthenticated]
         return [permission() for permission in permission_classes]
 
+    def get_throttles(self):
+        """La consultation anonyme d'une annonce est limitée en débit."""
+        if self.action == 'retrieve':
+            return [AnonTokenBucketThrottle(scope='product_retrieve')]
+        return super().get_throttles()
+
     def get_queryset(self):
         """
-        Filtrage par catégorie si ?category=<id> est passé en paramètre.
+        Filtrage par catégorie si ?category=<id> est passé en paramètre,
+        et par ville si ?city=<nom> est passé en paramètre.
         """
         queryset = super().get_queryset()
+        if self.action in ('list', 'retrieve'):
+            # Annonces masquées par la modération : invisibles du public
+            queryset = queryset.filter(is_hidden=False)
         category_id = self.request.query_params.get('category')
         if category_id:
             queryset = queryset.filter(category_id=category_id)
+        city = self.request.query_params.get('city')
+        if city:
+            entry = city_index.lookup(city)
+            queryset = queryset.filter(city_ref_id=entry['id']) if entry else queryset.none()
+        for param, lookup in (('min_total', 'total_price__gte'), ('max_total', 'total_price__lte')):
+            value = self.request.query_params.get(param)
+            if value:
+                try:
+                    amount = Decimal(value)
+                except InvalidOperation:
+                    amount = None
+                if amount is None or not amount.is_finite():
+                    raise ValidationError({param: "Montant invalide."})
+                queryset = queryset.filter(**{lookup: amount})
+        ordering = self.request.query_params.get('ordering')
+        if ordering in ('total_price', '-total_price'):
+            queryset = queryset.order_by(ordering, ordering.replace('total_price', 'id'))
         return queryset
 
     def perform_create(self, serializer):
@@ -46,12 +103,11 @@ class ProductViewSet(viewsets.ModelViewSet):
         """
         Modification autorisée uniquement pour :
         - Le propriétaire de l'annonce
-        - Les modérateurs
+        - Les modérateurs et administrateurs
         - Les superadmins
+        L'annonce est celle déjà chargée par update() : pas de seconde lecture, ni du vendeur.
         """
-        product = self.get_object()
-        user = self.request.user
-        if user.role == 'moderator' or user.is_superuser or product.owner == user:
+        if can_modify(self.request.user, serializer.instance):
             serializer.save()
         else:
             raise PermissionDenied("Vous n'avez pas la permission de modifier cette annonce.")
@@ -60,11 +116,10 @@ class ProductViewSet(viewsets.ModelViewSet):
         """
         Suppression autorisée uniquement pour :
         - Le propriétaire
-        - Les modérateurs
+        - Les modérateurs et administrateurs
         - Les superadmins
         """
-        user = self.request.user
-        if user.role == 'moderator' or user.is_superuser or instance.owner == user:
+        if can_modify(self.request.user, instance):
             instance.delete()
         else:
             raise PermissionDenied("Vous n'avez pas la permission de supprimer cette annonce.")
@@ -79,12 +134,163 @@ class ProductViewSet(viewsets.ModelViewSet):
         serializer = self.get_serializer(instance)
         return Response(serializer.data)
 
+    @action(detail=False, methods=['get'])
+    def suggest(self, request):
+        """
+        Suggestions de titres pendant la saisie : /products/suggest/?q=hui&limit=10
+        Réponse servie par l'index en mémoire (aucune requête SQL).
+        """
+        try:
+            limit = min(max(int(request.query_params.get('limit', 10)), 1), 50)
+        except ValueError:
+            limit = 10
+        return Response(title_index.suggest(request.query_params.get('q', ''), limit=limit))
+
+    @action(detail=True, methods=['get'])
+    def similar(self, request, pk=None):
+        """
+        Annonces similaires : /products/<id>/similar/?limit=10
+        Une seule requête sur la table des voisins précalculés (index (product, rank)), jointe aux annonces ;
+        pas de lecture préalable de l'annonce : un identifiant inconnu renvoie une liste vide.
+        """
+        top_k = getattr(settings, 'SIMILAR_PRODUCTS_TOP_K', 10)
+        try:
+            limit = min(max(int(request.query_params.get('limit', top_k)), 1), top_k)
+            product_id = int(pk)
+        except ValueError:
+            raise ValidationError({'detail': "Paramètre invalide."})
+        neighbours = (
+            Product.objects.filter(neighbour_of__product_id=product_id, is_hidden=False)
+            .select_related('owner', 'category')
+            .order_by('neighbour_of__rank')[:limit]
+        )
+        return Response(self.get_serializer(neighbours, many=True).data)
 
-class CategoryViewSet(viewsets.ModelViewSet):
+    @action(detail=False, methods=['post'])
+    def moderate(self, request):
+        """
+        Modération en masse : POST /products/moderate/
+        {"action": "delete" | "hide" | "unhide" | "recategorize", "ids": [...] ou "owner": <id>,
+         "category": <id> (changement de catégorie), "reason": "..."}
+        Les règles de accounts/permissions.py sont appliquées en SQL : un vendeur n'atteint que ses annonces,
+        un modérateur toutes. Chaque action est un UPDATE ou un DELETE groupé, consigné dans ModerationLog.
+        """
+        serializer = ModerationSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        try:
+            log = moderate(
+                request.user,
+                data['action'],
+                product_ids=data.get('ids'),
+                owner_id=data.get('owner'),
+                category_id=data['category'].pk if data.get('category') else None,
+                reason=data['reason'],
+            )
+        except ModerationDenied as exc:
+            raise PermissionDenied(str(exc))
+        return Response({
+            'action': log.action,
+            'requested': len(set(data['ids'])) if 'ids' in data else None,
+            'affected': log.affected,
+            'log': log.pk,
+        })
+
+    @action(detail=False, methods=['get'])
+    def changes(self, request):
+        """
+        Synchronisation incrémentale : /products/changes/?since=<curseur>&limit=100
+        - `upserts` : annonces créées ou modifiées depuis le curseur
+        - `deletes` : identifiants des annonces supprimées
+        - `cursor` : à renvoyer dans `since` à l'appel suivant ; `has_more` : appeler de nouveau
+        Sans `since`, le flux part du début (synchronisation initiale par lots).
+        Un curseur expiré renvoie 410 : le client doit tout recharger.
+        """
+        default_limit = getattr(settings, 'CHANGES_BATCH_SIZE', 100)
+        try:
+            limit = min(max(int(request.query_params.get('limit', default_limit)), 1), getattr(settings, 'CHANGES_MAX_BATCH_SIZE', 500))
+        except ValueError:
+            limit = default_limit
+        try:
+            upserts, deletes, cursor, has_more = fetch_changes(request.query_params.get('since'), limit=limit)
+        except ExpiredCursor as exc:
+            return Response({'detail': str(exc)}, status=status.HTTP_410_GONE)
+        except InvalidCursor as exc:
+            raise ValidationError({'since': str(exc)})
+        return Response({
+            'upserts': self.get_serializer(upserts, many=True).data,
+            'deletes': deletes,
+            'cursor': cursor,
+            'has_more': has_more,
+        })
+
+
+class ArchivedProductViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    Annonces archivées (expirées ou épuisées) du vendeur connecté.
+    - POST /archived-products/<id>/restore/ : remet l'annonce en ligne ({"quantity": n} si elle était épuisée)
+    """
+    serializer_class = ArchivedProductSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        # Index (owner, archived_at)
+        return (
+            ArchivedProduct.objects.filter(owner=self.request.user)
+            .select_related('category')
+            .order_by('-archived_at', '-id')
+        )
+
+    @action(detail=True, methods=['post'])
+    def restore(self, request, pk=None):
+        archived = self.get_object()
+        serializer = RestoreProductSerializer(data=request.data, context={'archived': archived})
+        serializer.is_valid(raise_exception=True)
+        product = restore_listing(archived, quantity=serializer.validated_data.get('quantity'))
+        return Response(ProductSerializer(product, context=self.get_serializer_context()).data, status=status.HTTP_201_CREATED)
+
+
+class CategoryViewSet(FastListMixin, viewsets.ModelViewSet):
     """
     ViewSet pour gérer les catégories.
     Accessible en lecture seule à tout le monde.
     """
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
+    row_serializer_class = CategoryRowSerializer
     permission_classes = [permissions.AllowAny]
+
+    @action(detail=True, methods=['get'], url_path='price-index')
+    def price_index(self, request, pk=None):
+        """
+        Cours de la catégorie : /categories/<id>/price-index/?from=2025-01-01&to=2025-03-31&currency=DJF
+        Série quotidienne (min, quartiles, médiane, max, moyenne des prix unitaires des annonces publiées),
+        lue dans les agrégats précalculés par `rollup_price_index` : aucune lecture des annonces.
+        Par défaut : les PRICE_INDEX_DEFAULT_DAYS derniers jours, toutes devises.
+        """
+        category = self.get_object()
+        today = timezone.localdate()
+        try:
+            end = date.fromisoformat(request.query_params['to']) if request.query_params.get('to') else today
+            start = date.fromisoformat(request.query_params['from']) if request.query_params.get('from') \
+                else end - timedelta(days=getattr(settings, 'PRICE_INDEX_DEFAULT_DAYS', 90) - 1)
+        except ValueError:
+            raise ValidationError({'detail': "Dates attendues au format AAAA-MM-JJ."})
+        if start > end:
+            raise ValidationError({'from': "La date de début doit précéder la date de fin."})
+        if (end - start).days >= getattr(settings, 'PRICE_INDEX_MAX_DAYS', 731):
+            raise ValidationError({'from': "Période trop longue."})
+
+        series = PriceIndex.objects.filter(category=category, day__range=(start, end))
+        currency = request.query_params.get('currency')
+        if currency:
+            series = series.filter(currency=currency)
+        rows = series.order_by('currency', 'day').values(
+            'day', 'currency', 'count', 'min_price', 'p25_price', 'median_price', 'p75_price', 'max_price', 'avg_price',
+        )
+        return Response({
+            'category': category.pk,
+            'from': start,
+            'to': end,
+            'series': list(rows),
+        })
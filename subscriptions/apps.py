@@ -1,6 +1,9 @@
-
 from django.apps import AppConfig
 
 class SubscriptionsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'subscriptions'
+
+    def ready(self):
+        # Import des signaux quand l'application est prête
+        import subscriptions.signals
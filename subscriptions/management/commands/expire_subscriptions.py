@@ -0,0 +1,26 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from subscriptions.premium import expire_subscriptions, sync_premium_flags
+
+
+class Command(BaseCommand):
+    help = "Expire les abonnements premium échus et synchronise User.is_premium (ponctuel ou en boucle)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help="Nombre d'abonnements traités par transaction")
+        parser.add_argument('--loop', action='store_true', help="Tourne en continu comme un worker")
+        parser.add_argument('--interval', type=int, default=300, help="Secondes entre deux passages en mode --loop")
+        parser.add_argument('--sync', action='store_true', help="Corrige aussi les is_premium désynchronisés")
+
+    def handle(self, *args, **options):
+        while True:
+            expired = expire_subscriptions(batch_size=options['batch_size'])
+            self.stdout.write(self.style.SUCCESS(f"✅ {expired} abonnements expirés."))
+            if options['sync']:
+                fixed = sync_premium_flags()
+                self.stdout.write(self.style.SUCCESS(f"🔄 {fixed} statuts premium corrigés."))
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:49
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('subscriptions', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='subscription',
+            index=models.Index(fields=['plan', 'end_date'], name='subscription_plan_end_idx'),
+        ),
+    ]
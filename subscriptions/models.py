@@ -13,5 +13,11 @@ class Subscription(models.Model):
     start_date = models.DateTimeField(auto_now_add=True)
     end_date = models.DateTimeField(blank=True, null=True)
 
+    class Meta:
+        indexes = [
+            # Recherche des abonnements échus : WHERE plan = 'PREMIUM' AND end_date < now
+            models.Index(fields=['plan', 'end_date'], name='subscription_plan_end_idx'),
+        ]
+
     def __str__(self):
         return f"{self.user.company_name} - {self.plan}"
@@ -0,0 +1,124 @@
+import logging
+import math
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from accounts.models import User
+from djibtrade.counting import bump_table_version
+from products.ranking import propagate_boost
+from .models import Subscription
+
+# Configuration du logger
+logger = logging.getLogger(__name__)
+
+PREMIUM_CACHE_TIMEOUT = 3600  # secondes
+NOT_PREMIUM = 0
+PREMIUM_FOREVER = math.inf
+
+
+def _cache_key(user_id):
+    return f"premium:{user_id}"
+
+
+def invalidate_premium_cache(user_ids):
+    """Supprime l'état premium mis en cache pour ces utilisateurs."""
+    cache.delete_many([_cache_key(user_id) for user_id in user_ids])
+
+
+def _premium_until(user_id):
+    """
+    Date (timestamp) jusqu'à laquelle l'utilisateur est premium.
+    - Avec un abonnement : d'après celui-ci (index unique sur user_id, sans jointure).
+    - Sans abonnement : premium accordé à la main, lu sur User.is_premium
+      (même règle que sync_premium_flags, qui ne touche pas ces utilisateurs).
+    """
+    subscriptions = list(Subscription.objects.filter(user_id=user_id).values_list('plan', 'end_date')[:1])
+    if not subscriptions:
+        return PREMIUM_FOREVER if User.objects.filter(pk=user_id, is_premium=True).exists() else NOT_PREMIUM
+    plan, end_date = subscriptions[0]
+    if plan != 'PREMIUM':
+        return NOT_PREMIUM
+    return PREMIUM_FOREVER if end_date is None else end_date.timestamp()
+
+
+def is_active_premium(subscription, now=None):
+    """Indique si un abonnement donne actuellement accès au premium."""
+    now = now or timezone.now()
+    return subscription.plan == 'PREMIUM' and (subscription.end_date is None or subscription.end_date >= now)
+
+
+def is_premium(user):
+    """
+    Indique si l'utilisateur est premium à cet instant.
+    Le cache conserve l'échéance plutôt qu'un booléen : la réponse reste juste
+    à l'expiration, même avant le passage du job d'expiration.
+    """
+    user_id = getattr(user, 'pk', user)
+    if user_id is None:
+        return False
+    until = cache.get(_cache_key(user_id))
+    if until is None:
+        until = _premium_until(user_id)
+        cache.set(_cache_key(user_id), until, PREMIUM_CACHE_TIMEOUT)
+    return timezone.now().timestamp() < until
+
+
+def set_premium(user_ids, value):
+    """
+    Met à jour is_premium pour un ensemble d'utilisateurs en un seul UPDATE,
+    puis la clé de classement de leurs annonces.
+    Point d'entrée unique des changements de statut premium.
+    """
+    user_ids = list(user_ids)
+    if not user_ids:
+        return 0
+    updated = User.objects.filter(pk__in=user_ids).exclude(is_premium=value).update(is_premium=value)
+    bump_table_version(User)
+    propagate_boost(user_ids, value)
+    transaction.on_commit(lambda: invalidate_premium_cache(user_ids))
+    return updated
+
+
+def expire_subscriptions(now=None, batch_size=1000):
+    """
+    Repasse en FREE les abonnements premium échus, par lots.
+    Chaque lot est traité dans une transaction : abonnements et is_premium
+    des utilisateurs sont rétrogradés ensemble, en UPDATE groupés.
+    Retourne le nombre d'abonnements expirés.
+    """
+    now = now or timezone.now()
+    expired = 0
+    while True:
+        with transaction.atomic():
+            # Parcours de l'index (plan, end_date)
+            user_ids = list(
+                Subscription.objects
+                .select_for_update(skip_locked=True)
+                .filter(plan='PREMIUM', end_date__lt=now)
+                .values_list('user_id', flat=True)[:batch_size]
+            )
+            if not user_ids:
+                break
+            Subscription.objects.filter(user_id__in=user_ids, plan='PREMIUM', end_date__lt=now).update(plan='FREE')
+            bump_table_version(Subscription)
+            set_premium(user_ids, False)
+        expired += len(user_ids)
+        logger.info(f"⏳ {len(user_ids)} abonnements premium expirés")
+    return expired
+
+
+def sync_premium_flags(now=None):
+    """
+    Aligne User.is_premium sur les abonnements actifs (rattrapage des écarts).
+    Retourne le nombre d'utilisateurs corrigés.
+    """
+    now = now or timezone.now()
+    active = Q(subscription__plan='PREMIUM') & (Q(subscription__end_date__isnull=True) | Q(subscription__end_date__gte=now))
+    with transaction.atomic():
+        to_enable = User.objects.filter(active, is_premium=False).values_list('pk', flat=True)
+        # Les utilisateurs sans abonnement (premium accordé à la main) ne sont pas touchés
+        to_disable = User.objects.filter(is_premium=True, subscription__isnull=False).exclude(active).values_list('pk', flat=True)
+        return set_premium(to_enable, True) + set_premium(to_disable, False)
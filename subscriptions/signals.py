@@ -0,0 +1,26 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from djibtrade.counting import track_table_versions
+from .models import Subscription
+from .premium import is_active_premium, set_premium
+
+
+# 🔹 Signal : garde User.is_premium aligné sur l'abonnement
+@receiver(post_save, sender=Subscription)
+def sync_premium_on_save(sender, instance, **kwargs):
+    """
+    Met à jour is_premium de l'utilisateur quand son abonnement est créé ou modifié.
+    """
+    set_premium([instance.user_id], is_active_premium(instance))
+
+
+@receiver(post_delete, sender=Subscription)
+def sync_premium_on_delete(sender, instance, **kwargs):
+    """
+    Un utilisateur sans abonnement n'est plus premium.
+    """
+    set_premium([instance.user_id], False)
+
+
+# 🔹 Version de la table : invalide les comptages de pagination en cache
+track_table_versions(Subscription)
@@ -0,0 +1,59 @@
+from datetime import timedelta
+from decimal import Decimal
+from types import SimpleNamespace
+
+from django.contrib.admin import site
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase
+from django.utils import timezone
+
+from accounts.admin import UserAdmin
+from products.models import Product
+from subscriptions.models import Subscription
+from subscriptions.premium import is_premium, sync_premium_flags
+
+
+def create_user(email, role='user', phone='77000000'):
+    return get_user_model().objects.create_user(
+        email=email, company_name=email.split('@')[0], phone=phone, password='x', role=role,
+    )
+
+
+class PremiumStateTests(TestCase):
+    """is_premium() et User.is_premium suivent la même règle que sync_premium_flags."""
+
+    def setUp(self):
+        cache.clear()
+
+    def test_manual_premium_without_subscription(self):
+        user = create_user('vendeur@example.com')
+        get_user_model().objects.filter(pk=user.pk).update(is_premium=True)
+        self.assertEqual(sync_premium_flags(), 0)
+        self.assertTrue(is_premium(user))
+
+    def test_subscription_decides_when_present(self):
+        user = create_user('vendeur@example.com')
+        Subscription.objects.create(user=user, plan='PREMIUM', end_date=timezone.now() + timedelta(days=1))
+        self.assertTrue(is_premium(user))
+        Subscription.objects.filter(user=user).update(plan='FREE')
+        cache.clear()
+        self.assertFalse(is_premium(user))
+
+
+class AdminPremiumTests(TestCase):
+    """Le premium accordé dans l'admin passe par set_premium (classement et cache)."""
+
+    def test_admin_change_updates_boost_and_cache(self):
+        seller = create_user('vendeur@example.com')
+        product = Product.objects.create(owner=seller, title='Riz', unit_price=Decimal('10.00'), quantity=1)
+        self.assertFalse(is_premium(seller))
+
+        seller.is_premium = True
+        form = SimpleNamespace(changed_data=['is_premium'])
+        with self.captureOnCommitCallbacks(execute=True):
+            UserAdmin(get_user_model(), site).save_model(RequestFactory().post('/'), seller, form, change=True)
+
+        product.refresh_from_db()
+        self.assertEqual(product.boost, 1)
+        self.assertTrue(is_premium(seller))
@@ -0,0 +1,16 @@
+from django.contrib import admin, messages
+from .models import Job
+from .queue import retry_dead
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ('name', 'queue', 'status', 'attempts', 'max_attempts', 'run_at', 'claimed_by', 'created_at')
+    list_filter = ('status', 'queue')
+    search_fields = ('name',)
+    readonly_fields = ('claimed_by', 'claimed_at', 'last_error', 'created_at')
+    actions = ('retry_jobs',)
+
+    @admin.action(permissions=['change'], description="Relancer les tâches abandonnées")
+    def retry_jobs(self, request, queryset):
+        retried = retry_dead(queryset)
+        self.message_user(request, f"{retried} tâche(s) relancée(s).", messages.SUCCESS)
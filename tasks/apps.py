@@ -0,0 +1,6 @@
+from django.apps import AppConfig
+
+class TasksConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'tasks'
+    verbose_name = "Tâches en arrière-plan"
@@ -0,0 +1,106 @@
+import logging
+import os
+import signal
+import socket
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connections
+
+from tasks.queue import claim, complete, discover_tasks, fail, queue_stats, requeue_stale, run_task
+
+# Configuration du logger
+logger = logging.getLogger(__name__)
+
+# Fréquence des opérations de maintenance (tâches orphelines, métriques)
+MAINTENANCE_INTERVAL = 30
+
+
+def _init_process():
+    # Processus du pool : configuration Django propre, sans connexion héritée du parent
+    django.setup()
+    connections.close_all()
+
+
+class Command(BaseCommand):
+    help = "Exécute les tâches en arrière-plan stockées en base (pool de threads ou de processus)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--queue', action='append', dest='queues', help="File à traiter (répétable ; toutes par défaut)")
+        parser.add_argument('--concurrency', type=int, default=None, help="Nombre de tâches exécutées en parallèle")
+        parser.add_argument('--pool', choices=('thread', 'process'), default='thread',
+                            help="thread : tâches d'E/S (emails, fichiers) ; process : tâches de calcul")
+        parser.add_argument('--poll-interval', type=float, default=None, help="Attente (s) quand la file est vide")
+        parser.add_argument('--burst', action='store_true', help="S'arrête dès que la file est vide")
+
+    def handle(self, *args, **options):
+        discover_tasks()
+        concurrency = options['concurrency'] or getattr(settings, 'TASKS_WORKER_CONCURRENCY', 4)
+        poll_interval = options['poll_interval'] or getattr(settings, 'TASKS_POLL_INTERVAL', 1)
+        worker_id = f"{socket.gethostname()}-{os.getpid()}"
+
+        self.stopping = False
+        signal.signal(signal.SIGTERM, self._stop)
+        signal.signal(signal.SIGINT, self._stop)
+
+        if options['pool'] == 'process':
+            # Les processus fils ne doivent pas partager la connexion du parent
+            connections.close_all()
+            pool = ProcessPoolExecutor(max_workers=concurrency, initializer=_init_process)
+        else:
+            pool = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='task')
+
+        self.stdout.write(f"🚀 Worker {worker_id} : {concurrency} {options['pool']}(s), files {options['queues'] or 'toutes'}")
+        in_flight = {}
+        processed = 0
+        next_maintenance = 0
+        try:
+            while not self.stopping or in_flight:
+                if time.monotonic() >= next_maintenance and not self.stopping:
+                    self._maintenance()
+                    next_maintenance = time.monotonic() + MAINTENANCE_INTERVAL
+
+                # Réservation limitée aux emplacements libres du pool
+                free = concurrency - len(in_flight)
+                jobs = claim(options['queues'], limit=free, worker_id=worker_id) if free and not self.stopping else []
+                for job in jobs:
+                    in_flight[pool.submit(run_task, job.name, job.args, job.kwargs)] = job
+
+                if not in_flight:
+                    if options['burst']:
+                        break
+                    close_old_connections()
+                    time.sleep(poll_interval)
+                    continue
+
+                done, _ = wait(in_flight, timeout=poll_interval if not jobs else 0, return_when=FIRST_COMPLETED)
+                for future in done:
+                    job = in_flight.pop(future)
+                    try:
+                        error = future.result()
+                    except Exception as exc:
+                        # Processus du pool tué (mémoire, signal...)
+                        error = repr(exc)
+                    if error is None:
+                        complete(job)
+                    else:
+                        fail(job, error)
+                    processed += 1
+        finally:
+            pool.shutdown(wait=True)
+
+        self.stdout.write(self.style.SUCCESS(f"✅ Worker arrêté, {processed} tâche(s) traitée(s)."))
+
+    def _stop(self, signum, frame):
+        # Arrêt propre : plus de réservation, les tâches en cours se terminent
+        self.stopping = True
+
+    def _maintenance(self):
+        recovered = requeue_stale()
+        if recovered:
+            logger.warning(f"⚠️ {recovered} tâche(s) orpheline(s) remise(s) en file")
+        for queue, depth in queue_stats().items():
+            logger.info(f"📊 File {queue} : {depth}")
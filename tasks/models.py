@@ -0,0 +1,47 @@
+from django.db import models
+from django.db.models import Q
+from django.utils import timezone
+
+
+class Job(models.Model):
+    """
+    Tâche en attente d'exécution par un worker (`python manage.py run_worker`).
+    - `pending` : prête à partir de `run_at` (première exécution ou nouvelle tentative).
+    - `running` : réservée par un worker (`claimed_by`) ; remise en file si le worker disparaît.
+    - `dead` : échecs répétés (file des lettres mortes), relançable depuis l'admin.
+    Une tâche réussie est supprimée : la table ne contient que le travail restant.
+    """
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DEAD = 'dead'
+    STATUS_CHOICES = [
+        (PENDING, 'En attente'),
+        (RUNNING, 'En cours'),
+        (DEAD, 'Abandonnée'),
+    ]
+
+    name = models.CharField(max_length=200, help_text="Chemin de la tâche (module.fonction)")
+    queue = models.CharField(max_length=50, default='default')
+    args = models.JSONField(default=list, blank=True)
+    kwargs = models.JSONField(default=dict, blank=True)
+
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=5)
+    run_at = models.DateTimeField(default=timezone.now, help_text="Exécution au plus tôt")
+    claimed_by = models.CharField(max_length=64, blank=True, help_text="Jeton du worker qui l'exécute")
+    claimed_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Tâche"
+        indexes = [
+            # Réservation : prochaines tâches prêtes d'une file, dans l'ordre
+            models.Index(fields=['queue', 'run_at', 'id'], name='job_ready_idx', condition=Q(status='pending')),
+            # Tâches orphelines d'un worker arrêté
+            models.Index(fields=['claimed_at'], name='job_running_idx', condition=Q(status='running')),
+        ]
+
+    def __str__(self):
+        return f"{self.name} #{self.pk} ({self.status})"
@@ -0,0 +1,205 @@
+import logging
+import random
+import traceback
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from django.db.models import Count, F, Min, Q
+from django.utils import timezone
+from django.utils.module_loading import autodiscover_modules, import_string
+
+from .models import Job
+
+# Configuration du logger
+logger = logging.getLogger(__name__)
+
+
+# ==========================
+# 🔹 Déclaration des tâches
+# ==========================
+class Task:
+    """
+    Fonction exécutable en arrière-plan.
+    - task(...) l'exécute immédiatement, dans le processus courant.
+    - task.delay(...) l'ajoute à la file ; les arguments doivent être sérialisables en JSON
+      (identifiants plutôt qu'instances de modèles).
+    """
+
+    def __init__(self, func, queue='default', max_attempts=None):
+        self.func = func
+        self.name = f"{func.__module__}.{func.__qualname__}"
+        self.queue = queue
+        self.max_attempts = max_attempts
+        self.__doc__ = func.__doc__
+
+    def __call__(self, *args, **kwargs):
+        return self.func(*args, **kwargs)
+
+    def delay(self, *args, **kwargs):
+        return enqueue(self, args, kwargs)
+
+    def __repr__(self):
+        return f"<Task {self.name}>"
+
+
+def task(func=None, *, queue='default', max_attempts=None):
+    """
+    Décorateur : @task ou @task(queue='emails', max_attempts=3).
+    Les tâches se déclarent dans le module `tasks.py` d'une application.
+    """
+    def decorator(f):
+        return Task(f, queue=queue, max_attempts=max_attempts)
+
+    return decorator(func) if func is not None else decorator
+
+
+# ==========================
+# 🔹 Mise en file
+# ==========================
+def enqueue(task, args=(), kwargs=None, run_at=None):
+    """
+    Ajoute une tâche à la file.
+    La ligne est insérée dans la transaction en cours : le worker ne la voit qu'une fois la
+    transaction validée, et elle disparaît avec un rollback (jamais de tâche sur des données absentes).
+    Avec TASKS_EAGER (développement, sans worker), la tâche s'exécute localement après le commit.
+    """
+    kwargs = kwargs or {}
+    if getattr(settings, 'TASKS_EAGER', False):
+        transaction.on_commit(lambda: _run_eagerly(task, args, kwargs))
+        return None
+    return Job.objects.create(
+        name=task.name,
+        queue=task.queue,
+        args=list(args),
+        kwargs=kwargs,
+        max_attempts=task.max_attempts or getattr(settings, 'TASKS_MAX_ATTEMPTS', 5),
+        run_at=run_at or timezone.now(),
+    )
+
+
+def _run_eagerly(task, args, kwargs):
+    try:
+        task.func(*args, **kwargs)
+    except Exception as exc:
+        logger.error(f"❌ Tâche {task.name} en échec : {exc}")
+
+
+# ==========================
+# 🔹 Exécution (worker)
+# ==========================
+def discover_tasks():
+    """Importe le module `tasks` de chaque application pour enregistrer leurs tâches."""
+    autodiscover_modules('tasks')
+
+
+def run_task(name, args, kwargs):
+    """
+    Exécute une tâche par son nom, dans un thread ou un processus du pool.
+    Retourne None en cas de succès, sinon la trace de l'erreur (texte, transmissible entre processus).
+    """
+    close_old_connections()
+    try:
+        import_string(name).func(*args, **kwargs)
+        return None
+    except Exception:
+        return traceback.format_exc()
+    finally:
+        close_old_connections()
+
+
+def claim(queues=None, limit=1, worker_id='worker'):
+    """
+    Réserve jusqu'à `limit` tâches prêtes, de façon atomique.
+    - PostgreSQL / MySQL : SELECT ... FOR UPDATE SKIP LOCKED, les workers ne s'attendent pas.
+    - Ailleurs : l'UPDATE conditionnel (status='pending') garantit qu'une tâche n'est réservée qu'une fois.
+    """
+    now = timezone.now()
+    token = f"{worker_id[:31]}:{uuid.uuid4().hex}"
+    with transaction.atomic():
+        ready = Job.objects.filter(status=Job.PENDING, run_at__lte=now).order_by('run_at', 'id')
+        if queues:
+            ready = ready.filter(queue__in=queues)
+        if connection.features.has_select_for_update_skip_locked:
+            ready = ready.select_for_update(skip_locked=True)
+        ids = list(ready.values_list('pk', flat=True)[:limit])
+        if not ids:
+            return []
+        Job.objects.filter(pk__in=ids, status=Job.PENDING).update(
+            status=Job.RUNNING, claimed_by=token, claimed_at=now, attempts=F('attempts') + 1,
+        )
+    return list(Job.objects.filter(pk__in=ids, claimed_by=token).order_by('run_at', 'id'))
+
+
+def retry_delay(attempts):
+    """Attente avant la tentative suivante : exponentielle, plafonnée, avec gigue (évite les vagues)."""
+    base = getattr(settings, 'TASKS_RETRY_BASE_DELAY', 10)
+    delay = min(base * 2 ** (attempts - 1), getattr(settings, 'TASKS_RETRY_MAX_DELAY', 3600))
+    return timedelta(seconds=delay * random.uniform(0.5, 1))
+
+
+def complete(job):
+    """Tâche réussie : supprimée de la file (si elle n'a pas été réattribuée entre-temps)."""
+    Job.objects.filter(pk=job.pk, claimed_by=job.claimed_by).delete()
+
+
+def fail(job, error):
+    """
+    Tâche en échec : nouvelle tentative différée, ou file des lettres mortes
+    une fois `max_attempts` atteint.
+    """
+    mine = Job.objects.filter(pk=job.pk, claimed_by=job.claimed_by)
+    if job.attempts >= job.max_attempts:
+        mine.update(status=Job.DEAD, claimed_by='', last_error=error)
+        logger.error(f"☠️ Tâche {job.name} #{job.pk} abandonnée après {job.attempts} tentatives")
+    else:
+        mine.update(status=Job.PENDING, claimed_by='', run_at=timezone.now() + retry_delay(job.attempts), last_error=error)
+        logger.warning(f"🔁 Tâche {job.name} #{job.pk} en échec (tentative {job.attempts}/{job.max_attempts})")
+
+
+def requeue_stale(timeout=None):
+    """
+    Remet en file les tâches réservées depuis plus de TASKS_VISIBILITY_TIMEOUT secondes
+    (worker arrêté brutalement). La tentative perdue est comptée.
+    Retourne le nombre de tâches remises en file ou abandonnées.
+    """
+    timeout = timeout if timeout is not None else getattr(settings, 'TASKS_VISIBILITY_TIMEOUT', 600)
+    stale = Job.objects.filter(status=Job.RUNNING, claimed_at__lt=timezone.now() - timedelta(seconds=timeout))
+    dead = stale.filter(attempts__gte=F('max_attempts')).update(
+        status=Job.DEAD, claimed_by='', last_error="Worker interrompu pendant l'exécution",
+    )
+    requeued = stale.update(status=Job.PENDING, claimed_by='', run_at=timezone.now())
+    return dead + requeued
+
+
+def retry_dead(queryset):
+    """Relance des tâches abandonnées avec un nouveau crédit de tentatives."""
+    return queryset.filter(status=Job.DEAD).update(status=Job.PENDING, attempts=0, run_at=timezone.now(), last_error='')
+
+
+# ==========================
+# 🔹 Métriques
+# ==========================
+def queue_stats(now=None):
+    """
+    Profondeur des files, en une requête groupée :
+    {file: {'ready', 'scheduled', 'running', 'dead', 'oldest_ready_age'}}.
+    `scheduled` : nouvelles tentatives en attente de leur délai ; `oldest_ready_age` : retard du worker (secondes).
+    """
+    now = now or timezone.now()
+    ready = Q(status=Job.PENDING, run_at__lte=now)
+    rows = Job.objects.values('queue').annotate(
+        ready=Count('pk', filter=ready),
+        scheduled=Count('pk', filter=Q(status=Job.PENDING, run_at__gt=now)),
+        running=Count('pk', filter=Q(status=Job.RUNNING)),
+        dead=Count('pk', filter=Q(status=Job.DEAD)),
+        oldest_ready=Min('run_at', filter=ready),
+    ).order_by('queue')
+    stats = {}
+    for row in rows:
+        oldest = row.pop('oldest_ready')
+        queue = row.pop('queue')
+        row['oldest_ready_age'] = round((now - oldest).total_seconds(), 1) if oldest else 0
+        stats[queue] = row
+    return stats
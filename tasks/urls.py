@@ -0,0 +1,6 @@
+from django.urls import path
+from .views import QueueStatsView
+
+urlpatterns = [
+    path('tasks/stats/', QueueStatsView.as_view(), name='task-queue-stats'),
+]
@@ -0,0 +1,17 @@
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from accounts.permissions import IsAdmin
+from .queue import queue_stats
+
+
+# 🔹 Profondeur des files de tâches (supervision)
+class QueueStatsView(APIView):
+    """
+    GET /api/tasks/stats/ : tâches prêtes, différées, en cours et abandonnées par file,
+    et âge de la plus ancienne tâche prête (retard des workers).
+    """
+    permission_classes = [IsAdmin]
+
+    def get(self, request):
+        return Response(queue_stats())